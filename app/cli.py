@@ -0,0 +1,114 @@
+"""
+Командная строка Task Tracker для массовых операций без GUI.
+
+Использование:
+    python -m app.cli import tasks.csv              # Импорт JSON/NDJSON/CSV (.gz)
+    python -m app.cli export tasks.ndjson.gz        # Потоковый экспорт
+    python -m app.cli --db other.db import tasks.json
+
+Операции выполняются как фоновые задания (services.jobs): в терминале
+показывается прогресс, Ctrl+C отменяет задание.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from core.database import Database
+from core.export import EXPORT_FORMATS
+from core.importer import IMPORT_FORMATS
+from services.import_service import ImportService, format_report
+from services.jobs import Job, JobRunner, JobState, export_job, import_job
+from services.task_service import TaskService
+
+DEFAULT_DB_PATH = os.path.join("data", "tasks.db")
+
+# Период обновления строки прогресса, секунды
+JOB_POLL_SECONDS = 0.1
+
+# Код выхода при отмене (как при завершении по SIGINT)
+EXIT_CANCELLED = 130
+
+
+def _print_progress(job: Job) -> None:
+    """Выводит состояние задания в одну строку терминала"""
+    print(f"\r{job.title}: {job.fraction:4.0%} ({job.state.value})",
+          end="", file=sys.stderr, flush=True)
+
+
+def run_job(runner: JobRunner, title: str, fn, *args, cpu_bound: bool = False) -> Job:
+    """
+    Выполняет фоновое задание, показывая прогресс; Ctrl+C отменяет его.
+
+    Returns:
+        Завершенное задание
+    """
+    job = runner.submit(title, fn, *args, cpu_bound=cpu_bound)
+    try:
+        while not runner.poll():
+            _print_progress(job)
+            time.sleep(JOB_POLL_SECONDS)
+    except KeyboardInterrupt:
+        # Задание прерывается в ближайшей точке сообщения о прогрессе
+        job.cancel()
+        while not runner.poll():
+            time.sleep(JOB_POLL_SECONDS)
+    _print_progress(job)
+    print(file=sys.stderr)
+    return job
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Task Tracker")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="путь к файлу БД")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="импорт задач из файла")
+    import_parser.add_argument("path", help="файл .json, .ndjson, .csv (возможно .gz)")
+    import_parser.add_argument("--format", choices=IMPORT_FORMATS,
+                               help="формат файла (по умолчанию по расширению)")
+
+    export_parser = commands.add_parser("export", help="экспорт задач в файл")
+    export_parser.add_argument("path", help="файл .json или .ndjson (возможно .gz)")
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS,
+                               help="формат файла (по умолчанию по расширению)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    db_dir = os.path.dirname(args.db)
+    if db_dir:
+        os.makedirs(db_dir, exist_ok=True)
+
+    runner = JobRunner()
+    try:
+        with Database(args.db) as db:
+            if args.command == "import":
+                job = run_job(runner, f"Импорт {args.path}", import_job,
+                              ImportService(TaskService(db)), args.path, args.format)
+            else:
+                # Сериализация выполняется в отдельном процессе
+                job = run_job(runner, f"Экспорт {args.path}", export_job,
+                              args.db, args.path, args.format, cpu_bound=True)
+    finally:
+        runner.shutdown()
+
+    if job.state == JobState.CANCELLED:
+        print("Операция отменена", file=sys.stderr)
+        return EXIT_CANCELLED
+    if job.state == JobState.FAILED:
+        print(f"Ошибка: {job.error}", file=sys.stderr)
+        return 1
+
+    if args.command == "import":
+        print(format_report(job.result))
+        return 1 if job.result.rejected else 0
+    print(f"Экспортировано задач: {job.result}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
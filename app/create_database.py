@@ -25,8 +25,8 @@ def main():
         description="Это первая тестовая задача",
         priority=Priority.MEDIUM,
         status=Status.PLANNED,
-        created_date=datetime.now().strftime('%Y-%m-%d'),
-        due_date="2025-10-23"
+        created_date=datetime.now().strftime('%d.%m.%Y'),
+        due_date="23.10.2025"
     )
 
     task_id = db.create_task(test_task)
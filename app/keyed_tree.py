@@ -0,0 +1,161 @@
+"""
+Обновление ttk.Treeview по ключам.
+
+Элементы дерева получают ID задачи в качестве iid. При обновлении новый
+набор строк сравнивается с отображаемым, и в Tk отправляются только
+нужные вставки, перемещения, изменения и удаления. Выделение и позиция
+прокрутки при этом сохраняются.
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Set, Tuple
+
+# Строка дерева: (iid, values, tags)
+Row = Tuple[str, tuple, tuple]
+
+
+@dataclass
+class TreeDiff:
+    """
+    Набор изменений для перехода от отображаемых строк к новым.
+
+    Атрибуты:
+        deleted: iid удаляемых элементов
+        detached: iid элементов, которые нужно переставить
+        placed: Пары (позиция, строка) для вставки или перемещения в порядке позиций
+        updated: Строки, у которых изменились значения или теги
+    """
+    deleted: List[str] = field(default_factory=list)
+    detached: List[str] = field(default_factory=list)
+    placed: List[Tuple[int, Row]] = field(default_factory=list)
+    updated: List[Row] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.deleted) + len(self.detached) + len(self.placed) + len(self.updated)
+
+
+def stable_keys(positions: Sequence[Tuple[str, int]]) -> Set[str]:
+    """
+    Находит наибольшее множество элементов, которые можно не перемещать.
+
+    Это наибольшая возрастающая подпоследовательность старых позиций,
+    взятых в новом порядке (O(n log n)).
+
+    Args:
+        positions: Пары (iid, старая позиция) в новом порядке
+
+    Returns:
+        Множество iid, сохраняющих взаимный порядок
+    """
+    tails: List[int] = []          # Старая позиция последнего элемента цепочки длины i+1
+    tail_index: List[int] = []     # Индекс этого элемента в positions
+    previous: List[int] = []
+    for i, (_, old_pos) in enumerate(positions):
+        length = bisect_left(tails, old_pos)
+        if length == len(tails):
+            tails.append(old_pos)
+            tail_index.append(i)
+        else:
+            tails[length] = old_pos
+            tail_index[length] = i
+        previous.append(tail_index[length - 1] if length else -1)
+
+    stable = set()
+    i = tail_index[-1] if tail_index else -1
+    while i >= 0:
+        stable.add(positions[i][0])
+        i = previous[i]
+    return stable
+
+
+def diff_rows(old_order: Sequence[str], old_rows: Dict[str, Row], new_rows: Sequence[Row]) -> TreeDiff:
+    """
+    Сравнивает отображаемые строки с новыми.
+
+    Args:
+        old_order: iid отображаемых строк по порядку
+        old_rows: Отображаемые строки по iid
+        new_rows: Новые строки по порядку
+
+    Returns:
+        TreeDiff с минимальным набором операций
+    """
+    diff = TreeDiff()
+    new_ids = {row[0] for row in new_rows}
+    diff.deleted = [iid for iid in old_order if iid not in new_ids]
+
+    old_index = {iid: pos for pos, iid in enumerate(old_order)}
+    kept = [(row[0], old_index[row[0]]) for row in new_rows if row[0] in old_index]
+    stable = stable_keys(kept)
+
+    for pos, row in enumerate(new_rows):
+        iid = row[0]
+        old = old_rows.get(iid)
+        if old is None or iid not in stable:
+            if old is not None:
+                diff.detached.append(iid)
+            diff.placed.append((pos, row))
+        if old is not None and old[1:] != row[1:]:
+            diff.updated.append(row)
+    return diff
+
+
+class KeyedTreeview:
+    """
+    Модель строк ttk.Treeview с обновлением по ключам.
+
+    set_rows() только запоминает новый набор строк; изменения применяются
+    к дереву один раз за цикл простоя Tk, поэтому несколько обновлений
+    подряд (например, поиск по мере ввода) сливаются в одно.
+    """
+
+    def __init__(self, tree):
+        """
+        Args:
+            tree: ttk.Treeview (или объект с тем же интерфейсом)
+        """
+        self.tree = tree
+        self._order: List[str] = []
+        self._rows: Dict[str, Row] = {}
+        self._pending = None
+        self._job = None
+
+    def set_rows(self, rows: Sequence[Row]) -> None:
+        """Планирует показ строк при ближайшем простое"""
+        self._pending = list(rows)
+        if self._job is None:
+            self._job = self.tree.after_idle(self._on_idle)
+
+    def _on_idle(self) -> None:
+        self._job = None
+        self.flush()
+
+    def flush(self) -> TreeDiff:
+        """Применяет отложенное обновление немедленно"""
+        if self._job is not None:
+            self.tree.after_cancel(self._job)
+            self._job = None
+        rows, self._pending = self._pending, None
+        if rows is None:
+            return TreeDiff()
+
+        diff = diff_rows(self._order, self._rows, rows)
+        tree = self.tree
+        if diff.deleted:
+            tree.delete(*diff.deleted)
+        if diff.detached:
+            tree.detach(*diff.detached)
+        # В дереве остались только неподвижные элементы в правильном порядке,
+        # поэтому каждая позиция в порядке возрастания уже точна
+        for pos, (iid, values, tags) in diff.placed:
+            if iid in self._rows:
+                tree.move(iid, "", pos)
+            else:
+                tree.insert("", pos, iid=iid, values=values, tags=tags)
+        for iid, values, tags in diff.updated:
+            tree.item(iid, values=values, tags=tags)
+
+        self._order = [row[0] for row in rows]
+        self._rows = {row[0]: row for row in rows}
+        return diff
@@ -2,9 +2,21 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import os
 from core.database import Database
+from core.filter_language import FilterSyntaxError, parse_filter
 from core.models import Priority, Status
 from services.task_service import TaskService
 from services.notification_service import NotificationService
+from services.import_service import ImportService, format_report
+from services.scheduler import DeadlineScheduler
+from services.background import BackgroundWorker
+from services.jobs import JobRunner, JobState, complete_tasks_job, export_job, import_job
+from app.keyed_tree import KeyedTreeview
+
+# Задержка поиска по мере ввода: запрос выполняется после паузы в наборе
+SEARCH_DEBOUNCE_MS = 150
+
+# Период обновления панели фоновых заданий, пока они выполняются
+JOBS_POLL_MS = 100
 
 
 class TaskTracker:
@@ -14,6 +26,10 @@ class TaskTracker:
         self.db = Database("data/tasks.db")
         self.task_service = TaskService(self.db)
         self.notification_service = NotificationService(self.task_service)
+        self.import_service = ImportService(self.task_service)
+        # Долгие операции (экспорт, импорт, массовое выполнение) - фоновые задания
+        self.jobs = JobRunner()
+        self._jobs_poll = None
         
         # Переменные для сортировки и фильтрации
         self.sort_by_due_date = False
@@ -21,14 +37,28 @@ class TaskTracker:
         self.sort_by_created_date = False
         self.priority_filter = None
         self.status_filter = None
+        self.filter_query = None
+        self._search_job = None
+
+        # Префиксный индекс названий строится один раз при запуске
+        self.task_service.build_prefix_index()
         
         self.setup_gui()
 
+        # Проверки по наступлению дат вместо ежечасного опроса
+        # События из фоновых потоков доставляются планировщику в потоке Tk,
+        # а даты из БД он перечитывает в пуле фоновых потоков
+        self.scheduler = DeadlineScheduler(self.task_service, self.root, self._on_deadline,
+                                           queued=True, worker=self.worker)
+
     def setup_gui(self):
         self.root = tk.Tk()
         self.root.title("Task Tracker")
         self.root.geometry("1280x680")
 
+        # Запросы к БД выполняются в фоновых потоках, результаты - в потоке Tk
+        self.worker = BackgroundWorker(self.root, self.task_service.events)
+
         # Создаем интерфейс
         self.create_widgets()
         self.refresh_tasks()
@@ -50,6 +80,8 @@ class TaskTracker:
                    command=self.show_overdue_notifications).pack(side=tk.LEFT, padx=5)
         ttk.Button(control_frame, text="Экспорт в JSON",
                    command=self.export_to_json).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Импорт",
+                   command=self.import_tasks).pack(side=tk.LEFT, padx=5)
         # Вторая строка кнопок для сортировки и фильтров
         filter_frame = ttk.Frame(self.root)
         filter_frame.pack(pady=5)
@@ -67,9 +99,36 @@ class TaskTracker:
                    command=self.toggle_priority_filter).pack(side=tk.LEFT, padx=2)
         ttk.Button(filter_frame, text="По статусу",
                    command=self.toggle_status_filter).pack(side=tk.LEFT, padx=2)
+
+        ttk.Label(filter_frame, text="Поиск:").pack(side=tk.LEFT, padx=(20, 5))
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self._on_search_changed)
+        search_entry = ttk.Entry(filter_frame, textvariable=self.search_var, width=30)
+        search_entry.pack(side=tk.LEFT, padx=2)
+        search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+
+        # Строка фильтра, например: status:"В работе" priority:высокий due<01.12.2025 overdue
+        query_frame = ttk.Frame(self.root)
+        query_frame.pack(pady=5)
+
+        ttk.Label(query_frame, text="Фильтр:").pack(side=tk.LEFT, padx=5)
+        self.filter_var = tk.StringVar()
+        filter_entry = ttk.Entry(query_frame, textvariable=self.filter_var, width=80)
+        filter_entry.pack(side=tk.LEFT, padx=2)
+        filter_entry.bind("<Return>", lambda event: self.apply_filter_query())
+        ttk.Button(query_frame, text="Применить",
+                   command=self.apply_filter_query).pack(side=tk.LEFT, padx=2)
+        ttk.Button(query_frame, text="Сбросить",
+                   command=self.clear_filter_query).pack(side=tk.LEFT, padx=2)
         
         ttk.Button(control_frame, text="Обновить",
                    command=self.refresh_tasks).pack(side=tk.LEFT, padx=5)
+        # Индикатор загрузки списка
+        self.loading_var = tk.StringVar()
+        ttk.Label(control_frame, textvariable=self.loading_var,
+                  foreground="gray").pack(side=tk.LEFT, padx=5)
+
+        self._create_jobs_panel()
 
         # Список задач (добавляем скрытую колонку ID для надежной идентификации)
         self.tree = ttk.Treeview(self.root, columns=("ID", "Title", "Status", "Priority", "Due"), show="headings")
@@ -90,6 +149,57 @@ class TaskTracker:
 
         self.tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
 
+        # Элементы дерева идентифицируются ID задачи и обновляются по разнице
+        self.tree_model = KeyedTreeview(self.tree)
+
+    def _create_jobs_panel(self):
+        """Панель фоновых заданий под списком задач"""
+        jobs_frame = ttk.LabelFrame(self.root, text="Фоновые задания")
+        jobs_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10, pady=(0, 10))
+
+        self.jobs_tree = ttk.Treeview(jobs_frame, columns=("Title", "State", "Progress"),
+                                      show="headings", height=3)
+        self.jobs_tree.heading("Title", text="Задание")
+        self.jobs_tree.heading("State", text="Состояние")
+        self.jobs_tree.heading("Progress", text="Прогресс")
+        self.jobs_tree.column("State", width=120, stretch=False)
+        self.jobs_tree.column("Progress", width=90, stretch=False)
+        self.jobs_tree.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        self.jobs_model = KeyedTreeview(self.jobs_tree)
+
+        ttk.Button(jobs_frame, text="Отменить",
+                   command=self.cancel_job).pack(side=tk.TOP, padx=5, pady=(5, 2))
+        ttk.Button(jobs_frame, text="Очистить",
+                   command=self.clear_jobs).pack(side=tk.TOP, padx=5, pady=2)
+
+    def _submit_job(self, title, fn, *args, cpu_bound=False, on_done=None):
+        """Запускает фоновое задание и обновление панели заданий"""
+        self.jobs.submit(title, fn, *args, cpu_bound=cpu_bound, on_done=on_done)
+        if self._jobs_poll is None:
+            self._poll_jobs()
+
+    def _poll_jobs(self):
+        # Обработчики завершения вызываются здесь, в потоке Tk
+        self.jobs.poll()
+        self._show_jobs()
+        self._jobs_poll = self.root.after(JOBS_POLL_MS, self._poll_jobs) if self.jobs.busy() else None
+
+    def _show_jobs(self):
+        self.jobs_model.set_rows([
+            (str(job.id), (job.title, job.state.value, f"{job.fraction:.0%}"), ())
+            for job in self.jobs.jobs()
+        ])
+
+    def cancel_job(self):
+        """Отменяет выбранные фоновые задания"""
+        for item in self.jobs_tree.selection():
+            self.jobs.cancel(int(item))
+
+    def clear_jobs(self):
+        """Убирает завершенные задания из панели"""
+        self.jobs.clear_finished()
+        self._show_jobs()
+
     def toggle_sort_by_due_date(self):
         """Переключает сортировку по дате срока"""
         self.sort_by_due_date = not self.sort_by_due_date
@@ -138,37 +248,69 @@ class TaskTracker:
             self.status_filter = None
         self.refresh_tasks()
 
-    def refresh_tasks(self):
-        # Очищаем список
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def apply_filter_query(self):
+        """Применяет строку фильтра (разбирается один раз и выполняется в БД)"""
+        text = self.filter_var.get().strip()
+        try:
+            parse_filter(text)
+        except FilterSyntaxError as e:
+            messagebox.showerror("Ошибка в фильтре", str(e))
+            return
+        self.filter_query = text or None
+        self.refresh_tasks()
 
-        # Загружаем задачи
-        tasks = self.task_service.get_all_tasks()
-        
-        # Применяем фильтрацию по приоритету если включена
-        if self.priority_filter:
-            tasks = self.task_service.filter_tasks(tasks, priority=self.priority_filter)
-        
-        # Применяем фильтрацию по статусу если включена
-        if self.status_filter:
-            tasks = self.task_service.filter_tasks(tasks, status=self.status_filter)
-        
-        # Применяем сортировку
+    def clear_filter_query(self):
+        """Сбрасывает строку фильтра"""
+        self.filter_var.set("")
+        self.filter_query = None
+        self.refresh_tasks()
+
+    def _on_search_changed(self, *args):
+        """Откладывает поиск до паузы в наборе текста"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DEBOUNCE_MS, self._apply_search)
+
+    def _apply_search(self):
+        self._search_job = None
+        self.refresh_tasks()
+
+    def refresh_tasks(self):
+        """Загружает список в фоновом потоке; серия обновлений подряд дает одну загрузку"""
+        # Загружаем задачи: фильтрация и сортировка выполняются в БД
         if self.sort_by_due_date:
-            tasks = self.task_service.sort_tasks(tasks, "due_date")
+            order_by = "due_date"
         elif self.sort_by_priority:
-            tasks = self.task_service.sort_tasks(tasks, "priority")
+            order_by = "priority"
         elif self.sort_by_created_date:
-            tasks = self.task_service.sort_tasks(tasks, "created_date")
-        
-        # Отображаем задачи
+            order_by = "created_date"
+        else:
+            order_by = None
+
+        # Параметры читаются из виджетов здесь, запрос выполняется в пуле
+        self.loading_var.set("Загрузка...")
+        self.worker.submit(self._load_rows, self.search_var.get(), self.status_filter,
+                           self.priority_filter, order_by, self.filter_query,
+                           on_done=self._show_rows, on_error=self._on_load_error, key="refresh")
+
+    def _load_rows(self, search_text, status, priority, order_by, filter_query):
+        """Читает строки списка (выполняется в фоновом потоке, виджеты не трогает)"""
+        # Поиск по мере ввода: ID совпадений берутся из префиксного индекса
+        ids = self.task_service.typeahead(search_text) if search_text.strip() else None
+
+        # Для списка читаются только отображаемые столбцы, без описания
+        tasks = self.task_service.list_rows(status=status, priority=priority,
+                                            order_by=order_by, ids=ids,
+                                            filter_text=filter_query)
+
+        # Строки дерева: изменения применяются к Treeview при ближайшем простое
+        rows = []
         for task in tasks:
             status_text = task.status.value
             tags = []
             
             # Определяем теги для цветового выделения
-            if task.is_overdue() and task.status != Status.COMPLETED:
+            if task.overdue:
                 status_text = f"{task.status.value} (ПРОСРОЧЕНО)"
                 tags.append("overdue")
             
@@ -183,13 +325,23 @@ class TaskTracker:
             elif task.priority == Priority.LOW:
                 tags.append("low_priority")
 
-            self.tree.insert("", tk.END, values=(
+            rows.append((str(task.id), (
                 task.id,  # ID для надежной идентификации
                 task.title,
                 status_text,
                 task.priority.value,
                 task.due_date
-            ), tags=tags if tags else [])
+            ), tuple(tags)))
+        return rows
+
+    def _show_rows(self, rows):
+        self.tree_model.set_rows(rows)
+        if not self.worker.busy("refresh"):
+            self.loading_var.set("")
+
+    def _on_load_error(self, error):
+        self.loading_var.set("")
+        messagebox.showerror("Ошибка", f"Не удалось загрузить задачи:\n{error}")
 
     def create_task(self):
         # Диалог создания задачи
@@ -340,7 +492,20 @@ class TaskTracker:
 
     def complete_task(self):
         selected = self.tree.selection()
-        if selected:
+        if len(selected) > 1:
+            # Несколько выбранных задач выполняются одной транзакцией
+            task_ids = [self.tree.item(item)['values'][0] for item in selected]
+
+            def on_done(job):
+                if job.state == JobState.DONE:
+                    messagebox.showinfo("Успех", f"Отмечено как выполненные: {job.result} из {len(task_ids)}")
+                elif job.state == JobState.FAILED:
+                    messagebox.showerror("Ошибка", f"Не удалось обновить задачи:\n{job.error}")
+                self.refresh_tasks()
+
+            self._submit_job(f"Выполнение задач ({len(task_ids)})", complete_tasks_job,
+                             self.task_service, task_ids, on_done=on_done)
+        elif selected:
             item = selected[0]
             task_id = self.tree.item(item)['values'][0]  # Получаем ID из скрытой колонки
             
@@ -381,7 +546,10 @@ class TaskTracker:
 
     def show_overdue_notifications(self):
         """Показывает уведомления о просроченных задачах"""
-        overdue_tasks = self.notification_service.check_overdue_tasks()
+        self.worker.submit(self.notification_service.check_overdue_tasks,
+                           on_done=self._show_overdue, key="overdue")
+
+    def _show_overdue(self, overdue_tasks):
         if overdue_tasks:
             self.notification_service.show_overdue_notification(overdue_tasks)
         else:
@@ -390,38 +558,81 @@ class TaskTracker:
     def export_to_json(self):
         """Экспортирует все задачи в файл JSON (требование ТЗ 5.5.1)"""
         from tkinter import filedialog
-        import json
         
-        # Запрашиваем путь для сохранения файла
+        # Запрашиваем путь для сохранения файла (формат определяется по расширению)
         filename = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json"), ("NDJSON files", "*.ndjson"),
+                       ("JSON (gzip)", "*.json.gz"), ("NDJSON (gzip)", "*.ndjson.gz"),
+                       ("All files", "*.*")],
             title="Сохранить задачи в JSON"
         )
         
         if filename:
-            try:
-                # Получаем JSON строку из базы данных
-                json_data = self.db.export_to_json()
-                
-                # Сохраняем в файл
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(json_data)
-                
-                messagebox.showinfo("Успех", f"Задачи успешно экспортированы в файл:\n{filename}")
-            except Exception as e:
-                messagebox.showerror("Ошибка", f"Не удалось экспортировать задачи:\n{str(e)}")
+            def on_done(job):
+                if job.state == JobState.DONE:
+                    messagebox.showinfo("Успех", f"Экспортировано задач: {job.result}. Файл:\n{filename}")
+                elif job.state == JobState.FAILED:
+                    messagebox.showerror("Ошибка", f"Не удалось экспортировать задачи:\n{job.error}")
+
+            # Сериализация выполняется в отдельном процессе со своим подключением к БД
+            self._submit_job(f"Экспорт: {os.path.basename(filename)}", export_job,
+                             self.db.db_path, filename, cpu_bound=True, on_done=on_done)
+
+    def import_tasks(self):
+        """Импортирует задачи из файла JSON, NDJSON или CSV"""
+        from tkinter import filedialog
+
+        filename = filedialog.askopenfilename(
+            filetypes=[("Файлы задач", "*.json *.ndjson *.jsonl *.csv *.gz"),
+                       ("All files", "*.*")],
+            title="Импорт задач"
+        )
+
+        if filename:
+            def on_done(job):
+                if job.state == JobState.DONE:
+                    report = job.result
+                    if report.rejected:
+                        messagebox.showwarning("Импорт", format_report(report))
+                    else:
+                        messagebox.showinfo("Импорт", format_report(report))
+                elif job.state == JobState.FAILED:
+                    messagebox.showerror("Ошибка", f"Не удалось импортировать задачи:\n{job.error}")
+                # После отмены уже записанные пакеты остаются в БД
+                self.refresh_tasks()
+
+            # Файл читается потоково, задачи записываются пакетами
+            self._submit_job(f"Импорт: {os.path.basename(filename)}", import_job,
+                             self.import_service, filename, on_done=on_done)
 
     def run(self):
-        # Проверяем напоминания при запуске
+        # Напоминания и просроченные задачи проверяются после отрисовки окна,
+        # а затем - при наступлении ближайшего срока или даты напоминания
+        self.worker.start()
+        self.scheduler.start()
+
+        self.root.mainloop()
+        # Незавершенные задания отменяются при закрытии окна
+        self.jobs.shutdown()
+        self.worker.shutdown()
+
+    def _on_deadline(self):
+        # Рассылка напоминаний и поиск просроченных выполняются в пуле
+        self.worker.submit(self._check_deadlines, on_done=self._show_deadlines)
+
+    def _check_deadlines(self):
         reminders_count = self.task_service.process_reminders()
+        return reminders_count, self.notification_service.check_overdue_tasks()
+
+    def _show_deadlines(self, result):
+        reminders_count, overdue_tasks = result
         if reminders_count > 0:
             messagebox.showinfo("Напоминания", f"Есть {reminders_count} напоминаний!")
 
-        # Запускаем периодические уведомления
-        self.notification_service.show_periodic_notifications(self.root)
-
-        self.root.mainloop()
+        # После полуночи меняется признак просрочки в списке
+        self.refresh_tasks()
+        self.notification_service.show_overdue_notification(overdue_tasks)
 
 
 if __name__ == "__main__":
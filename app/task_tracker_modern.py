@@ -14,9 +14,22 @@ if project_root not in sys.path:
 import customtkinter as ctk
 from tkinter import messagebox, filedialog
 from core.database import Database
+from core.dates import today_ordinal
+from core.filter_language import FilterSyntaxError, parse_filter
 from core.models import Priority, Status
 from services.task_service import TaskService
 from services.notification_service import NotificationService
+from services.import_service import ImportService, format_report
+from services.scheduler import DeadlineScheduler
+from services.background import BackgroundWorker
+from services.jobs import JobRunner, JobState, export_job, import_job
+from app.virtual_list import VirtualTaskList
+
+# Задержка поиска по мере ввода: запрос выполняется после паузы в наборе
+SEARCH_DEBOUNCE_MS = 150
+
+# Период обновления панели фоновых заданий, пока они выполняются
+JOBS_POLL_MS = 100
 
 
 class TaskTrackerModern:
@@ -28,16 +41,34 @@ class TaskTrackerModern:
         self.db = Database("data/tasks.db")
         self.task_service = TaskService(self.db)
         self.notification_service = NotificationService(self.task_service)
+        self.import_service = ImportService(self.task_service)
+        # Долгие операции (экспорт, импорт) - фоновые задания
+        self.jobs = JobRunner()
+        self._jobs_poll = None
+        self._job_rows = {}
 
         # Переменные для состояния
         self.sort_filters = {"due_date": False, "priority": False, "created_date": False}
         self.current_filter = {"priority": None, "status": None}
         self.selected_task_id = None
+        self.filter_query = None
+        self._search_job = None
+
+        # Префиксный индекс названий строится один раз при запуске
+        self.task_service.build_prefix_index()
 
         self._setup_window()
+        # Запросы к БД выполняются в фоновых потоках, результаты - в потоке Tk
+        self.worker = BackgroundWorker(self.root, self.task_service.events)
         self._create_widgets()
         self.refresh_tasks()
 
+        # Проверки по наступлению дат вместо ежечасного опроса;
+        # события из фоновых потоков доставляются планировщику в потоке Tk,
+        # а даты из БД он перечитывает в пуле фоновых потоков
+        self.scheduler = DeadlineScheduler(self.task_service, self.root, self._on_deadline,
+                                           queued=True, worker=self.worker)
+
     def _setup_window(self):
         """Настройка основного окна с центрированием"""
         self.root = ctk.CTk()
@@ -82,6 +113,7 @@ class TaskTrackerModern:
         self._create_control_panel(main_frame)
         self._create_filter_panel(main_frame)
         self._create_task_list(main_frame)
+        self._create_jobs_panel(main_frame)
 
     def _create_control_panel(self, parent):
         """Создание панели с кнопками управления"""
@@ -92,6 +124,7 @@ class TaskTrackerModern:
             ("🗑️ Удалить", self.delete_task, ("red", "darkred")),
             ("⚠️ Просроченные", self.show_overdue_notifications, ("orange", "darkorange")),
             ("💾 Экспорт в JSON", self.export_to_json, None),
+            ("📥 Импорт", self.import_tasks, None),
             ("🔄 Обновить", self.refresh_tasks, None)
         ]
 
@@ -107,6 +140,10 @@ class TaskTrackerModern:
         ctk.CTkButton(frame, text=buttons[-1][0], command=buttons[-1][1],
                      width=100, height=32).pack(side="right", padx=5)
 
+        # Индикатор загрузки списка
+        self.loading_label = ctk.CTkLabel(frame, text="", text_color="gray")
+        self.loading_label.pack(side="right", padx=5)
+
     def _create_filter_panel(self, parent):
         """Создание панели фильтров и сортировки"""
         frame = ctk.CTkFrame(parent)
@@ -133,6 +170,55 @@ class TaskTrackerModern:
             btn.pack(side="left", padx=2)
             self.filter_buttons[key] = btn
 
+        # Поиск по мере ввода
+        self.search_var = ctk.StringVar()
+        self.search_var.trace_add("write", self._on_search_changed)
+        search_entry = ctk.CTkEntry(frame, textvariable=self.search_var, width=220, height=28)
+        search_entry.pack(side="right", padx=5)
+        search_entry.bind("<Escape>", lambda event: self.search_var.set(""))
+        ctk.CTkLabel(frame, text="🔍 Поиск:", font=ctk.CTkFont(weight="bold")).pack(side="right", padx=(20, 5))
+
+        # Строка фильтра, например: status:"В работе" priority:высокий due<01.12.2025 overdue
+        query_frame = ctk.CTkFrame(parent)
+        query_frame.pack(pady=5, padx=10, fill="x")
+
+        ctk.CTkLabel(query_frame, text="Фильтр:", font=ctk.CTkFont(weight="bold")).pack(side="left", padx=5)
+        self.filter_var = ctk.StringVar()
+        filter_entry = ctk.CTkEntry(query_frame, textvariable=self.filter_var, height=28)
+        filter_entry.pack(side="left", padx=2, fill="x", expand=True)
+        filter_entry.bind("<Return>", lambda event: self.apply_filter_query())
+        ctk.CTkButton(query_frame, text="Сбросить", width=100, height=28, fg_color="gray",
+                      command=self.clear_filter_query).pack(side="right", padx=2)
+        ctk.CTkButton(query_frame, text="Применить", width=100, height=28,
+                      command=self.apply_filter_query).pack(side="right", padx=2)
+
+    def apply_filter_query(self):
+        """Применение строки фильтра (разбирается один раз и выполняется в БД)"""
+        text = self.filter_var.get().strip()
+        try:
+            parse_filter(text)
+        except FilterSyntaxError as e:
+            messagebox.showerror("Ошибка в фильтре", str(e))
+            return
+        self.filter_query = text or None
+        self.refresh_tasks()
+
+    def clear_filter_query(self):
+        """Сброс строки фильтра"""
+        self.filter_var.set("")
+        self.filter_query = None
+        self.refresh_tasks()
+
+    def _on_search_changed(self, *args):
+        """Откладывает поиск до паузы в наборе текста"""
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(SEARCH_DEBOUNCE_MS, self._apply_search)
+
+    def _apply_search(self):
+        self._search_job = None
+        self.refresh_tasks()
+
     def _create_task_list(self, parent):
         """Создание списка задач"""
         list_frame = ctk.CTkFrame(parent)
@@ -150,10 +236,68 @@ class TaskTrackerModern:
                 ctk.CTkLabel(header_frame, text=header, font=ctk.CTkFont(size=14, weight="bold"),
                            width=width, anchor="w").grid(row=0, column=i, padx=10, pady=5, sticky="w")
 
-        # Скроллируемая область
-        self.tasks_container = ctk.CTkScrollableFrame(list_frame)
-        self.tasks_container.pack(fill="both", expand=True, padx=5, pady=5)
-        self.task_widgets = []
+        # Виртуализированный список: виджеты создаются только для видимых строк
+        self.task_list = VirtualTaskList(list_frame, columns=[(400, False), (300, True), (250, True), (150, False)],
+                                         format_row=self._format_task_row,
+                                         on_select=self._select_task,
+                                         on_activate=self._edit_task_by_id)
+        self.task_list.pack(fill="both", expand=True, padx=5, pady=5)
+
+    def _create_jobs_panel(self, parent):
+        """Панель фоновых заданий под списком задач"""
+        self.jobs_frame = ctk.CTkFrame(parent)
+        self.jobs_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        header = ctk.CTkFrame(self.jobs_frame, fg_color="transparent")
+        header.pack(fill="x", padx=5, pady=(5, 0))
+        ctk.CTkLabel(header, text="Фоновые задания",
+                     font=ctk.CTkFont(size=13, weight="bold")).pack(side="left", padx=5)
+        ctk.CTkButton(header, text="Очистить", width=90, height=26,
+                      command=self.clear_jobs).pack(side="right", padx=5)
+
+    def _submit_job(self, title, fn, *args, cpu_bound=False, on_done=None):
+        """Запуск фонового задания и обновления панели заданий"""
+        self.jobs.submit(title, fn, *args, cpu_bound=cpu_bound, on_done=on_done)
+        if self._jobs_poll is None:
+            self._poll_jobs()
+
+    def _poll_jobs(self):
+        # Обработчики завершения вызываются здесь, в потоке Tk
+        self.jobs.poll()
+        self._show_jobs()
+        self._jobs_poll = self.root.after(JOBS_POLL_MS, self._poll_jobs) if self.jobs.busy() else None
+
+    def _show_jobs(self):
+        """Обновление строк панели: виджеты создаются только для новых заданий"""
+        jobs = self.jobs.jobs()
+        for job_id in set(self._job_rows) - {job.id for job in jobs}:
+            self._job_rows.pop(job_id)[0].destroy()
+
+        for job in jobs:
+            row = self._job_rows.get(job.id)
+            if row is None:
+                frame = ctk.CTkFrame(self.jobs_frame, fg_color="transparent")
+                frame.pack(fill="x", padx=5, pady=2)
+                label = ctk.CTkLabel(frame, text="", width=360, anchor="w")
+                label.pack(side="left", padx=5)
+                bar = ctk.CTkProgressBar(frame, width=240)
+                bar.pack(side="left", padx=5)
+                button = ctk.CTkButton(frame, text="✖", width=30, height=24,
+                                       fg_color="red", hover_color="darkred",
+                                       command=lambda job_id=job.id: self.jobs.cancel(job_id))
+                button.pack(side="left", padx=5)
+                row = self._job_rows[job.id] = (frame, label, bar, button)
+
+            _, label, bar, button = row
+            label.configure(text=f"{job.title} - {job.state.value}")
+            bar.set(job.fraction)
+            if job.finished:
+                button.configure(state="disabled")
+
+    def clear_jobs(self):
+        """Удаление завершенных заданий из панели"""
+        self.jobs.clear_finished()
+        self._show_jobs()
 
     def _toggle_sort(self, sort_type):
         """Переключение сортировки"""
@@ -187,80 +331,63 @@ class TaskTrackerModern:
         self.refresh_tasks()
 
     def refresh_tasks(self):
-        """Обновление списка задач"""
-        for widget in self.tasks_container.winfo_children():
-            widget.destroy()
-
-        self.task_widgets = []
-        self.selected_task_id = None
-
-        tasks = self.task_service.get_all_tasks()
-
-        # Применение фильтров
-        if self.current_filter["priority"]:
-            tasks = self.task_service.filter_tasks(tasks, priority=self.current_filter["priority"])
-        if self.current_filter["status"]:
-            tasks = self.task_service.filter_tasks(tasks, status=self.current_filter["status"])
-
-        # Применение сортировки
-        for sort_type, active in self.sort_filters.items():
-            if active:
-                tasks = self.task_service.sort_tasks(tasks, sort_type)
-                break
-
-        # Отображение задач
-        for task in tasks:
-            self._create_task_item(task)
-
-    def _create_task_item(self, task):
-        """Создание элемента задачи в списке"""
-        # Определение цвета фона
-        bg_color = "#2b2b2b" if ctk.get_appearance_mode() == "Dark" else "#ffffff"
-        if task.is_overdue() and task.status != Status.COMPLETED:
-            bg_color = "#ffe6e6" if ctk.get_appearance_mode() == "Light" else "#4a0000"
+        """Обновление списка задач в фоновом потоке; серия обновлений подряд дает одну загрузку"""
+        # Фильтрация и сортировка выполняются в БД
+        order_by = next((sort_type for sort_type, active in self.sort_filters.items() if active), None)
+        self.loading_label.configure(text="⏳ Загрузка...")
+        self.worker.submit(self._load_rows, self.search_var.get(), self.current_filter["status"],
+                           self.current_filter["priority"], order_by, self.filter_query,
+                           on_done=self._show_rows, on_error=self._on_load_error, key="refresh")
+
+    def _load_rows(self, search_text, status, priority, order_by, filter_query):
+        """Чтение строк списка (выполняется в фоновом потоке, виджеты не трогает)"""
+        # Поиск по мере ввода: ID совпадений берутся из префиксного индекса
+        ids = self.task_service.typeahead(search_text) if search_text.strip() else None
+        # Для списка читаются только отображаемые столбцы, без описания
+        return self.task_service.list_rows(status=status, priority=priority,
+                                           order_by=order_by, ids=ids,
+                                           filter_text=filter_query)
+
+    def _show_rows(self, tasks):
+        """Показ загруженных строк (в потоке Tk)"""
+        if not self.worker.busy("refresh"):
+            self.loading_label.configure(text="")
+
+        # Отрисовываются только видимые строки, выбор сохраняется, если задача осталась в списке
+        self.task_list.set_rows(tasks)
+        self.selected_task_id = self.task_list.selected_id
+
+    def _on_load_error(self, error):
+        self.loading_label.configure(text="")
+        messagebox.showerror("Ошибка", f"Не удалось загрузить задачи:\n{error}")
+
+    def _format_task_row(self, task):
+        """Цвет фона и колонки строки списка (task - строка проекции LIST_COLUMNS)"""
+        light = ctk.get_appearance_mode() == "Light"
+        bg_color = "#ffffff" if light else "#2b2b2b"
+        if task.overdue:
+            bg_color = "#ffe6e6" if light else "#4a0000"
         elif task.status == Status.COMPLETED:
-            bg_color = "#e8f5e9" if ctk.get_appearance_mode() == "Light" else "#1a3a1a"
-
-        task_frame = ctk.CTkFrame(self.tasks_container, fg_color=bg_color)
-        task_frame.pack(fill="x", padx=5, pady=3)
+            bg_color = "#e8f5e9" if light else "#1a3a1a"
 
-        # Данные для колонок
+        text_color = "#1a1a1a" if light else "#ffffff"
         columns = [
-            (task.title[:60] + ("..." if len(task.title) > 60 else ""), 400, None, 13),
-            (self._get_status_text(task), 300, self._get_status_color(task), 13),
-            (task.priority.value.upper(), 250, self._get_priority_color(task.priority), 13),
-            (task.due_date, 150, None, 13)
+            (task.title[:60] + ("..." if len(task.title) > 60 else ""), text_color),
+            (self._get_status_text(task), self._get_status_color(task)),
+            (task.priority.value.upper(), self._get_priority_color(task.priority)),
+            (task.due_date, text_color)
         ]
-
-        # Создание колонок
-        for i, (text, width, color, size) in enumerate(columns):
-            font_weight = "bold" if i in [1, 2] else "normal"
-            label = ctk.CTkLabel(task_frame, text=text, width=width, anchor="w",
-                               font=ctk.CTkFont(size=size, weight=font_weight),
-                               text_color=color or ("#1a1a1a" if ctk.get_appearance_mode() == "Light" else "#ffffff"))
-            label.grid(row=0, column=i+1, padx=10, pady=8, sticky="w")
-
-        task_frame.task_id = task.id
-
-        # Привязка событий
-        task_frame.bind("<Button-1>", lambda e, tid=task.id: self._select_task(tid, task_frame))
-        task_frame.bind("<Double-Button-1>", lambda e, tid=task.id: self._edit_task_by_id(tid))
-
-        for widget in task_frame.winfo_children():
-            widget.bind("<Button-1>", lambda e, tid=task.id: self._select_task(tid, task_frame))
-            widget.bind("<Double-Button-1>", lambda e, tid=task.id: self._edit_task_by_id(tid))
-
-        self.task_widgets.append(task_frame)
+        return bg_color, columns
 
     def _get_status_text(self, task):
         """Получение текста статуса с учетом просрочки"""
-        if task.is_overdue() and task.status != Status.COMPLETED:
+        if task.overdue:
             return f"{task.status.value} (ПРОСРОЧЕНО)"
         return task.status.value
 
     def _get_status_color(self, task):
         """Получение цвета статуса"""
-        if task.is_overdue() and task.status != Status.COMPLETED:
+        if task.overdue:
             return "#d32f2f"
         elif task.status == Status.COMPLETED:
             return "#388e3c"
@@ -275,12 +402,9 @@ class TaskTrackerModern:
         }
         return colors.get(priority, "#666666")
 
-    def _select_task(self, task_id, task_frame):
-        """Выбор задачи"""
+    def _select_task(self, task_id):
+        """Выбор задачи (подсветку строки выполняет список)"""
         self.selected_task_id = task_id
-        for widget in self.task_widgets:
-            widget.configure(border_width=0)
-        task_frame.configure(border_width=2, border_color="blue")
 
     def _edit_task_by_id(self, task_id):
         """Редактирование задачи по ID"""
@@ -473,7 +597,10 @@ class TaskTrackerModern:
 
     def show_overdue_notifications(self):
         """Показать просроченные задачи"""
-        overdue_tasks = self.notification_service.check_overdue_tasks()
+        self.worker.submit(self.notification_service.check_overdue_tasks,
+                           on_done=self._show_overdue, key="overdue")
+
+    def _show_overdue(self, overdue_tasks):
         if overdue_tasks:
             self._show_overdue_dialog(overdue_tasks)
         else:
@@ -531,9 +658,10 @@ class TaskTrackerModern:
 
         self._selected_overdue_task_id = None
 
-        # Добавляем задачи
+        # Добавляем задачи: текущая дата одна на весь список
+        today = today_ordinal()
         for task in tasks:
-            self._create_overdue_item(scroll_frame, task)
+            self._create_overdue_item(scroll_frame, task, today)
 
         # Панель кнопок
         button_frame = ctk.CTkFrame(main_frame)
@@ -551,12 +679,12 @@ class TaskTrackerModern:
                      command=self._notification_window.destroy, height=40,
                      fg_color="gray", font=ctk.CTkFont(size=13, weight="bold")).pack(side="left", padx=5, expand=True, fill="x")
 
-    def _create_overdue_item(self, parent, task):
-        """Создание элемента просроченной задачи"""
+    def _create_overdue_item(self, parent, task, today):
+        """Создание элемента просроченной задачи (today - номер текущего дня)"""
         frame = ctk.CTkFrame(parent, fg_color="#ffe6e6")
         frame.pack(fill="x", padx=5, pady=3)
 
-        days_overdue = self._calculate_days_overdue(task.due_date)
+        days_overdue = task.days_overdue(today)
         columns = [
             (task.title[:50] + ("..." if len(task.title) > 50 else ""), 350, None),
             (task.priority.value.upper(), 150, self._get_priority_color(task.priority)),
@@ -577,15 +705,6 @@ class TaskTrackerModern:
         for widget in frame.winfo_children():
             widget.bind("<Button-1>", lambda e, tid=task.id: self._select_overdue_task(tid, frame))
 
-    def _calculate_days_overdue(self, due_date):
-        """Вычисление дней просрочки"""
-        try:
-            due_dt = datetime.strptime(due_date, '%d.%m.%Y')
-            overdue_days = (datetime.now().date() - due_dt.date()).days
-            return max(0, overdue_days)
-        except ValueError:
-            return 0
-
     def _select_overdue_task(self, task_id, frame):
         """Выбор просроченной задачи"""
         self._selected_overdue_task_id = task_id
@@ -673,34 +792,77 @@ class TaskTrackerModern:
                      fg_color="gray", font=ctk.CTkFont(size=13, weight="bold")).pack(side="left", padx=5, expand=True, fill="x")
 
     def export_to_json(self):
-        """Экспорт в JSON"""
+        """Экспорт в JSON (формат определяется по расширению файла)"""
         filename = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json"), ("NDJSON files", "*.ndjson"),
+                       ("JSON (gzip)", "*.json.gz"), ("NDJSON (gzip)", "*.ndjson.gz"),
+                       ("All files", "*.*")],
             title="Сохранить задачи в JSON"
         )
 
         if filename:
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(self.db.export_to_json())
-                messagebox.showinfo("Успех", f"Задачи экспортированы в:\n{filename}")
-            except Exception as e:
-                messagebox.showerror("Ошибка", f"Ошибка экспорта:\n{str(e)}")
+            def on_done(job):
+                if job.state == JobState.DONE:
+                    messagebox.showinfo("Успех", f"Экспортировано задач: {job.result}. Файл:\n{filename}")
+                elif job.state == JobState.FAILED:
+                    messagebox.showerror("Ошибка", f"Ошибка экспорта:\n{job.error}")
+
+            # Сериализация выполняется в отдельном процессе со своим подключением к БД
+            self._submit_job(f"Экспорт: {os.path.basename(filename)}", export_job,
+                             self.db.db_path, filename, cpu_bound=True, on_done=on_done)
+
+    def import_tasks(self):
+        """Импорт задач из JSON, NDJSON или CSV"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Файлы задач", "*.json *.ndjson *.jsonl *.csv *.gz"),
+                       ("All files", "*.*")],
+            title="Импорт задач"
+        )
+
+        if filename:
+            def on_done(job):
+                if job.state == JobState.DONE:
+                    report = job.result
+                    if report.rejected:
+                        messagebox.showwarning("Импорт", format_report(report))
+                    else:
+                        messagebox.showinfo("Импорт", format_report(report))
+                elif job.state == JobState.FAILED:
+                    messagebox.showerror("Ошибка", f"Ошибка импорта:\n{job.error}")
+                # После отмены уже записанные пакеты остаются в БД
+                self.refresh_tasks()
+
+            self._submit_job(f"Импорт: {os.path.basename(filename)}", import_job,
+                             self.import_service, filename, on_done=on_done)
 
     def run(self):
         """Запуск приложения"""
-        if self.task_service.process_reminders() > 0:
-            messagebox.showinfo("Напоминания", "У вас есть напоминания!")
-
-        self._setup_periodic_notifications()
+        # Первая проверка выполняется после отрисовки окна
+        self.worker.start()
+        self.scheduler.start()
         self.root.mainloop()
-
-    def _setup_periodic_notifications(self):
-        """Настройка периодических уведомлений"""
-        if self.notification_service.check_overdue_tasks():
-            self.show_overdue_notifications()
-        self.root.after(3600000, self._setup_periodic_notifications)
+        # Незавершенные задания отменяются при закрытии окна
+        self.jobs.shutdown()
+        self.worker.shutdown()
+
+    def _on_deadline(self):
+        """Наступила дата напоминания или срока: напоминания и просроченные задачи"""
+        # Рассылка напоминаний и поиск просроченных выполняются в пуле
+        self.worker.submit(self._check_deadlines, on_done=self._show_deadlines)
+
+    def _check_deadlines(self):
+        reminders_count = self.task_service.process_reminders()
+        return reminders_count, self.notification_service.check_overdue_tasks()
+
+    def _show_deadlines(self, result):
+        reminders_count, overdue_tasks = result
+        if reminders_count > 0:
+            messagebox.showinfo("Напоминания", "У вас есть напоминания!")
+        # После полуночи меняется признак просрочки в списке
+        self.refresh_tasks()
+        if overdue_tasks:
+            self._show_overdue_dialog(overdue_tasks)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,183 @@
+"""
+Виртуализированный список задач для CustomTkinter.
+
+Отрисовываются только строки, попадающие в видимую область: постоянный
+набор виджетов строк переиспользуется при прокрутке, а строка списка
+сопоставляется с задачей по индексу. Стоимость обновления зависит от
+высоты окна, а не от количества задач.
+"""
+
+import customtkinter as ctk
+
+# Высота строки в пикселях (все строки одинаковой высоты)
+ROW_HEIGHT = 44
+
+# Вертикальный отступ между строками
+ROW_PADDING = 3
+
+# Сколько строк прокручивает одно деление колеса мыши
+WHEEL_ROWS = 3
+
+
+class VirtualTaskList(ctk.CTkFrame):
+    """
+    Список строк задач с переиспользованием виджетов.
+
+    Строки задаются через set_rows() (у каждой строки должен быть атрибут
+    id). Внешний вид строки определяет format_row(row), возвращающая
+    цвет фона и список пар (текст, цвет текста) по колонкам. Щелчок по
+    строке вызывает on_select(task_id), двойной щелчок - on_activate(task_id).
+    """
+
+    def __init__(self, parent, columns, format_row, on_select=None, on_activate=None, **kwargs):
+        """
+        Args:
+            parent: Родительский виджет
+            columns: Список пар (ширина, жирный шрифт) для колонок
+            format_row: Функция row -> (цвет фона, [(текст, цвет), ...])
+            on_select: Обработчик выбора строки
+            on_activate: Обработчик двойного щелчка по строке
+        """
+        super().__init__(parent, **kwargs)
+        self.columns = columns
+        self.format_row = format_row
+        self.on_select = on_select
+        self.on_activate = on_activate
+
+        self.rows = []
+        self.selected_id = None
+        self._index_by_id = {}
+        self._first = 0
+
+        # Шрифты создаются один раз и общие для всех строк
+        self._fonts = {bold: ctk.CTkFont(size=13, weight="bold" if bold else "normal")
+                       for bold in (False, True)}
+
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self._viewport.pack(side="left", fill="both", expand=True)
+        # Размер области задает окно, а не количество строк в ней
+        self._viewport.grid_propagate(False)
+        self._viewport.grid_columnconfigure(0, weight=1)
+
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._scrollbar.pack(side="right", fill="y")
+
+        # Набор виджетов строк: (рамка, метки, последнее отрисованное состояние)
+        self._pool = []
+        self._viewport.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self._viewport)
+
+    def set_rows(self, rows):
+        """Заменяет строки списка. Выбор сохраняется, если задача осталась в списке."""
+        self.rows = list(rows)
+        self._index_by_id = {row.id: index for index, row in enumerate(self.rows)}
+        if self.selected_id not in self._index_by_id:
+            self.selected_id = None
+        self._scroll_to(self._first)
+
+    def index_of(self, task_id):
+        """Индекс строки задачи или None"""
+        return self._index_by_id.get(task_id)
+
+    def select(self, task_id):
+        """Выбирает строку задачи и прокручивает список к ней"""
+        index = self.index_of(task_id)
+        if index is None:
+            return
+        self.selected_id = task_id
+        visible = self._visible_count()
+        if index < self._first:
+            self._scroll_to(index)
+        elif index >= self._first + visible:
+            self._scroll_to(index - visible + 1)
+        else:
+            self._render()
+
+    def _visible_count(self):
+        height = self._viewport.winfo_height()
+        return max(1, height // (ROW_HEIGHT + 2 * ROW_PADDING))
+
+    def _on_resize(self, event=None):
+        # Набор строк только растет до числа видимых, старые виджеты не пересоздаются
+        visible = self._visible_count()
+        while len(self._pool) < visible:
+            self._pool.append(self._create_row(len(self._pool)))
+        self._scroll_to(self._first)
+
+    def _create_row(self, slot):
+        frame = ctk.CTkFrame(self._viewport, height=ROW_HEIGHT)
+        frame.grid_propagate(False)
+        labels = []
+        for column, (width, bold) in enumerate(self.columns):
+            label = ctk.CTkLabel(frame, text="", width=width, anchor="w", font=self._fonts[bold])
+            label.grid(row=0, column=column, padx=10, pady=8, sticky="w")
+            labels.append(label)
+
+        # Обработчики привязываются один раз: строка набора знает только свой номер
+        for widget in [frame] + labels:
+            widget.bind("<Button-1>", lambda e, s=slot: self._on_click(s, self.on_select))
+            widget.bind("<Double-Button-1>", lambda e, s=slot: self._on_click(s, self.on_activate))
+            self._bind_wheel(widget)
+        return [frame, labels, None]
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", lambda e: self._scroll_to(self._first - WHEEL_ROWS))
+        widget.bind("<Button-5>", lambda e: self._scroll_to(self._first + WHEEL_ROWS))
+
+    def _on_wheel(self, event):
+        self._scroll_to(self._first - WHEEL_ROWS if event.delta > 0 else self._first + WHEEL_ROWS)
+
+    def _on_scrollbar(self, action, value, unit=None):
+        visible = self._visible_count()
+        if action == "moveto":
+            self._scroll_to(round(float(value) * len(self.rows)))
+        elif action == "scroll":
+            step = visible if unit == "pages" else 1
+            self._scroll_to(self._first + int(value) * step)
+
+    def _on_click(self, slot, handler):
+        index = self._first + slot
+        if index >= len(self.rows):
+            return
+        self.selected_id = self.rows[index].id
+        self._render()
+        if handler:
+            handler(self.selected_id)
+
+    def _scroll_to(self, first):
+        visible = self._visible_count()
+        self._first = max(0, min(first, len(self.rows) - visible))
+        self._render()
+        if self.rows:
+            self._scrollbar.set(self._first / len(self.rows),
+                                min(1.0, (self._first + visible) / len(self.rows)))
+        else:
+            self._scrollbar.set(0.0, 1.0)
+
+    def _render(self):
+        """Отрисовывает видимые строки на виджетах из набора"""
+        visible = self._visible_count()
+        for slot, entry in enumerate(self._pool):
+            frame, labels, shown = entry
+            index = self._first + slot
+            if slot >= visible or index >= len(self.rows):
+                if shown is not None:
+                    frame.grid_remove()
+                    entry[2] = None
+                continue
+
+            row = self.rows[index]
+            bg_color, cells = self.format_row(row)
+            selected = row.id == self.selected_id
+            state = (bg_color, tuple(cells), selected)
+            if state == shown:
+                continue
+            # Виджеты перенастраиваются, только если содержимое строки на этом месте изменилось
+            frame.configure(fg_color=bg_color, border_width=2 if selected else 0,
+                            border_color="blue")
+            for label, (text, color) in zip(labels, cells):
+                label.configure(text=text, text_color=color)
+            if shown is None:
+                frame.grid(row=slot, column=0, sticky="ew", padx=5, pady=ROW_PADDING)
+            entry[2] = state
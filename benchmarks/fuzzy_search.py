@@ -0,0 +1,106 @@
+"""
+Замер скорости нечеткого поиска по индексу триграмм.
+
+Генерирует названия задач из псевдослов, строит TrigramIndex и
+выполняет запросы с опечатками (замена, пропуск и перестановка букв)
+по словам существующих названий.
+
+Использование:
+    python benchmarks/fuzzy_search.py                  # 500 тыс. задач, только индекс
+    python benchmarks/fuzzy_search.py --tasks 100000
+    python benchmarks/fuzzy_search.py --db             # через TaskService и SQLite
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.database import Database
+from core.fuzzy import TrigramIndex
+from core.models import Task, Status, Priority
+from services.task_service import TaskService
+
+SYLLABLES = ("ка ло ре ни ст ва ор ан ти ко ра пр от че ск ми до ле на по "
+             "ту за ме ры ви ол ет ги ду ба жи кр об ял ну се фа хо цы шу").split()
+
+LETTERS = "абвгдежзийклмнопрстуфхцчшщыэюя"
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list:
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_typo(rng: random.Random, word: str) -> str:
+    i = rng.randrange(1, len(word) - 1)
+    kind = rng.choice(('replace', 'delete', 'swap'))
+    if kind == 'replace':
+        return word[:i] + rng.choice(LETTERS) + word[i + 1:]
+    if kind == 'delete':
+        return word[:i] + word[i + 1:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=500_000)
+    parser.add_argument('--queries', type=int, default=300)
+    parser.add_argument('--vocabulary', type=int, default=20_000)
+    parser.add_argument('--db', action='store_true', help='искать через TaskService и SQLite')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    titles = [' '.join(rng.choice(vocabulary) for _ in range(rng.randint(2, 5)))
+              for _ in range(args.tasks)]
+
+    started = time.perf_counter()
+    if args.db:
+        temp_dir = tempfile.TemporaryDirectory()
+        db = Database(os.path.join(temp_dir.name, 'bench.db'))
+        service = TaskService(db)
+        service.create_tasks(Task(0, title, '', Priority.MEDIUM, Status.PLANNED,
+                                  '01.01.2025', '01.02.2025') for title in titles)
+        service.fuzzy_search('прогрев')
+        search = lambda text: [task.id for task in service.fuzzy_search(text)]
+    else:
+        index = TrigramIndex(enumerate(titles, start=1))
+        search = lambda text: [task_id for task_id, _ in index.search(text)]
+    print(f"Подготовка {args.tasks} задач: {time.perf_counter() - started:.1f} с")
+
+    timings, found = [], 0
+    for _ in range(args.queries):
+        task_id = rng.randrange(1, args.tasks + 1)
+        words = titles[task_id - 1].split()
+        start = rng.randrange(len(words))
+        query_words = words[start:start + 2]
+        query = ' '.join(make_typo(rng, word) if len(word) > 3 else word for word in query_words)
+
+        started = time.perf_counter()
+        result = search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+        # Слова запроса могут встречаться и в других задачах, поэтому
+        # считаем найденным любое название с исходными словами
+        found += any(set(query_words) <= set(titles[i - 1].split()) for i in result)
+
+    timings.sort()
+    print(f"Запросов: {args.queries}, найдено задач с исходными словами: {found}")
+    print(f"Время запроса, мс: медиана {statistics.median(timings):.1f}, "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:.1f}, максимум {timings[-1]:.1f}")
+
+    if args.db:
+        db.close()
+        temp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
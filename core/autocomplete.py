@@ -0,0 +1,157 @@
+"""
+Модуль префиксного индекса слов названий для поиска по мере ввода.
+
+Содержит класс PrefixIndex: отсортированный список различных слов
+названий и для каждого слова - множество ID задач. Слова с нужным
+префиксом занимают непрерывный диапазон списка и находятся через
+bisect за O(log n), поэтому ответ на каждое нажатие клавиши не
+зависит от общего числа задач.
+"""
+
+import re
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+_WORD_RE = re.compile(r'\w+')
+
+# Символ больше любой буквы: [prefix, prefix + _MAX_CHAR) - все слова с префиксом
+_MAX_CHAR = '\U0010ffff'
+
+
+def title_words(text: str) -> FrozenSet[str]:
+    """
+    Возвращает нормализованные слова строки.
+
+    Регистр приводится к нижнему, "ё" заменяется на "е".
+
+    Args:
+        text: Название задачи или строка поиска
+
+    Returns:
+        Множество слов
+    """
+    return frozenset(_WORD_RE.findall(text.lower().replace('ё', 'е')))
+
+
+class PrefixIndex:
+    """
+    Префиксный индекс слов названий задач.
+
+    Индекс строится один раз и далее обновляется по одной задаче через
+    add и remove. Новое слово вставляется в отсортированный список через
+    insort; слово, которое больше не встречается ни в одном названии,
+    удаляется из списка.
+
+    Методы потокобезопасны.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, str]] = ()):
+        """
+        Создает индекс.
+
+        Args:
+            items: Пары (ID задачи, название) для начального заполнения
+        """
+        self._ids_by_word: Dict[str, Set[int]] = {}
+        self._words_by_id: Dict[int, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+        # При начальном заполнении список сортируется один раз
+        for task_id, title in items:
+            words = title_words(title)
+            self._words_by_id[task_id] = words
+            for word in words:
+                self._ids_by_word.setdefault(word, set()).add(task_id)
+        self._words: List[str] = sorted(self._ids_by_word)
+
+    def __len__(self) -> int:
+        return len(self._words_by_id)
+
+    def add(self, task_id: int, title: str) -> None:
+        """Добавляет задачу или обновляет слова её названия."""
+        words = title_words(title)
+        with self._lock:
+            old = self._words_by_id.get(task_id, frozenset())
+            if old == words:
+                return
+            self._words_by_id[task_id] = words
+            self._unlink(task_id, old - words)
+            for word in words - old:
+                ids = self._ids_by_word.get(word)
+                if ids is None:
+                    ids = self._ids_by_word[word] = set()
+                    insort(self._words, word)
+                ids.add(task_id)
+
+    def remove(self, task_id: int) -> None:
+        """Удаляет задачу из индекса (если она там есть)."""
+        with self._lock:
+            self._unlink(task_id, self._words_by_id.pop(task_id, frozenset()))
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """
+        Возвращает слова названий, начинающиеся с prefix.
+
+        Args:
+            prefix: Начало слова
+            limit: Максимальное количество слов
+
+        Returns:
+            Слова в алфавитном порядке
+        """
+        words = title_words(prefix)
+        if len(words) != 1:
+            return []
+        with self._lock:
+            lo, hi = self._range(next(iter(words)))
+            return self._words[lo:min(hi, lo + limit)]
+
+    def search(self, text: str, limit: int = 500) -> List[int]:
+        """
+        Ищет задачи, в названии которых есть слова с каждым из префиксов запроса.
+
+        Кандидаты берутся по самому редкому префиксу (самому узкому
+        диапазону слов), остальные префиксы проверяются по словам
+        кандидата. Поиск останавливается, набрав limit задач.
+
+        Args:
+            text: Строка поиска ("отч мар" найдет "Отчет за март")
+            limit: Максимальное количество задач
+
+        Returns:
+            Список ID задач по возрастанию (не больше limit)
+        """
+        prefixes = title_words(text)
+        if not prefixes:
+            return []
+
+        with self._lock:
+            ranges = {prefix: self._range(prefix) for prefix in prefixes}
+            rarest = min(prefixes, key=lambda p: ranges[p][1] - ranges[p][0])
+            lo, hi = ranges[rarest]
+            others = [p for p in prefixes if p != rarest]
+
+            found: Set[int] = set()
+            for word in self._words[lo:hi]:
+                for task_id in self._ids_by_word[word]:
+                    if task_id in found:
+                        continue
+                    words = self._words_by_id[task_id]
+                    if all(any(w.startswith(p) for w in words) for p in others):
+                        found.add(task_id)
+                        if len(found) >= limit:
+                            return sorted(found)
+            return sorted(found)
+
+    def _range(self, prefix: str) -> Tuple[int, int]:
+        return (bisect_left(self._words, prefix),
+                bisect_left(self._words, prefix + _MAX_CHAR))
+
+    def _unlink(self, task_id: int, words: Iterable[str]) -> None:
+        for word in words:
+            ids = self._ids_by_word[word]
+            ids.discard(task_id)
+            if not ids:
+                del self._ids_by_word[word]
+                del self._words[bisect_left(self._words, word)]
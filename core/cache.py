@@ -0,0 +1,196 @@
+"""
+Модуль кэша задач в памяти процесса.
+
+Содержит класс TaskCache: карту идентичности задач (ID -> задача) и
+кэш результатов запросов, оба с ограничением размера и вытеснением
+давно не использованных записей (LRU). Кэш заполняет и обновляет
+TaskService при чтении и записи, а изменения БД другими подключениями
+обнаруживаются по PRAGMA data_version.
+"""
+
+import threading
+from collections import OrderedDict
+from copy import copy
+from typing import Any, Dict, Hashable, Optional, Tuple
+from core.models import Task
+
+# Ограничения размера по умолчанию
+DEFAULT_MAX_TASKS = 10_000
+DEFAULT_MAX_QUERIES = 64
+# Суммарное число задач и строк во всех кэшированных результатах запросов
+DEFAULT_MAX_QUERY_ROWS = 10_000
+
+
+class TaskCache:
+    """
+    Кэш задач и результатов запросов с LRU-вытеснением.
+
+    Задачи хранятся и выдаются копиями: изменение полученного объекта
+    (например, в диалоге редактирования до сохранения) не меняет кэш.
+    Результаты запросов хранятся кортежами и сбрасываются целиком при
+    любой записи, поэтому не бывают устаревшими относительно записей
+    этого процесса. Их объем ограничен суммарным числом строк: результат
+    больше max_query_rows (например, все задачи большой БД) не
+    кэшируется вовсе.
+
+    Каждое сбрасывание увеличивает generation. Результат запроса,
+    прочитанный до сбрасывания, не попадает в кэш после него.
+
+    Методы потокобезопасны.
+
+    Атрибуты:
+        max_tasks: Максимальное количество задач в карте идентичности
+        max_queries: Максимальное количество кэшированных запросов
+        max_query_rows: Максимальное суммарное число строк в результатах запросов
+        hits: Количество чтений, обслуженных кэшем
+        misses: Количество чтений, потребовавших обращения к БД
+    """
+
+    def __init__(self, max_tasks: int = DEFAULT_MAX_TASKS, max_queries: int = DEFAULT_MAX_QUERIES,
+                 max_query_rows: int = DEFAULT_MAX_QUERY_ROWS):
+        self.max_tasks = max_tasks
+        self.max_queries = max_queries
+        self.max_query_rows = max_query_rows
+        self.hits = 0
+        self.misses = 0
+        self._tasks: 'OrderedDict[int, Task]' = OrderedDict()
+        self._queries: 'OrderedDict[Hashable, tuple]' = OrderedDict()
+        self._query_rows = 0
+        self._generation = 0
+        # Поток -> (data_version, всего записей процесса, записей потока) на момент проверки
+        self._versions: Dict[int, Tuple[int, int, int]] = {}
+        # Зафиксированные записи процесса: всего и по потокам
+        self._writes = 0
+        self._thread_writes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Номер поколения: меняется при каждом сбросе результатов запросов."""
+        return self._generation
+
+    def get(self, task_id: int) -> Optional[Task]:
+        """Возвращает копию задачи из кэша или None."""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None:
+                self.misses += 1
+                return None
+            self._tasks.move_to_end(task_id)
+            self.hits += 1
+            return copy(task)
+
+    def put(self, task: Task) -> None:
+        """Сохраняет копию задачи, вытесняя самую давнюю при переполнении."""
+        with self._lock:
+            self._tasks[task.id] = copy(task)
+            self._tasks.move_to_end(task.id)
+            while len(self._tasks) > self.max_tasks:
+                self._tasks.popitem(last=False)
+
+    def discard(self, task_id: int) -> None:
+        """Удаляет задачу из кэша."""
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
+    def get_query(self, key: Hashable) -> Optional[tuple]:
+        """Возвращает кэшированный результат запроса или None."""
+        with self._lock:
+            result = self._queries.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self._queries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put_query(self, key: Hashable, result: Any, generation: int) -> tuple:
+        """
+        Сохраняет результат запроса, если с его чтения кэш не сбрасывался
+        и результат не длиннее max_query_rows.
+
+        Args:
+            key: Ключ запроса
+            result: Последовательность задач или строк
+            generation: Значение generation на момент начала чтения
+
+        Returns:
+            Результат в виде кортежа
+        """
+        result = tuple(result)
+        if len(result) > self.max_query_rows:
+            return result
+        with self._lock:
+            if generation == self._generation:
+                previous = self._queries.pop(key, None)
+                if previous is not None:
+                    self._query_rows -= len(previous)
+                self._queries[key] = result
+                self._query_rows += len(result)
+                while len(self._queries) > self.max_queries or self._query_rows > self.max_query_rows:
+                    _, evicted = self._queries.popitem(last=False)
+                    self._query_rows -= len(evicted)
+        return result
+
+    def invalidate_queries(self) -> None:
+        """Сбрасывает все результаты запросов (вызывается при каждой записи)."""
+        with self._lock:
+            self._queries.clear()
+            self._query_rows = 0
+            self._generation += 1
+
+    def clear(self) -> None:
+        """Сбрасывает весь кэш."""
+        with self._lock:
+            self._tasks.clear()
+            self._queries.clear()
+            self._query_rows = 0
+            self._generation += 1
+
+    def note_write(self, thread_id: int) -> None:
+        """
+        Учитывает зафиксированную запись этого процесса.
+
+        Запись потока меняет PRAGMA data_version подключений всех
+        остальных потоков, но не его собственного.
+
+        Args:
+            thread_id: Идентификатор потока, выполнившего запись
+        """
+        with self._lock:
+            self._writes += 1
+            self._thread_writes[thread_id] = self._thread_writes.get(thread_id, 0) + 1
+
+    def check_version(self, thread_id: int, version: int) -> bool:
+        """
+        Сверяет PRAGMA data_version подключения потока с последним известным.
+
+        Значение растет, когда БД изменило другое подключение: другой
+        процесс или другой поток этого процесса. Записи других потоков
+        процесса уже отражены в кэше (note_write), поэтому внешней
+        считается только прибавка сверх их числа - тогда кэш сбрасывается
+        целиком. Первая проверка потока лишь запоминает точку отсчета.
+
+        SQLite может объединить несколько фиксаций в одно изменение версии,
+        поэтому внешняя запись, пришедшаяся на тот же промежуток, что и
+        записи других потоков процесса, не отличима от них и не замечается.
+
+        Args:
+            thread_id: Идентификатор потока (у каждого потока свое подключение)
+            version: Текущее значение PRAGMA data_version этого подключения
+
+        Returns:
+            True, если обнаружены внешние изменения (кэш сброшен)
+        """
+        with self._lock:
+            previous = self._versions.get(thread_id)
+            own = self._thread_writes.get(thread_id, 0)
+            self._versions[thread_id] = (version, self._writes, own)
+            if previous is None:
+                return False
+            previous_version, previous_writes, previous_own = previous
+            expected = (self._writes - previous_writes) - (own - previous_own)
+            if version - previous_version <= expected:
+                return False
+        self.clear()
+        return True
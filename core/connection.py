@@ -0,0 +1,161 @@
+"""
+Модуль управления подключениями к SQLite.
+
+Содержит класс ConnectionManager, который хранит долгоживущие
+подключения к базе данных (по одному на поток) вместо открытия
+нового подключения при каждом запросе.
+"""
+
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from itertools import count
+from typing import Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """
+    Менеджер долгоживущих подключений к SQLite.
+
+    Каждый поток получает собственное подключение, которое создается
+    при первом обращении и переиспользуется во всех последующих
+    запросах. Благодаря этому не тратится время на открытие файла,
+    разбор схемы и прогрев кэша страниц при каждом вызове.
+
+    Подключения открываются в режиме autocommit (isolation_level=None),
+    поэтому границы транзакций задаются явно через transaction().
+
+    Атрибуты:
+        db_path: Путь к файлу базы данных SQLite
+        timeout: Время ожидания блокировки БД в секундах
+    """
+
+    def __init__(self, db_path: str, timeout: float = 30.0):
+        """
+        Инициализирует менеджер подключений.
+
+        Args:
+            db_path: Путь к файлу БД
+            timeout: Время ожидания блокировки в секундах (по умолчанию 30)
+        """
+        self.db_path = db_path
+        self.timeout = timeout
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        # Счетчик для уникальных имен точек сохранения вложенных транзакций
+        self._savepoints = count(1)
+
+    def _open(self) -> sqlite3.Connection:
+        """
+        Открывает и настраивает новое подключение.
+
+        Включает журнал WAL (читатели не блокируют писателя) и
+        synchronous=NORMAL, достаточный для WAL-режима.
+
+        Returns:
+            Настроенное подключение к БД
+        """
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Возвращает подключение текущего потока, создавая его при необходимости.
+
+        Returns:
+            Подключение к БД, закрепленное за текущим потоком
+        """
+        thread_id = threading.get_ident()
+        conn = self._connections.get(thread_id)
+        if conn is None:
+            conn = self._open()
+            with self._lock:
+                self._connections[thread_id] = conn
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Контекстный менеджер транзакции на подключении текущего потока.
+
+        Фиксирует изменения при успешном выходе из блока и откатывает
+        их при исключении. Если транзакция уже открыта, блок выполняется
+        в точке сохранения (SAVEPOINT) внутри неё: при исключении
+        откатываются только изменения блока, а фиксация выполняется
+        внешним блоком.
+
+        Yields:
+            Подключение к БД текущего потока
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            name = f'sp_{next(self._savepoints)}'
+            conn.execute(f'SAVEPOINT {name}')
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute(f'ROLLBACK TO {name}')
+                    conn.execute(f'RELEASE {name}')
+                raise
+            else:
+                conn.execute(f'RELEASE {name}')
+            return
+
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+
+    @contextmanager
+    def read_transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Контекстный менеджер транзакции чтения.
+
+        Все запросы блока видят один согласованный снимок БД (в режиме WAL
+        параллельные записи других подключений не видны до конца блока).
+        Транзакция завершается COMMIT при любом выходе из блока, в том
+        числе при досрочном закрытии генератора, читающего данные.
+
+        Yields:
+            Подключение к БД текущего потока
+        """
+        conn = self.connection()
+        if conn.in_transaction:
+            yield conn
+            return
+
+        conn.execute('BEGIN')
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.execute('COMMIT')
+
+    def close(self) -> None:
+        """
+        Закрывает все открытые подключения.
+
+        После закрытия менеджер остается пригодным к работе: при
+        следующем обращении подключение будет открыто заново.
+        """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Ошибка закрытия подключения: {e}")
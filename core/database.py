@@ -5,13 +5,104 @@
 создание, чтение, обновление и удаление задач.
 """
 
+import io
+import os
 import sqlite3
 import logging
-from typing import List, Optional
-from core.models import Task, Status
+from collections import namedtuple
+from contextlib import contextmanager
+from dataclasses import replace
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+from core import migrations
+from core.connection import ConnectionManager
+from core.export import ProgressCallback, detect_format, open_export_file, write_tasks
+from core.dates import to_storage_date, from_storage_date, today_storage
+from core.models import Task, Status, Priority
+from core.query import SearchHit, TaskPage, TaskQuery, decode_cursor, encode_cursor
 
 logger = logging.getLogger(__name__)
 
+# Порядок столбцов, в котором задачи читаются из таблицы tasks
+TASK_COLUMNS = ('id, title, description, priority, status, created_date, due_date, '
+                'completed_date, reminder_date, reminder_sent, version')
+
+INSERT_TASK_SQL = '''
+    INSERT INTO tasks (title, description, priority, status, created_date, due_date, completed_date, reminder_date, reminder_sent)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+UPDATE_TASK_SQL = '''
+    UPDATE tasks
+    SET title=?, description=?, priority=?, status=?,
+        due_date=?, completed_date=?, reminder_date=?, reminder_sent=?,
+        version=version+1
+    WHERE id=? AND version=?
+'''
+
+# Переходы состояния - один условный UPDATE без предварительного чтения.
+# Строка не меняется, если задача уже в нужном состоянии.
+SET_STATUS_SQL = f'''
+    UPDATE tasks
+    SET status=?,
+        completed_date=CASE WHEN ?='{Status.COMPLETED.value}' THEN COALESCE(completed_date, ?) END,
+        version=version+1
+    WHERE id=? AND status<>?
+'''
+
+SET_REMINDER_SENT_SQL = '''
+    UPDATE tasks
+    SET reminder_sent=1, version=version+1
+    WHERE id=? AND reminder_sent=0
+'''
+
+# Напоминания к отправке: условие reminder_sent = 0 совпадает с условием
+# частичного индекса idx_tasks_reminder_pending, поэтому SQLite использует его
+DUE_REMINDERS_SQL = f'''
+    SELECT {TASK_COLUMNS} FROM tasks
+    WHERE reminder_sent = 0 AND reminder_date <= ? AND status <> '{Status.COMPLETED.value}'
+    ORDER BY reminder_date, id
+'''
+
+# Сколько ID передается в одном условии IN (...): ниже лимита параметров SQLite
+ID_BATCH_SIZE = 500
+
+# RETURNING поддерживается начиная с SQLite 3.35
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# Те же столбцы с префиксом таблицы - для запросов с JOIN индекса FTS5
+TASK_COLUMNS_QUALIFIED = ', '.join(f'tasks.{name.strip()}' for name in TASK_COLUMNS.split(','))
+
+# Веса bm25 для столбцов индекса (title, description): совпадение в названии важнее
+SEARCH_WEIGHTS = (10.0, 1.0)
+SEARCH_RANK_SQL = f'bm25(tasks_fts, {SEARCH_WEIGHTS[0]}, {SEARCH_WEIGHTS[1]})'
+
+_STATUS_BY_VALUE = {status.value: status for status in Status}
+_PRIORITY_BY_VALUE = {priority.value: priority for priority in Priority}
+
+# Столбцы, доступные для проекции: имя -> (SQL-выражение, преобразователь значения).
+# overdue - вычисляемый признак просрочки, параметр выражения - текущая дата.
+PROJECTION_COLUMNS = {
+    'id': ('id', None),
+    'title': ('title', None),
+    'description': ('description', None),
+    'priority': ('priority', _PRIORITY_BY_VALUE.__getitem__),
+    'status': ('status', _STATUS_BY_VALUE.__getitem__),
+    'created_date': ('created_date', from_storage_date),
+    'due_date': ('due_date', from_storage_date),
+    'completed_date': ('completed_date', from_storage_date),
+    'reminder_date': ('reminder_date', from_storage_date),
+    'reminder_sent': ('reminder_sent', bool),
+    'version': ('version', None),
+    'overdue': (f"(status <> '{Status.COMPLETED.value}' AND due_date <= ?)", bool),
+}
+
+
+@lru_cache(maxsize=32)
+def _row_type(columns: Tuple[str, ...]) -> type:
+    """Возвращает (и кэширует) класс namedtuple для набора столбцов проекции."""
+    return namedtuple('TaskRow', columns)
+
 
 class Database:
     """
@@ -19,10 +110,18 @@ class Database:
     
     Инкапсулирует все операции с БД, предоставляя высокоуровневый
     интерфейс для работы с задачами. Автоматически создает таблицу
-    при первом обращении.
+    и обновляет схему при первом обращении.
+
+    Подключения к БД долгоживущие (по одному на поток) и управляются
+    ConnectionManager. Для освобождения ресурсов используйте close()
+    или контекстный менеджер:
+
+        with Database("data/tasks.db") as db:
+            tasks = db.get_all_tasks()
     
     Атрибуты:
         db_path: Путь к файлу базы данных SQLite
+        has_search_index: Есть ли полнотекстовый индекс FTS5 (tasks_fts)
     """
     
     def __init__(self, db_path: str = "tasks.db"):
@@ -33,41 +132,133 @@ class Database:
             db_path: Путь к файлу БД (по умолчанию "tasks.db")
         """
         self.db_path = db_path
+        self._connections = ConnectionManager(db_path)
+        self.has_search_index = False
         self._init_db()
 
+    def __enter__(self) -> 'Database':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Закрывает все подключения к базе данных.
+
+        При следующем обращении к БД подключение будет открыто заново.
+        """
+        self._connections.close()
+
     def _init_db(self) -> None:
         """
-        Создает таблицу tasks в БД, если она не существует.
+        Приводит схему БД к актуальной версии.
         
-        Вызывается автоматически при инициализации класса.
-        Устанавливает ограничения на данные через CHECK constraints.
+        Вызывается автоматически при инициализации класса. Создает
+        таблицу tasks (с ограничениями через CHECK constraints) и
+        применяет недостающие миграции из core.migrations.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS tasks (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        title TEXT NOT NULL CHECK(length(title) <= 500),
-                        description TEXT CHECK(description IS NULL OR length(description) <= 2000),
-                        priority TEXT NOT NULL CHECK(priority IN ('низкий', 'средний', 'высокий')),
-                        status TEXT NOT NULL CHECK(status IN ('Запланирована', 'В работе', 'Выполнена')),
-                        created_date TEXT NOT NULL,
-                        due_date TEXT NOT NULL,
-                        completed_date TEXT,
-                        reminder_date TEXT,
-                        reminder_sent BOOLEAN DEFAULT 0,
-                        CHECK (due_date IS NULL OR due_date GLOB '[0-9][0-9].[0-9][0-9].[0-9][0-9][0-9][0-9]')
-                )
-                ''')
-                conn.commit()
+            conn = self._connections.connection()
+            migrations.migrate(conn)
+            self.has_search_index = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'tasks_fts'").fetchone() is not None
         except sqlite3.Error as e:
             logger.error(f"Ошибка инициализации БД: {e}")
             raise
 
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Объединяет несколько операций в одну транзакцию.
+
+        Все методы, вызванные в блоке из того же потока, используют одно
+        подключение и выполняются в общей транзакции, которая фиксируется
+        один раз при выходе из блока и откатывается при исключении.
+        Вложенные блоки становятся точками сохранения (SAVEPOINT):
+
+            with db.transaction():
+                db.set_status(1, Status.COMPLETED, "01.01.2025")
+                db.set_status(2, Status.COMPLETED, "01.01.2025")
+
+        Ошибки отдельных методов внутри блока (например, update_task,
+        вернувший False) откатывают только изменения этого метода.
+
+        Raises:
+            sqlite3.Error: Если транзакцию не удалось начать или зафиксировать
+        """
+        with self._connections.transaction():
+            yield
+
+    def data_version(self) -> int:
+        """
+        Возвращает PRAGMA data_version подключения текущего потока.
+
+        Значение меняется, только если БД изменило другое подключение,
+        и читается без обращения к диску. Используется для проверки
+        актуальности кэша задач.
+
+        Returns:
+            Номер версии данных или -1 при ошибке
+        """
+        try:
+            return self._connections.connection().execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка чтения data_version: {e}")
+            return -1
+
+    @staticmethod
+    def _row_to_task(row: tuple) -> Task:
+        """
+        Преобразует строку результата запроса в объект Task.
+
+        Даты переводятся из формата хранения ГГГГ-ММ-ДД в ДД.ММ.ГГГГ.
+
+        Args:
+            row: Кортеж значений в порядке TASK_COLUMNS
+
+        Returns:
+            Объект Task
+        """
+        return Task.from_dict({
+            'id': row[0],
+            'title': row[1],
+            'description': row[2],
+            'priority': row[3],
+            'status': row[4],
+            'created_date': from_storage_date(row[5]),
+            'due_date': from_storage_date(row[6]),
+            'completed_date': from_storage_date(row[7]),
+            'reminder_date': from_storage_date(row[8]),
+            'reminder_sent': bool(row[9]),
+            'version': row[10]
+        })
+
+    @staticmethod
+    def _insert_params(task: Task) -> tuple:
+        """Возвращает параметры запроса INSERT для задачи."""
+        return (
+            task.title, task.description, task.priority.value,
+            task.status.value, to_storage_date(task.created_date),
+            to_storage_date(task.due_date), to_storage_date(task.completed_date),
+            to_storage_date(task.reminder_date), task.reminder_sent
+        )
+
+    @staticmethod
+    def _update_params(task: Task) -> tuple:
+        """Возвращает параметры запроса UPDATE для задачи."""
+        return (
+            task.title, task.description, task.priority.value,
+            task.status.value, to_storage_date(task.due_date),
+            to_storage_date(task.completed_date), to_storage_date(task.reminder_date),
+            task.reminder_sent, task.id, task.version
+        )
+
     def create_task(self, task: Task) -> int:
         """
         Создает новую задачу в базе данных.
+
+        Даты задачи (ДД.ММ.ГГГГ) сохраняются в формате ГГГГ-ММ-ДД.
         
         Args:
             task: Объект Task для сохранения
@@ -79,16 +270,8 @@ class Database:
             sqlite3.Error: При ошибке работы с БД
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO tasks (title, description, priority, status, created_date, due_date, completed_date, reminder_date, reminder_sent)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    task.title, task.description, task.priority.value,
-                    task.status.value, task.created_date, task.due_date,
-                    task.completed_date, task.reminder_date, task.reminder_sent
-                ))
+            with self._connections.transaction() as conn:
+                cursor = conn.execute(INSERT_TASK_SQL, self._insert_params(task))
                 return cursor.lastrowid
         except sqlite3.Error as e:
             logger.error(f"Ошибка создания задачи: {e}")
@@ -102,59 +285,353 @@ class Database:
             Список объектов Task. Возвращает пустой список при ошибке.
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM tasks')
-                tasks = []
-                for row in cursor.fetchall():
-                    task_dict = {
-                        'id': row[0],
-                        'title': row[1],
-                        'description': row[2],
-                        'priority': row[3],
-                        'status': row[4],
-                        'created_date': row[5],
-                        'due_date': row[6],
-                        'completed_date': row[7],
-                        'reminder_date': row[8],
-                        'reminder_sent': bool(row[9])
-                    }
-                    tasks.append(Task.from_dict(task_dict))
-                return tasks
+            cursor = self._connections.connection().execute(f'SELECT {TASK_COLUMNS} FROM tasks')
+            return [self._row_to_task(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
             logger.error(f"Ошибка получения задач: {e}")
             return []
 
+    def _select_sql(self, query: TaskQuery, limit: Optional[int] = None,
+                    columns: str = TASK_COLUMNS, today: Optional[str] = None) -> Tuple[str, list]:
+        """
+        Строит запрос SELECT задач по описанию TaskQuery.
+
+        Args:
+            query: Фильтры и сортировка
+            limit: Максимальное количество задач (None - без ограничения)
+            columns: Список выбираемых столбцов (по умолчанию TASK_COLUMNS)
+            today: Текущая дата ГГГГ-ММ-ДД для условия просрочки (None - системная)
+
+        Returns:
+            Кортеж (текст запроса, параметры)
+        """
+        where, params = query.where_clause(today or today_storage(), self.has_search_index)
+        sql = f'SELECT {columns} FROM tasks'
+        if where:
+            sql += f' WHERE {where}'
+        sql += f' ORDER BY {query.order_clause()}'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return sql, params
+
+    def query_tasks(self, query: TaskQuery, limit: Optional[int] = None,
+                    today: Optional[str] = None) -> List[Task]:
+        """
+        Получает задачи, отфильтрованные и отсортированные на стороне SQLite.
+
+        Фильтры из TaskQuery компилируются в один параметризованный запрос,
+        который использует индексы по статусу, приоритету и сроку, поэтому
+        читаются только подходящие строки.
+
+        Args:
+            query: Фильтры и сортировка
+            limit: Максимальное количество задач (None - без ограничения)
+            today: Текущая дата ГГГГ-ММ-ДД для условия просрочки (None - системная)
+
+        Returns:
+            Список задач. Возвращает пустой список при ошибке.
+        """
+        sql, params = self._select_sql(query, limit, today=today)
+        try:
+            cursor = self._connections.connection().execute(sql, params)
+            return [self._row_to_task(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка выполнения запроса задач: {e}")
+            return []
+
+    def iter_tasks(self, query: Optional[TaskQuery] = None, batch_size: int = 500) -> Iterator[Task]:
+        """
+        Последовательно выдает задачи, читая их из БД порциями.
+
+        Строки читаются через fetchmany внутри одной транзакции чтения,
+        поэтому все задачи берутся из одного согласованного снимка, а в
+        памяти одновременно находится не больше batch_size строк.
+
+        Транзакция остается открытой, пока генератор не исчерпан или не
+        закрыт. Записи того же потока в это время выполняются в её рамках.
+
+        Args:
+            query: Фильтры и сортировка (None - все задачи по id)
+            batch_size: Количество строк, читаемых за один fetchmany
+
+        Yields:
+            Объекты Task
+
+        Raises:
+            sqlite3.Error: При ошибке работы с БД
+        """
+        sql, params = self._select_sql(query or TaskQuery())
+        with self._connections.read_transaction() as conn:
+            cursor = conn.execute(sql, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield self._row_to_task(row)
+            finally:
+                cursor.close()
+
+    def select_task_rows(self, columns: Sequence[str], query: Optional[TaskQuery] = None,
+                         limit: Optional[int] = None) -> List[tuple]:
+        """
+        Получает только указанные столбцы задач (проекция).
+
+        В отличие от query_tasks не читает лишние столбцы (например,
+        описание до 2000 символов) и не создает объекты Task. Каждая
+        строка - неизменяемый namedtuple с доступом по имени столбца:
+        row.id, row.title и т.д. Статус и приоритет возвращаются как
+        Status и Priority, даты - в формате ДД.ММ.ГГГГ.
+
+        Args:
+            columns: Имена столбцов из PROJECTION_COLUMNS
+            query: Фильтры и сортировка (None - все задачи по id)
+            limit: Максимальное количество строк (None - без ограничения)
+
+        Returns:
+            Список строк-namedtuple. Возвращает пустой список при ошибке БД.
+
+        Raises:
+            ValueError: Если запрошен неизвестный столбец
+        """
+        columns = tuple(columns)
+        unknown = [name for name in columns if name not in PROJECTION_COLUMNS]
+        if unknown:
+            raise ValueError(f"Неизвестные столбцы: {', '.join(unknown)}")
+
+        today = today_storage()
+        expressions = [PROJECTION_COLUMNS[name][0] for name in columns]
+        select_params = [today for name in columns if name == 'overdue']
+        sql, params = self._select_sql(query or TaskQuery(), limit, ', '.join(expressions))
+
+        row_type = _row_type(columns)
+        converters = [PROJECTION_COLUMNS[name][1] for name in columns]
+        try:
+            cursor = self._connections.connection().execute(sql, select_params + params)
+            return [
+                row_type._make([value if convert is None or value is None else convert(value)
+                                for convert, value in zip(converters, row)])
+                for row in cursor.fetchall()
+            ]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка выборки столбцов задач: {e}")
+            return []
+
+    def search_tasks(self, match: str, limit: Optional[int] = None) -> List[Task]:
+        """
+        Ищет задачи по полнотекстовому индексу FTS5.
+
+        Задачи упорядочены по релевантности bm25 (совпадения в названии
+        весят больше, чем в описании), поэтому первые limit результатов -
+        лучшие. Просматриваются только задачи, содержащие слова запроса.
+
+        Args:
+            match: Выражение MATCH (см. core.query.fts_match_expression)
+            limit: Максимальное количество задач (None - без ограничения)
+
+        Returns:
+            Список задач. Возвращает пустой список при ошибке.
+        """
+        sql = (f'SELECT {TASK_COLUMNS_QUALIFIED} FROM tasks_fts '
+               f'JOIN tasks ON tasks.id = tasks_fts.rowid '
+               f'WHERE tasks_fts MATCH ? ORDER BY {SEARCH_RANK_SQL}')
+        params = [match]
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        try:
+            cursor = self._connections.connection().execute(sql, params)
+            return [self._row_to_task(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка полнотекстового поиска: {e}")
+            return []
+
+    def search_snippets(self, match: str, limit: int = 20, start: str = '[', end: str = ']',
+                        tokens: int = 12) -> List[SearchHit]:
+        """
+        Ищет задачи по индексу FTS5 и возвращает выделенные фрагменты.
+
+        Args:
+            match: Выражение MATCH (см. core.query.fts_match_expression)
+            limit: Максимальное количество результатов
+            start: Маркер начала совпадения
+            end: Маркер конца совпадения
+            tokens: Длина фрагмента описания в словах
+
+        Returns:
+            Список SearchHit по убыванию релевантности. Пустой список при ошибке.
+        """
+        sql = (f"SELECT rowid, highlight(tasks_fts, 0, ?, ?), "
+               f"snippet(tasks_fts, 1, ?, ?, '…', ?), {SEARCH_RANK_SQL} AS rank "
+               f"FROM tasks_fts WHERE tasks_fts MATCH ? ORDER BY rank LIMIT ?")
+        try:
+            cursor = self._connections.connection().execute(
+                sql, (start, end, start, end, tokens, match, limit))
+            return [SearchHit._make(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка полнотекстового поиска: {e}")
+            return []
+
+    def get_tasks_page(self, order_by: str = 'id', after_key: Optional[str] = None,
+                       limit: int = 50, query: Optional[TaskQuery] = None) -> TaskPage:
+        """
+        Получает одну страницу задач с пагинацией по ключу (keyset).
+
+        Вместо OFFSET используется условие "после последней задачи
+        предыдущей страницы" по паре (ключ сортировки, id), поэтому
+        глубокие страницы читаются так же быстро, как первая.
+
+        Args:
+            order_by: Ключ сортировки из core.query.ORDERINGS
+            after_key: Курсор из next_key предыдущей страницы (None - первая страница)
+            limit: Размер страницы
+            query: Дополнительные фильтры (их сортировка заменяется на order_by)
+
+        Returns:
+            TaskPage со списком задач и курсором следующей страницы.
+            Возвращает пустую страницу при ошибке БД.
+
+        Raises:
+            ValueError: Если курсор поврежден или выдан для другой сортировки
+        """
+        query = replace(query or TaskQuery(), order_by=order_by)
+        where, params = query.where_clause(today_storage(), self.has_search_index)
+        conditions = [where] if where else []
+
+        if after_key is not None:
+            keyset, keyset_params = query.keyset_clause(*decode_cursor(after_key, order_by))
+            conditions.append(keyset)
+            params.extend(keyset_params)
+
+        sql = f'SELECT {TASK_COLUMNS}, {query.sort_expression()} FROM tasks'
+        if conditions:
+            sql += f' WHERE {" AND ".join(conditions)}'
+        # Читаем на одну строку больше, чтобы узнать, есть ли следующая страница
+        sql += f' ORDER BY {query.order_clause()} LIMIT ?'
+        params.append(limit + 1)
+
+        try:
+            rows = self._connections.connection().execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка получения страницы задач: {e}")
+            return TaskPage([], None)
+
+        next_key = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_key = encode_cursor(order_by, last[-1], last[0])
+        return TaskPage([self._row_to_task(row) for row in rows], next_key)
+
     def update_task(self, task: Task) -> bool:
         """
         Обновляет существующую задачу в базе данных.
+
+        Запись выполняется, только если version задачи совпадает с
+        версией строки в БД (оптимистическая блокировка): изменения,
+        сделанные другим подключением после чтения задачи, не затираются.
+        При успехе task.version увеличивается.
         
         Args:
             task: Объект Task с обновленными данными (должен содержать id)
             
         Returns:
-            True если задача обновлена, False если ошибка или задача не найдена
+            True если задача обновлена, False если ошибка, задача не найдена
+            или изменена после чтения
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE tasks 
-                    SET title=?, description=?, priority=?, status=?, 
-                        due_date=?, completed_date=?, reminder_date=?, reminder_sent=?
-                    WHERE id=?
-                ''', (
-                    task.title, task.description, task.priority.value,
-                    task.status.value, task.due_date, task.completed_date,
-                    task.reminder_date, task.reminder_sent,
-                    task.id
-                ))
-                conn.commit()
-                return cursor.rowcount > 0
+            with self._connections.transaction() as conn:
+                cursor = conn.execute(UPDATE_TASK_SQL, self._update_params(task))
         except sqlite3.Error as e:
             logger.error(f"Ошибка обновления задачи: {e}")
             return False
 
+        if cursor.rowcount == 0:
+            return False
+        task.version += 1
+        return True
+
+    def _update_returning(self, sql: str, params: Sequence, task_id: int) -> Optional[Task]:
+        """
+        Выполняет UPDATE одной задачи и возвращает её новое состояние.
+
+        Если SQLite поддерживает RETURNING, строка возвращается тем же
+        запросом. Иначе она перечитывается в той же транзакции.
+
+        Args:
+            sql: Запрос UPDATE без RETURNING
+            params: Параметры запроса
+            task_id: ID изменяемой задачи
+
+        Returns:
+            Обновленная задача или None, если строка не изменена или произошла ошибка
+        """
+        try:
+            with self._connections.transaction() as conn:
+                if HAS_RETURNING:
+                    # fetchall завершает запрос, иначе COMMIT не выполнится
+                    rows = conn.execute(f'{sql} RETURNING {TASK_COLUMNS}', params).fetchall()
+                elif conn.execute(sql, params).rowcount:
+                    rows = conn.execute(f'SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?',
+                                        (task_id,)).fetchall()
+                else:
+                    rows = []
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка изменения задачи {task_id}: {e}")
+            return None
+        return self._row_to_task(rows[0]) if rows else None
+
+    def set_status(self, task_id: int, status: Status, completed_date: Optional[str] = None,
+                   expected_version: Optional[int] = None) -> Optional[Task]:
+        """
+        Меняет статус задачи одним условным запросом UPDATE.
+
+        Задача не читается заранее, поэтому нет гонки чтения-записи между
+        процессами. При переходе в статус "Выполнена" дата выполнения
+        ставится, только если она еще не задана; при других статусах
+        сбрасывается.
+
+        Args:
+            task_id: ID задачи
+            status: Новый статус
+            completed_date: Дата выполнения ДД.ММ.ГГГГ для статуса "Выполнена"
+            expected_version: Изменять, только если version строки равна этому
+                значению (None - без проверки)
+
+        Returns:
+            Задача после изменения или None, если задача не найдена, уже
+            имеет этот статус, изменена другим подключением или произошла ошибка
+        """
+        sql = SET_STATUS_SQL
+        params = [status.value, status.value, to_storage_date(completed_date), task_id, status.value]
+        if expected_version is not None:
+            sql += ' AND version=?'
+            params.append(expected_version)
+        return self._update_returning(sql, params, task_id)
+
+    def set_reminder_sent(self, task_id: int,
+                          expected_version: Optional[int] = None) -> Optional[Task]:
+        """
+        Отмечает напоминание задачи отправленным одним условным запросом UPDATE.
+
+        Args:
+            task_id: ID задачи
+            expected_version: Изменять, только если version строки равна этому
+                значению (None - без проверки)
+
+        Returns:
+            Задача после изменения или None, если задача не найдена, напоминание
+            уже отмечено, задача изменена другим подключением или произошла ошибка
+        """
+        sql = SET_REMINDER_SENT_SQL
+        params = [task_id]
+        if expected_version is not None:
+            sql += ' AND version=?'
+            params.append(expected_version)
+        return self._update_returning(sql, params, task_id)
+
     def delete_task(self, task_id: int) -> bool:
         """
         Удаляет задачу из базы данных по ID.
@@ -166,15 +643,159 @@ class Database:
             True если задача удалена, False если ошибка или задача не найдена
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('DELETE FROM tasks WHERE id=?', (task_id,))
-                conn.commit()
+            with self._connections.transaction() as conn:
+                cursor = conn.execute('DELETE FROM tasks WHERE id=?', (task_id,))
                 return cursor.rowcount > 0
         except sqlite3.Error as e:
             logger.error(f"Ошибка удаления задачи: {e}")
             return False
 
+    def create_tasks(self, tasks: Iterable[Task]) -> List[int]:
+        """
+        Создает несколько задач одной транзакцией.
+
+        Все строки вставляются через executemany с единственной фиксацией
+        в конце. Пока транзакция удерживает блокировку записи, AUTOINCREMENT
+        выдает ID подряд, поэтому ID вычисляются по last_insert_rowid()
+        без повторного чтения строк.
+
+        Args:
+            tasks: Задачи для сохранения
+
+        Returns:
+            Список ID созданных задач в порядке передачи
+
+        Raises:
+            sqlite3.Error: При ошибке работы с БД (ни одна задача не сохраняется)
+        """
+        params = [self._insert_params(task) for task in tasks]
+        if not params:
+            return []
+
+        try:
+            with self._connections.transaction() as conn:
+                conn.executemany(INSERT_TASK_SQL, params)
+                last_id = conn.execute('SELECT last_insert_rowid()').fetchone()[0]
+                return list(range(last_id - len(params) + 1, last_id + 1))
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка пакетного создания задач: {e}")
+            raise
+
+    def update_tasks(self, tasks: Iterable[Task]) -> int:
+        """
+        Обновляет несколько задач одной транзакцией.
+
+        Args:
+            tasks: Задачи с обновленными данными (должны содержать id)
+
+        Как и update_task, задача записывается, только если её version
+        совпадает с версией строки в БД; у записанных задач version
+        увеличивается.
+
+        Returns:
+            Количество обновленных задач. 0 при ошибке (изменения откатываются)
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return 0
+
+        try:
+            with self._connections.transaction() as conn:
+                # Построчно, чтобы знать, какие задачи записаны
+                saved = [task for task in tasks
+                         if conn.execute(UPDATE_TASK_SQL, self._update_params(task)).rowcount]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка пакетного обновления задач: {e}")
+            return 0
+
+        for task in saved:
+            task.version += 1
+        return len(saved)
+
+    def delete_tasks(self, task_ids: Iterable[int]) -> int:
+        """
+        Удаляет несколько задач одной транзакцией.
+
+        Args:
+            task_ids: ID задач для удаления
+
+        Returns:
+            Количество удаленных задач. 0 при ошибке (изменения откатываются)
+        """
+        params = [(task_id,) for task_id in task_ids]
+        if not params:
+            return 0
+
+        try:
+            with self._connections.transaction() as conn:
+                return conn.executemany('DELETE FROM tasks WHERE id=?', params).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка пакетного удаления задач: {e}")
+            return 0
+
+    def export_tasks(self, fp: TextIO, fmt: str = 'json',
+                     progress: Optional[ProgressCallback] = None, batch_size: int = 500) -> int:
+        """
+        Потоково экспортирует все задачи в текстовый поток.
+
+        Подсчет и чтение задач выполняются в одной транзакции чтения,
+        поэтому экспорт отражает согласованный снимок БД. В памяти
+        одновременно находится не больше batch_size задач.
+
+        Args:
+            fp: Текстовый поток для записи
+            fmt: Формат: 'json' ({"tasks": [...]}) или 'ndjson' (задача в строке)
+            progress: Обратный вызов progress(записано, всего)
+            batch_size: Количество строк, читаемых из БД за раз
+
+        Returns:
+            Количество экспортированных задач
+
+        Raises:
+            sqlite3.Error: При ошибке работы с БД
+            ValueError: Если формат не поддерживается
+        """
+        with self._connections.read_transaction() as conn:
+            total = conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+            return write_tasks(self.iter_tasks(batch_size=batch_size), fp, fmt, total, progress)
+
+    def export_to_file(self, path: str, fmt: Optional[str] = None, compress: Optional[bool] = None,
+                       progress: Optional[ProgressCallback] = None) -> int:
+        """
+        Потоково экспортирует все задачи в файл.
+
+        Данные пишутся во временный файл, который после успешного
+        завершения атомарно заменяет целевой, поэтому при ошибке
+        существующий файл не портится.
+
+        Args:
+            path: Путь к файлу
+            fmt: Формат 'json' или 'ndjson' (None - по расширению файла)
+            compress: Сжимать ли gzip (None - если путь оканчивается на .gz)
+            progress: Обратный вызов progress(записано, всего)
+
+        Returns:
+            Количество экспортированных задач
+
+        Raises:
+            sqlite3.Error: При ошибке работы с БД
+            OSError: При ошибке записи файла
+        """
+        detected_fmt, detected_compress = detect_format(path)
+        fmt = fmt or detected_fmt
+        compress = detected_compress if compress is None else compress
+
+        temp_path = f"{path}.tmp"
+        try:
+            with open_export_file(temp_path, compress) as fp:
+                count = self.export_tasks(fp, fmt, progress)
+            os.replace(temp_path, path)
+            return count
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
     def export_to_json(self) -> str:
         """
         Экспортирует все задачи в формат JSON (требование ТЗ 5.5.1).
@@ -185,12 +806,13 @@ class Database:
             
         Note:
             Использует кодировку UTF-8 для корректного отображения
-            русских символов (ensure_ascii=False).
+            русских символов (ensure_ascii=False). Для больших БД
+            используйте export_to_file, который не держит весь
+            результат в памяти.
         """
-        import json
-        tasks = self.get_all_tasks()
-        tasks_data = [task.to_dict() for task in tasks]
-        return json.dumps({"tasks": tasks_data}, ensure_ascii=False, indent=2)
+        buffer = io.StringIO()
+        self.export_tasks(buffer, 'json')
+        return buffer.getvalue()
 
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
         """
@@ -203,30 +825,117 @@ class Database:
             Объект Task или None если задача не найдена
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-                row = cursor.fetchone()
-
-                if row:
-                    task_dict = {
-                        'id': row[0],
-                        'title': row[1],
-                        'description': row[2],
-                        'priority': row[3],
-                        'status': row[4],
-                        'created_date': row[5],
-                        'due_date': row[6],
-                        'completed_date': row[7],
-                        'reminder_date': row[8],  # ДОБАВИТЬ
-                        'reminder_sent': bool(row[9])  # ДОБАВИТЬ
-                    }
-                    return Task.from_dict(task_dict)
-                return None
+            cursor = self._connections.connection().execute(
+                f'SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?', (task_id,))
+            row = cursor.fetchone()
+            return self._row_to_task(row) if row else None
         except sqlite3.Error as e:
             logger.error(f"Ошибка получения задачи {task_id}: {e}")
             return None
 
+    def get_tasks_by_ids(self, task_ids: Sequence[int]) -> List[Task]:
+        """
+        Получает задачи по списку ID одним запросом.
+
+        Args:
+            task_ids: ID задач (не больше нескольких сотен)
+
+        Returns:
+            Найденные задачи в порядке task_ids (отсутствующие пропускаются).
+            Возвращает пустой список при ошибке.
+        """
+        if not task_ids:
+            return []
+        placeholders = ', '.join('?' * len(task_ids))
+        try:
+            cursor = self._connections.connection().execute(
+                f'SELECT {TASK_COLUMNS} FROM tasks WHERE id IN ({placeholders})', list(task_ids))
+            by_id = {task.id: task for task in map(self._row_to_task, cursor.fetchall())}
+            return [by_id[task_id] for task_id in task_ids if task_id in by_id]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка получения задач по списку ID: {e}")
+            return []
+
+    def get_due_reminders(self, limit: Optional[int] = None) -> List[Task]:
+        """
+        Получает невыполненные задачи, напоминание по которым пора отправить.
+
+        Читаются только строки частичного индекса неотправленных
+        напоминаний, а не вся таблица.
+
+        Args:
+            limit: Максимальное количество задач (None - без ограничения)
+
+        Returns:
+            Задачи по возрастанию даты напоминания. Пустой список при ошибке.
+        """
+        sql = DUE_REMINDERS_SQL
+        params = [today_storage()]
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        try:
+            cursor = self._connections.connection().execute(sql, params)
+            return [self._row_to_task(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка получения напоминаний: {e}")
+            return []
+
+    def get_upcoming_dates(self, after: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Получает будущие даты, в которые меняется состояние задач.
+
+        Это сроки невыполненных задач (задача станет просроченной) и даты
+        неотправленных напоминаний позже указанной даты. Оба условия
+        выбираются по частичным индексам idx_tasks_open_due и
+        idx_tasks_reminder_pending.
+
+        Args:
+            after: Дата ГГГГ-ММ-ДД, после которой искать (None - сегодня)
+
+        Returns:
+            Список пар (дата ГГГГ-ММ-ДД, ID задачи). Пустой список при ошибке.
+        """
+        after = after or today_storage()
+        sql = (f"SELECT due_date, id FROM tasks "
+               f"WHERE status <> '{Status.COMPLETED.value}' AND due_date > ? "
+               f"UNION ALL "
+               f"SELECT reminder_date, id FROM tasks "
+               f"WHERE reminder_sent = 0 AND reminder_date > ? AND status <> '{Status.COMPLETED.value}'")
+        try:
+            return self._connections.connection().execute(sql, (after, after)).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка получения дат событий: {e}")
+            return []
+
+    def mark_reminders_sent(self, task_ids: Iterable[int]) -> int:
+        """
+        Отмечает напоминания задач отправленными одной транзакцией.
+
+        Каждые ID_BATCH_SIZE задач обновляются одним запросом
+        UPDATE ... WHERE id IN (...). Уже отмеченные задачи не меняются.
+
+        Args:
+            task_ids: ID задач
+
+        Returns:
+            Количество отмеченных задач. 0 при ошибке (изменения откатываются)
+        """
+        task_ids = list(task_ids)
+        marked = 0
+        try:
+            with self._connections.transaction() as conn:
+                for start in range(0, len(task_ids), ID_BATCH_SIZE):
+                    batch = task_ids[start:start + ID_BATCH_SIZE]
+                    marked += conn.execute(
+                        f"UPDATE tasks SET reminder_sent=1, version=version+1 "
+                        f"WHERE id IN ({', '.join('?' * len(batch))}) AND reminder_sent=0",
+                        batch).rowcount
+        except sqlite3.Error as e:
+            logger.error(f"Ошибка отметки напоминаний: {e}")
+            return 0
+        return marked
+
     def get_tasks_by_status(self, status: Status) -> List[Task]:
         """
         Получает все задачи с указанным статусом.
@@ -238,25 +947,9 @@ class Database:
             Список задач с указанным статусом
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('SELECT * FROM tasks WHERE status = ?', (status.value,))
-                tasks = []
-                for row in cursor.fetchall():
-                    task_dict = {
-                        'id': row[0],
-                        'title': row[1],
-                        'description': row[2],
-                        'priority': row[3],
-                        'status': row[4],
-                        'created_date': row[5],
-                        'due_date': row[6],
-                        'completed_date': row[7],
-                        'reminder_date': row[8],  # ДОБАВИТЬ
-                        'reminder_sent': bool(row[9])  # ДОБАВИТЬ
-                    }
-                    tasks.append(Task.from_dict(task_dict))
-                return tasks
+            cursor = self._connections.connection().execute(
+                f'SELECT {TASK_COLUMNS} FROM tasks WHERE status = ?', (status.value,))
+            return [self._row_to_task(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
             logger.error(f"Ошибка получения задач по статусу {status}: {e}")
             return []
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""
+Модуль преобразования дат задач.
+
+В модели Task и в интерфейсе даты представлены в формате ДД.ММ.ГГГГ,
+а в базе данных хранятся в формате ISO-8601 (ГГГГ-ММ-ДД), который
+сортируется как обычная строка. Это позволяет SQLite сравнивать и
+упорядочивать даты по индексу, а Python - без вызова strptime.
+
+Для арифметики над датами (просрочка в днях) дата переводится в номер
+дня date.toordinal(). Разобранные значения кэшируются: у задач мало
+различных дат, поэтому каждая строка разбирается один раз.
+"""
+
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Optional
+
+DISPLAY_FORMAT = '%d.%m.%Y'
+STORAGE_FORMAT = '%Y-%m-%d'
+
+# Сколько различных дат хранит кэш разбора
+ORDINAL_CACHE_SIZE = 4096
+
+# Источник текущей даты; подменяется в тестах и при расчетах на одну дату
+Clock = Callable[[], date]
+
+
+def to_storage_date(value: Optional[str]) -> Optional[str]:
+    """
+    Преобразует дату ДД.ММ.ГГГГ в формат хранения ГГГГ-ММ-ДД.
+
+    Строки другого вида возвращаются без изменений, чтобы их
+    отклонило ограничение CHECK в базе данных.
+
+    Args:
+        value: Дата в формате ДД.ММ.ГГГГ или None
+
+    Returns:
+        Дата в формате ГГГГ-ММ-ДД или None
+    """
+    if value and len(value) == 10 and value[2] == '.' and value[5] == '.':
+        return f"{value[6:]}-{value[3:5]}-{value[:2]}"
+    return value
+
+
+def from_storage_date(value: Optional[str]) -> Optional[str]:
+    """
+    Преобразует дату из формата хранения ГГГГ-ММ-ДД в ДД.ММ.ГГГГ.
+
+    Args:
+        value: Дата в формате ГГГГ-ММ-ДД или None
+
+    Returns:
+        Дата в формате ДД.ММ.ГГГГ или None
+    """
+    if value and len(value) == 10 and value[4] == '-' and value[7] == '-':
+        return f"{value[8:]}.{value[5:7]}.{value[:4]}"
+    return value
+
+
+def today_storage() -> str:
+    """Возвращает текущую дату в формате хранения ГГГГ-ММ-ДД."""
+    return date.today().isoformat()
+
+
+@lru_cache(maxsize=ORDINAL_CACHE_SIZE)
+def to_ordinal(value: Optional[str]) -> Optional[int]:
+    """
+    Преобразует дату ДД.ММ.ГГГГ или ГГГГ-ММ-ДД в номер дня (date.toordinal()).
+
+    Args:
+        value: Дата или None
+
+    Returns:
+        Номер дня или None, если дата не задана или некорректна
+    """
+    storage = to_storage_date(value)
+    if not storage:
+        return None
+    try:
+        return date.fromisoformat(storage).toordinal()
+    except ValueError:
+        return None
+
+
+def today_ordinal(clock: Clock = date.today) -> int:
+    """Возвращает номер текущего дня по часам clock."""
+    return clock().toordinal()
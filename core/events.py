@@ -0,0 +1,174 @@
+"""
+Модуль доменных событий задач.
+
+Содержит классы событий, которые TaskService публикует после изменения
+задач, и шину EventBus для их доставки подписчикам. Подписчики (кэши,
+индексы, планировщик, представления GUI) применяют изменения точечно
+вместо полной перезагрузки списка задач.
+"""
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple, Type
+from core.models import Task
+
+logger = logging.getLogger(__name__)
+
+
+class TaskEvent:
+    """Базовый класс событий. Подписка на него получает все события."""
+
+
+@dataclass(frozen=True)
+class TaskCreated(TaskEvent):
+    """
+    Создана задача.
+
+    Атрибуты:
+        task: Созданная задача (с выданным ID)
+    """
+    task: Task
+
+
+@dataclass(frozen=True)
+class TaskUpdated(TaskEvent):
+    """
+    Изменена задача.
+
+    Атрибуты:
+        task: Задача после изменения
+        changed: Имена измененных полей (None - неизвестно, могли измениться любые)
+    """
+    task: Task
+    changed: Optional[FrozenSet[str]] = None
+
+
+@dataclass(frozen=True)
+class TaskDeleted(TaskEvent):
+    """
+    Удалена задача.
+
+    Атрибуты:
+        task_id: ID удаленной задачи
+    """
+    task_id: int
+
+
+@dataclass(frozen=True)
+class BulkChanged(TaskEvent):
+    """
+    Изменено сразу много задач (пакетные операции, импорт, напоминания).
+
+    Атрибуты:
+        created: ID созданных задач
+        updated: ID измененных задач
+        deleted: ID удаленных задач
+        full_reload: Изменения неизвестны (запись другим процессом или
+            откат транзакции) - данные нужно перечитать целиком
+    """
+    created: Tuple[int, ...] = ()
+    updated: Tuple[int, ...] = ()
+    deleted: Tuple[int, ...] = ()
+    full_reload: bool = False
+
+
+Handler = Callable[[TaskEvent], None]
+
+
+def changed_fields(old: Task, new: Task) -> FrozenSet[str]:
+    """
+    Возвращает имена полей, значения которых различаются у двух задач.
+
+    Args:
+        old: Задача до изменения
+        new: Задача после изменения
+
+    Returns:
+        Множество имен полей
+    """
+    return frozenset(f.name for f in fields(Task) if getattr(old, f.name) != getattr(new, f.name))
+
+
+class EventBus:
+    """
+    Шина доменных событий.
+
+    Синхронные подписчики вызываются сразу в потоке, опубликовавшем
+    событие. Для подписчиков с queued=True события складываются в
+    очередь и доставляются при вызове dispatch_queued() в потоке
+    получателя (например, из цикла Tk через after()), поэтому такие
+    подписчики могут обновлять виджеты, даже если событие опубликовал
+    фоновый поток.
+
+    Подписка на класс события получает и события его подклассов.
+    Ошибка подписчика записывается в журнал и не мешает остальным.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[Type[TaskEvent], List[Tuple[Handler, bool]]] = {}
+        self._queue: 'queue.Queue[Tuple[Handler, TaskEvent]]' = queue.Queue()
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: Type[TaskEvent], handler: Handler,
+                  queued: bool = False) -> Callable[[], None]:
+        """
+        Подписывает обработчик на события указанного типа.
+
+        Args:
+            event_type: Класс события (TaskEvent - все события)
+            handler: Функция, принимающая событие
+            queued: Доставлять через dispatch_queued(), а не сразу
+
+        Returns:
+            Функция без аргументов, отменяющая подписку
+        """
+        entry = (handler, queued)
+        with self._lock:
+            self._handlers.setdefault(event_type, []).append(entry)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                handlers = self._handlers.get(event_type, [])
+                if entry in handlers:
+                    handlers.remove(entry)
+        return unsubscribe
+
+    def publish(self, event: TaskEvent) -> None:
+        """Доставляет событие синхронным подписчикам и ставит в очередь остальным."""
+        with self._lock:
+            entries = [entry for event_type in type(event).__mro__
+                       for entry in self._handlers.get(event_type, ())]
+        for handler, queued in entries:
+            if queued:
+                self._queue.put((handler, event))
+            else:
+                self._call(handler, event)
+
+    def dispatch_queued(self, limit: Optional[int] = None) -> int:
+        """
+        Доставляет накопленные события подписчикам с queued=True.
+
+        Args:
+            limit: Максимальное количество событий за вызов (None - все)
+
+        Returns:
+            Количество доставленных событий
+        """
+        count = 0
+        while limit is None or count < limit:
+            try:
+                handler, event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._call(handler, event)
+            count += 1
+        return count
+
+    @staticmethod
+    def _call(handler: Handler, event: TaskEvent) -> None:
+        try:
+            handler(event)
+        except Exception as e:
+            logger.error(f"Ошибка обработчика события {type(event).__name__}: {e}")
@@ -0,0 +1,101 @@
+"""
+Модуль потокового экспорта задач.
+
+Задачи записываются в файл или поток по одной, без построения
+полного списка и общей JSON-строки в памяти. Поддерживаются формат
+приложения {"tasks": [...]} и построчный NDJSON (по задаче в строке),
+а также сжатие gzip.
+"""
+
+import gzip
+import json
+from typing import Callable, Iterable, Optional, TextIO
+from core.models import Task
+
+# Форматы экспорта: json - формат приложения, ndjson - одна задача в строке
+EXPORT_FORMATS = ('json', 'ndjson')
+
+# Как часто (в задачах) вызывается обратный вызов прогресса
+PROGRESS_STEP = 500
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def write_tasks(tasks: Iterable[Task], fp: TextIO, fmt: str = 'json',
+                total: int = 0, progress: Optional[ProgressCallback] = None) -> int:
+    """
+    Записывает задачи в текстовый поток.
+
+    Формат json побайтно совпадает с json.dumps({"tasks": [...]},
+    ensure_ascii=False, indent=2), но строится по одной задаче.
+
+    Args:
+        tasks: Итерируемый источник задач
+        fp: Текстовый поток для записи
+        fmt: Формат из EXPORT_FORMATS
+        total: Ожидаемое общее количество задач (для прогресса)
+        progress: Обратный вызов progress(записано, всего)
+
+    Returns:
+        Количество записанных задач
+
+    Raises:
+        ValueError: Если формат не поддерживается
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат экспорта: {fmt}")
+
+    count = 0
+    if fmt == 'json':
+        fp.write('{\n  "tasks": [')
+    for task in tasks:
+        if fmt == 'json':
+            item = json.dumps(task.to_dict(), ensure_ascii=False, indent=2)
+            fp.write(',\n    ' if count else '\n    ')
+            fp.write(item.replace('\n', '\n    '))
+        else:
+            fp.write(json.dumps(task.to_dict(), ensure_ascii=False))
+            fp.write('\n')
+        count += 1
+        if progress and count % PROGRESS_STEP == 0:
+            progress(count, total)
+    if fmt == 'json':
+        fp.write('\n  ]\n}' if count else ']\n}')
+
+    if progress:
+        progress(count, total)
+    return count
+
+
+def detect_format(path: str) -> tuple:
+    """
+    Определяет формат и сжатие по расширению файла.
+
+    Args:
+        path: Путь к файлу (например, tasks.json, tasks.ndjson.gz)
+
+    Returns:
+        Кортеж (формат из EXPORT_FORMATS, признак сжатия gzip)
+    """
+    name = path.lower()
+    compress = name.endswith('.gz')
+    if compress:
+        name = name[:-3]
+    fmt = 'ndjson' if name.endswith(('.ndjson', '.jsonl')) else 'json'
+    return fmt, compress
+
+
+def open_export_file(path: str, compress: bool) -> TextIO:
+    """
+    Открывает файл для записи экспорта в UTF-8 (со сжатием gzip при необходимости).
+
+    Args:
+        path: Путь к файлу
+        compress: Сжимать ли данные gzip
+
+    Returns:
+        Текстовый поток для записи
+    """
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
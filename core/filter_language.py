@@ -0,0 +1,185 @@
+"""
+Модуль языка фильтров списка задач.
+
+Строка вида
+
+    status:"В работе",Запланирована priority:высокий due<01.12.2025 overdue text:отчёт sort:due
+
+разбирается в неизменяемый TaskQuery, который компилируется в один
+параметризованный запрос SQLite (WHERE и ORDER BY) и выполняется по
+индексам. Результат разбора кэшируется по нормализованному тексту,
+поэтому повторное применение фильтра не разбирает строку заново.
+
+Условия (ключи можно писать и по-русски):
+    status:ЗНАЧЕНИЕ[,ЗНАЧЕНИЕ]     статус: Запланирована, "В работе", Выполнена
+    priority:ЗНАЧЕНИЕ[,ЗНАЧЕНИЕ]   приоритет: низкий, средний, высокий
+    due:ДАТА, due<ДАТА, due<=ДАТА, due>ДАТА, due>=ДАТА   срок (ДД.ММ.ГГГГ)
+    overdue                        только просроченные задачи
+    text:СЛОВО или просто СЛОВО    слова в названии или описании
+    sort:КЛЮЧ                      id, due, -due, priority, created
+"""
+
+import re
+from dataclasses import replace
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+from core.models import Priority, Status
+from core.query import ORDERINGS, TaskQuery
+
+# Сколько разобранных фильтров хранится в кэше
+FILTER_CACHE_SIZE = 256
+
+_TOKEN_RE = re.compile(r'''
+    \s*
+    (?:(?P<key>[^\s:<>="]+)(?P<op><=|>=|<|>|:|=))?
+    (?P<value>(?:"[^"]*"|[^\s"])+)
+''', re.VERBOSE)
+
+# Элемент списка значений: в кавычках или до запятой
+_ITEM_RE = re.compile(r'(?:"[^"]*"|[^,])+')
+
+_KEYS = {
+    'status': 'status', 'статус': 'status',
+    'priority': 'priority', 'приоритет': 'priority',
+    'due': 'due', 'срок': 'due',
+    'text': 'text', 'текст': 'text',
+    'sort': 'sort', 'сортировка': 'sort',
+}
+
+_OVERDUE_FLAGS = {'overdue', 'просрочено', 'просроченные'}
+
+_SORT_KEYS = {
+    'due': 'due_date', 'срок': 'due_date',
+    '-due': 'due_date_desc', '-срок': 'due_date_desc',
+    'priority': 'priority', 'приоритет': 'priority',
+    'created': 'created_date', 'создана': 'created_date',
+}
+
+_STATUSES = {status.value.lower(): status for status in Status}
+_PRIORITIES = {priority.value.lower(): priority for priority in Priority}
+
+
+class FilterSyntaxError(ValueError):
+    """
+    Ошибка в строке фильтра.
+
+    Атрибуты:
+        position: Позиция ошибки в нормализованной строке
+    """
+
+    def __init__(self, message: str, position: int):
+        super().__init__(message)
+        self.position = position
+
+
+def normalize_filter(text: str) -> str:
+    """
+    Приводит строку фильтра к виду, по которому она кэшируется.
+
+    Сравнение всех значений не зависит от регистра, поэтому строка
+    приводится к нижнему регистру, а пробелы схлопываются.
+    """
+    return ' '.join(text.lower().split())
+
+
+def parse_filter(text: str) -> TaskQuery:
+    """
+    Разбирает строку фильтра в TaskQuery.
+
+    Args:
+        text: Строка на языке фильтров (пустая - без фильтров)
+
+    Returns:
+        Неизменяемый TaskQuery (общий для одинаковых строк)
+
+    Raises:
+        FilterSyntaxError: Если строка содержит ошибку
+    """
+    return _parse_normalized(normalize_filter(text))
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def _parse_normalized(text: str) -> TaskQuery:
+    query = TaskQuery()
+    words = []
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            raise FilterSyntaxError(f"Незакрытая кавычка в позиции {pos + 1}", pos)
+        start, pos = match.start('value'), match.end()
+        key, op, raw = match.group('key'), match.group('op'), match.group('value')
+        value = raw.replace('"', '')
+
+        if key is None:
+            if not value:
+                continue
+            if value[-1] in ':<>=' and value.rstrip(':<>=') in _KEYS:
+                raise FilterSyntaxError(f"Не указано значение условия {value}", start)
+            if value in _OVERDUE_FLAGS:
+                query = replace(query, overdue_only=True)
+            else:
+                words.append(value)
+            continue
+
+        name = _KEYS.get(key)
+        if name is None:
+            raise FilterSyntaxError(f"Неизвестное условие: {key}", match.start('key'))
+        if name != 'due' and op not in (':', '='):
+            raise FilterSyntaxError(f"Для условия {key} допустимо только ':'", match.start('op'))
+
+        if name == 'status':
+            query = replace(query, status=_parse_values(raw, _STATUSES, "статус", start))
+        elif name == 'priority':
+            query = replace(query, priority=_parse_values(raw, _PRIORITIES, "приоритет", start))
+        elif name == 'due':
+            query = _apply_due(query, op, _parse_date(value, start))
+        elif name == 'text' and value:
+            words.append(value)
+        elif name == 'sort':
+            order_by = _SORT_KEYS.get(value, value)
+            if order_by not in ORDERINGS:
+                raise FilterSyntaxError(f"Неизвестная сортировка: {value}", start)
+            query = replace(query, order_by=order_by)
+
+    if words:
+        query = replace(query, text=' '.join(words))
+    return query
+
+
+def _parse_values(raw: str, known: dict, name: str, position: int) -> Tuple:
+    result = []
+    for item in _ITEM_RE.findall(raw):
+        item = item.replace('"', '').strip()
+        if item not in known:
+            raise FilterSyntaxError(f"Неизвестный {name}: {item}", position)
+        result.append(known[item])
+    return tuple(result)
+
+
+def _parse_date(value: str, position: int) -> datetime:
+    try:
+        return datetime.strptime(value, '%d.%m.%Y')
+    except ValueError:
+        raise FilterSyntaxError(f"Неверная дата {value}. Используйте ДД.ММ.ГГГГ", position)
+
+
+def _apply_due(query: TaskQuery, op: str, date: datetime) -> TaskQuery:
+    """Сужает диапазон срока; строгие сравнения сдвигают границу на день."""
+    due_from: Optional[datetime] = None
+    due_to: Optional[datetime] = None
+    if op in (':', '=', '>=', '>'):
+        due_from = date + timedelta(days=1) if op == '>' else date
+    if op in (':', '=', '<=', '<'):
+        due_to = date - timedelta(days=1) if op == '<' else date
+
+    if due_from and query.due_from:
+        due_from = max(due_from, datetime.strptime(query.due_from, '%d.%m.%Y'))
+    if due_to and query.due_to:
+        due_to = min(due_to, datetime.strptime(query.due_to, '%d.%m.%Y'))
+    return replace(
+        query,
+        due_from=due_from.strftime('%d.%m.%Y') if due_from else query.due_from,
+        due_to=due_to.strftime('%d.%m.%Y') if due_to else query.due_to,
+    )
@@ -0,0 +1,197 @@
+"""
+Модуль нечеткого поиска задач по триграммам.
+
+Содержит класс TrigramIndex - инвертированный индекс триграмм названий
+задач в памяти. Индекс строится один раз и далее обновляется по одной
+задаче, поэтому опечатки в запросе ("отчот" вместо "отчет") находятся
+без сравнения запроса со всеми названиями.
+"""
+
+import heapq
+import math
+import re
+import threading
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+_WORD_RE = re.compile(r'\w+')
+
+# Порог сходства по умолчанию: доля триграмм запроса, найденных в названии
+DEFAULT_THRESHOLD = 0.4
+
+# Сколько кандидатов на каждый запрошенный результат проверяется точно
+SHORTLIST_FACTOR = 10
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """
+    Возвращает множество триграмм строки.
+
+    Как в pg_trgm: регистр приводится к нижнему, "ё" заменяется на "е",
+    каждое слово дополняется двумя пробелами в начале и одним в конце,
+    чтобы начало слова весило больше, чем его середина.
+
+    Args:
+        text: Исходная строка
+
+    Returns:
+        Множество триграмм (пустое, если в строке нет слов)
+    """
+    result = set()
+    for word in _WORD_RE.findall(text.lower().replace('ё', 'е')):
+        padded = f'  {word} '
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(result)
+
+
+class TrigramIndex:
+    """
+    Инвертированный индекс триграмм названий задач.
+
+    Для каждой триграммы хранится компактный массив ID задач (array),
+    поэтому 500 тыс. названий занимают десятки мегабайт. При изменении
+    названия задача убирается только из массивов исчезнувших триграмм,
+    поэтому каждая триграмма названия встречается в индексе один раз.
+    Удаление не перестраивает массивы: записи удаленных задач
+    отсеиваются при проверке кандидатов и удаляются при уплотнении,
+    когда их становится больше половины (или раньше, если задачу с тем
+    же ID добавляют снова).
+
+    Поиск выбирает кандидатов только по самым редким триграммам запроса
+    (префиксный фильтр): если название содержит не меньше k из n триграмм
+    запроса, то хотя бы одна из n - k + 1 самых редких в нем есть.
+    Кандидаты ранжируются по числу совпавших триграмм, и точное сходство
+    вычисляется только для короткого списка лучших.
+
+    Методы потокобезопасны.
+    """
+
+    def __init__(self, items: Iterable[Tuple[int, str]] = ()):
+        """
+        Создает индекс.
+
+        Args:
+            items: Пары (ID задачи, название) для начального заполнения
+        """
+        self._titles: Dict[int, str] = {}
+        # Названия удаленных задач, записи которых еще остались в массивах
+        self._removed: Dict[int, str] = {}
+        self._postings: Dict[str, array] = {}
+        self._size = 0
+        self._stale = 0
+        self._lock = threading.Lock()
+        with self._lock:
+            for task_id, title in items:
+                self._add(task_id, title)
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def add(self, task_id: int, title: str) -> None:
+        """Добавляет задачу или обновляет её название."""
+        with self._lock:
+            old_title = self._titles.get(task_id)
+            if old_title is None:
+                removed_title = self._removed.pop(task_id, None)
+                if removed_title is not None:
+                    # Старые записи задачи иначе задвоились бы с новыми
+                    grams = trigrams(removed_title)
+                    self._stale -= len(grams)
+                    self._discard(task_id, grams)
+                self._add(task_id, title)
+            elif old_title != title:
+                old, new = trigrams(old_title), trigrams(title)
+                self._titles[task_id] = title
+                self._discard(task_id, old - new)
+                self._append(task_id, new - old)
+
+    def remove(self, task_id: int) -> None:
+        """Удаляет задачу из индекса (если она там есть)."""
+        with self._lock:
+            title = self._titles.pop(task_id, None)
+            if title is not None:
+                self._removed[task_id] = title
+                self._stale += len(trigrams(title))
+                self._maybe_compact()
+
+    def search(self, query: str, limit: int = 20,
+               threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[int, float]]:
+        """
+        Ищет задачи с названием, похожим на запрос.
+
+        Сходство - доля триграмм запроса, которые есть в названии (1.0 -
+        все слова запроса есть в названии целиком). При равном сходстве
+        выше стоят более короткие названия.
+
+        Args:
+            query: Строка поиска, возможно с опечатками
+            limit: Максимальное количество результатов
+            threshold: Минимальное сходство от 0 до 1
+
+        Returns:
+            Список пар (ID задачи, сходство) по убыванию сходства
+        """
+        query_grams = trigrams(query)
+        if not query_grams or limit <= 0:
+            return []
+
+        with self._lock:
+            empty = array('I')
+            ordered = sorted(query_grams, key=lambda g: len(self._postings.get(g, empty)))
+            required = max(1, math.ceil(threshold * len(ordered)))
+            prefix = ordered[:len(ordered) - required + 1]
+
+            # Кандидаты и предварительный ранг - по редким триграммам
+            counts = Counter(chain.from_iterable(self._postings.get(g, empty) for g in prefix))
+            shortlist = heapq.nlargest(limit * SHORTLIST_FACTOR, counts.items(),
+                                       key=lambda item: item[1])
+
+            results = []
+            for task_id, _ in shortlist:
+                title = self._titles.get(task_id)
+                if title is None:
+                    continue
+                title_grams = trigrams(title)
+                shared = len(query_grams & title_grams)
+                if shared < required:
+                    continue
+                results.append((shared / len(query_grams), -len(title_grams), task_id))
+
+        results.sort(reverse=True)
+        return [(task_id, score) for score, _, task_id in results[:limit]]
+
+    def _add(self, task_id: int, title: str) -> None:
+        self._titles[task_id] = title
+        self._append(task_id, trigrams(title))
+
+    def _append(self, task_id: int, grams: Iterable[str]) -> None:
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array('I')
+            posting.append(task_id)
+            self._size += 1
+
+    def _discard(self, task_id: int, grams: Iterable[str]) -> None:
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                continue
+            kept = array('I', (item for item in posting if item != task_id))
+            self._size -= len(posting) - len(kept)
+            if kept:
+                self._postings[gram] = kept
+            else:
+                del self._postings[gram]
+
+    def _maybe_compact(self) -> None:
+        """Перестраивает массивы, когда устаревших записей больше половины."""
+        if self._stale * 2 <= self._size:
+            return
+        titles = self._titles
+        self._titles, self._removed, self._postings = {}, {}, {}
+        self._size = self._stale = 0
+        for task_id, title in titles.items():
+            self._add(task_id, title)
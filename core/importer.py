@@ -0,0 +1,211 @@
+"""
+Модуль потокового разбора файлов импорта задач.
+
+Поддерживаются формат экспорта приложения {"tasks": [...]}, построчный
+NDJSON и CSV (заголовки совпадают с ключами Task.to_dict). Записи
+читаются по одной, поэтому файл любого размера разбирается в
+постоянном объеме памяти. Каждая запись выдается вместе с номером
+строки, на которой она начинается, для сообщений об ошибках.
+"""
+
+import csv
+import json
+from typing import Iterator, TextIO, Tuple
+
+# Форматы импорта: json - формат экспорта приложения, ndjson - задача в строке
+IMPORT_FORMATS = ('json', 'ndjson', 'csv')
+
+# Размер порции, читаемой из файла при разборе JSON
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\r\n'
+
+
+class ImportFormatError(ValueError):
+    """
+    Ошибка структуры файла импорта, после которой разбор невозможен.
+
+    Атрибуты:
+        line: Номер строки, на которой обнаружена ошибка
+    """
+
+    def __init__(self, message: str, line: int):
+        super().__init__(message)
+        self.line = line
+
+
+def detect_import_format(path: str) -> Tuple[str, bool]:
+    """
+    Определяет формат и сжатие файла импорта по расширению.
+
+    Args:
+        path: Путь к файлу (например, tasks.json, tasks.csv.gz)
+
+    Returns:
+        Кортеж (формат из IMPORT_FORMATS, признак сжатия gzip)
+    """
+    name = path.lower()
+    compress = name.endswith('.gz')
+    if compress:
+        name = name[:-3]
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson', compress
+    if name.endswith('.csv'):
+        return 'csv', compress
+    return 'json', compress
+
+
+def iter_records(fp: TextIO, fmt: str) -> Iterator[Tuple[int, dict]]:
+    """
+    Последовательно выдает записи задач из текстового потока.
+
+    Args:
+        fp: Текстовый поток (для CSV открытый с newline='')
+        fmt: Формат из IMPORT_FORMATS
+
+    Yields:
+        Кортежи (номер строки начала записи, словарь полей)
+
+    Raises:
+        ImportFormatError: Если структура файла нарушена
+        ValueError: Если формат не поддерживается
+    """
+    if fmt == 'json':
+        return _iter_json(fp)
+    if fmt == 'ndjson':
+        return _iter_ndjson(fp)
+    if fmt == 'csv':
+        return _iter_csv(fp)
+    raise ValueError(f"Неизвестный формат импорта: {fmt}")
+
+
+def _iter_ndjson(fp: TextIO) -> Iterator[Tuple[int, dict]]:
+    """Разбирает NDJSON: по одному JSON-объекту в строке, пустые строки пропускаются."""
+    for line_no, line in enumerate(fp, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            # Строки независимы: ошибка одной строки не мешает разбору остальных
+            yield line_no, {'__error__': f"Некорректный JSON: {e.msg}"}
+            continue
+        yield line_no, record
+
+
+def _iter_csv(fp: TextIO) -> Iterator[Tuple[int, dict]]:
+    """Разбирает CSV с заголовком; пустые значения трактуются как отсутствующие."""
+    reader = csv.DictReader(fp)
+    line_no = reader.line_num + 1
+    for row in reader:
+        yield line_no, {key: value for key, value in row.items() if key and value != ''}
+        line_no = reader.line_num + 1
+
+
+class _JsonStream:
+    """
+    Буфер для потокового разбора JSON.
+
+    Хранит только еще не разобранный хвост прочитанных данных и
+    считает строки в уже разобранной части.
+    """
+
+    def __init__(self, fp: TextIO):
+        self.fp = fp
+        self.buffer = ''
+        self.pos = 0
+        self.line = 1
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Дочитывает порцию данных; возвращает False в конце файла."""
+        if self.eof:
+            return False
+        chunk = self.fp.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def advance(self, end: int) -> None:
+        """Сдвигает позицию разбора, учитывая переводы строк."""
+        self.line += self.buffer.count('\n', self.pos, end)
+        self.pos = end
+
+    def peek(self) -> str:
+        """Пропускает пробельные символы и возвращает следующий символ ('' в конце)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                if self.buffer[self.pos] == '\n':
+                    self.line += 1
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        """Проверяет, что следующий значимый символ равен char, и пропускает его."""
+        if self.peek() != char:
+            raise ImportFormatError(f"Ожидался символ '{char}'", self.line)
+        self.pos += 1
+
+    def value(self, decoder: json.JSONDecoder):
+        """Разбирает очередное JSON-значение, дочитывая файл при необходимости."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.fill():
+                    continue
+                raise ImportFormatError(f"Некорректный JSON: {e.msg}", self.line)
+            # Значение могло оборваться на границе порции (например, число)
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.advance(end)
+            return value
+
+
+def _iter_json(fp: TextIO) -> Iterator[Tuple[int, dict]]:
+    """
+    Разбирает формат экспорта {"tasks": [...]} или просто массив задач.
+
+    Элементы массива разбираются по одному, прочитанная часть файла
+    сразу отбрасывается из буфера.
+    """
+    stream = _JsonStream(fp)
+    decoder = json.JSONDecoder()
+
+    first = stream.peek()
+    if first == '{':
+        # Ищем ключ "tasks", значения остальных ключей пропускаем
+        stream.pos += 1
+        while True:
+            if stream.peek() == '}':
+                raise ImportFormatError('В файле нет ключа "tasks"', stream.line)
+            key = stream.value(decoder)
+            stream.expect(':')
+            if key == 'tasks':
+                break
+            stream.value(decoder)
+            if stream.peek() == ',':
+                stream.pos += 1
+    elif first != '[':
+        raise ImportFormatError('Ожидался объект {"tasks": [...]} или массив задач', stream.line)
+
+    stream.expect('[')
+    if stream.peek() == ']':
+        return
+    while True:
+        stream.peek()
+        line_no = stream.line
+        yield line_no, stream.value(decoder)
+        separator = stream.peek()
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ImportFormatError("Ожидалась ',' или ']' между задачами", stream.line)
+        stream.pos += 1
@@ -0,0 +1,265 @@
+"""
+Модуль миграций схемы базы данных.
+
+Схема БД описывается упорядоченным списком миграций. Номер последней
+примененной миграции хранится в таблице schema_version, поэтому при
+открытии БД применяются только недостающие шаги, а существующие файлы
+data/tasks.db обновляются на месте без экспорта и повторного импорта.
+"""
+
+import sqlite3
+import logging
+from collections import namedtuple
+from typing import List
+from core.query import PRIORITY_RANK_SQL
+
+logger = logging.getLogger(__name__)
+
+Migration = namedtuple('Migration', ['version', 'description', 'apply'])
+Migration.__doc__ = """
+Шаг миграции схемы.
+
+Атрибуты:
+    version: Порядковый номер миграции (начиная с 1)
+    description: Краткое описание изменений
+    apply: Функция, принимающая sqlite3.Connection и изменяющая схему
+"""
+
+
+def _create_tasks_table(conn: sqlite3.Connection) -> None:
+    """Создает исходную таблицу tasks (для существующих БД ничего не меняет)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL CHECK(length(title) <= 500),
+            description TEXT CHECK(description IS NULL OR length(description) <= 2000),
+            priority TEXT NOT NULL CHECK(priority IN ('низкий', 'средний', 'высокий')),
+            status TEXT NOT NULL CHECK(status IN ('Запланирована', 'В работе', 'Выполнена')),
+            created_date TEXT NOT NULL,
+            due_date TEXT NOT NULL,
+            completed_date TEXT,
+            reminder_date TEXT,
+            reminder_sent BOOLEAN DEFAULT 0,
+            CHECK (due_date IS NULL OR due_date GLOB '[0-9][0-9].[0-9][0-9].[0-9][0-9][0-9][0-9]')
+        )
+    ''')
+
+
+def _create_task_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Создает вторичные индексы по статусу, приоритету, сроку и напоминаниям.
+
+    Частичный индекс idx_tasks_open_due содержит только невыполненные
+    задачи и используется для поиска просроченных; idx_tasks_reminder_pending
+    содержит только задачи с неотправленным напоминанием.
+    """
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status_priority ON tasks(status, priority)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date)')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_open_due ON tasks(due_date)
+        WHERE status <> 'Выполнена'
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_reminder_pending ON tasks(reminder_date)
+        WHERE reminder_sent = 0
+    ''')
+
+
+def _iso_date_expr(column: str) -> str:
+    """Возвращает SQL-выражение, переводящее столбец из ДД.ММ.ГГГГ в ГГГГ-ММ-ДД."""
+    return (f"CASE WHEN {column} GLOB '[0-9][0-9].[0-9][0-9].[0-9][0-9][0-9][0-9]' "
+            f"THEN substr({column}, 7, 4) || '-' || substr({column}, 4, 2) || '-' || substr({column}, 1, 2) "
+            f"ELSE {column} END")
+
+
+def _convert_dates_to_iso(conn: sqlite3.Connection) -> None:
+    """
+    Переводит хранение дат с ДД.ММ.ГГГГ на сортируемый формат ГГГГ-ММ-ДД.
+
+    Ограничение CHECK на формат due_date нельзя изменить через ALTER TABLE,
+    поэтому таблица пересоздается: данные копируются с преобразованием дат,
+    старая таблица удаляется, новая переименовывается, индексы создаются
+    заново. Счетчик AUTOINCREMENT сохраняется, чтобы ID удаленных задач
+    не выдавались повторно.
+    """
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'tasks'").fetchone()
+    last_id = row[0] if row else None
+
+    conn.execute('''
+        CREATE TABLE tasks_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL CHECK(length(title) <= 500),
+            description TEXT CHECK(description IS NULL OR length(description) <= 2000),
+            priority TEXT NOT NULL CHECK(priority IN ('низкий', 'средний', 'высокий')),
+            status TEXT NOT NULL CHECK(status IN ('Запланирована', 'В работе', 'Выполнена')),
+            created_date TEXT NOT NULL,
+            due_date TEXT NOT NULL,
+            completed_date TEXT,
+            reminder_date TEXT,
+            reminder_sent BOOLEAN DEFAULT 0,
+            CHECK (due_date IS NULL OR due_date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]')
+        )
+    ''')
+    conn.execute(f'''
+        INSERT INTO tasks_new (id, title, description, priority, status, created_date, due_date,
+                               completed_date, reminder_date, reminder_sent)
+        SELECT id, title, description, priority, status,
+               {_iso_date_expr('created_date')}, {_iso_date_expr('due_date')},
+               {_iso_date_expr('completed_date')}, {_iso_date_expr('reminder_date')},
+               reminder_sent
+        FROM tasks
+    ''')
+    conn.execute('DROP TABLE tasks')
+    conn.execute('ALTER TABLE tasks_new RENAME TO tasks')
+    if last_id is not None:
+        conn.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tasks'", (last_id,))
+    _create_task_indexes(conn)
+
+
+def _create_ordering_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Создает индексы для всех вариантов сортировки списка задач.
+
+    Индекс по рангу приоритета построен по выражению, которое должно
+    буквально совпадать с PRIORITY_RANK_SQL, иначе SQLite не использует
+    его для ORDER BY и постраничного чтения.
+    """
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_created_date ON tasks(created_date)')
+    conn.execute(f'CREATE INDEX IF NOT EXISTS idx_tasks_priority_rank ON tasks({PRIORITY_RANK_SQL})')
+
+
+def _create_search_index(conn: sqlite3.Connection) -> None:
+    """
+    Создает полнотекстовый индекс FTS5 по названию и описанию задач.
+
+    Индекс хранит только токены (content='tasks'), тексты читаются из
+    самой таблицы tasks. Синхронность поддерживают триггеры. Токенизатор
+    unicode61 приводит регистр, в том числе кириллицы. Если SQLite собран
+    без FTS5, индекс не создается и поиск работает полным просмотром.
+    """
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                title, description,
+                content='tasks', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 недоступен, поиск будет работать без индекса: {e}")
+        return
+
+    # executescript неявно фиксирует транзакцию миграции, поэтому по одному
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    ''')
+    conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+
+def _add_version_column(conn: sqlite3.Connection) -> None:
+    """
+    Добавляет столбец version для оптимистической блокировки.
+
+    Каждое изменение строки увеличивает version, поэтому запись с
+    условием version = ? не затирает чужие изменения, сделанные после
+    чтения задачи.
+    """
+    conn.execute('ALTER TABLE tasks ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+
+
+# Миграции применяются строго по возрастанию version.
+# Новые шаги добавляются только в конец списка.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Таблица задач", _create_tasks_table),
+    Migration(2, "Индексы по статусу, приоритету, сроку и напоминаниям", _create_task_indexes),
+    Migration(3, "Хранение дат в формате ГГГГ-ММ-ДД", _convert_dates_to_iso),
+    Migration(4, "Индексы для сортировки по дате создания и приоритету", _create_ordering_indexes),
+    Migration(5, "Полнотекстовый индекс FTS5 по названию и описанию", _create_search_index),
+    Migration(6, "Номер версии строки задачи", _add_version_column),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """
+    Возвращает номер последней примененной миграции.
+
+    Args:
+        conn: Подключение к БД
+
+    Returns:
+        Номер версии схемы (0 для новой или еще не версионированной БД)
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT (datetime('now'))
+        )
+    ''')
+    row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    return row[0] or 0
+
+
+def migrate(conn: sqlite3.Connection, migrations: List[Migration] = None) -> int:
+    """
+    Применяет к БД все недостающие миграции.
+
+    Каждая миграция выполняется в отдельной транзакции BEGIN IMMEDIATE,
+    поэтому при одновременном открытии БД несколькими процессами шаг
+    будет применен только один раз.
+
+    Args:
+        conn: Подключение к БД в режиме autocommit
+        migrations: Список миграций (по умолчанию MIGRATIONS)
+
+    Returns:
+        Номер версии схемы после обновления
+
+    Raises:
+        sqlite3.Error: Если миграцию не удалось применить
+    """
+    if migrations is None:
+        migrations = MIGRATIONS
+
+    version = get_schema_version(conn)
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Версию перепроверяем под блокировкой: другой процесс мог успеть раньше
+            version = get_schema_version(conn)
+            if migration.version > version:
+                migration.apply(conn)
+                conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                             (migration.version, migration.description))
+                logger.info(f"Применена миграция {migration.version}: {migration.description}")
+                version = migration.version
+            conn.execute('COMMIT')
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+
+    return version
@@ -7,8 +7,8 @@
 
 from enum import Enum
 from dataclasses import dataclass
-from datetime import datetime
 from typing import Optional
+from core.dates import to_ordinal, today_ordinal
 
 
 class Status(Enum):
@@ -59,6 +59,8 @@ class Task:
         completed_date: Дата выполнения (если задача выполнена)
         reminder_date: Дата напоминания (если установлено)
         reminder_sent: Флаг отправки напоминания
+        version: Номер версии строки в БД для оптимистической блокировки
+            (увеличивается при каждом изменении; в экспорт не входит)
     """
     id: int
     title: str
@@ -70,6 +72,7 @@ class Task:
     completed_date: Optional[str] = None
     reminder_date: Optional[str] = None
     reminder_sent: bool = False
+    version: int = 0
 
     def to_dict(self) -> dict:
         """
@@ -93,7 +96,17 @@ class Task:
             'reminder_sent': self.reminder_sent
         }
 
-    def needs_reminder(self) -> bool:
+    @property
+    def due_ordinal(self) -> Optional[int]:
+        """Срок выполнения как номер дня (разбор строки кэшируется)"""
+        return to_ordinal(self.due_date)
+
+    @property
+    def reminder_ordinal(self) -> Optional[int]:
+        """Дата напоминания как номер дня или None"""
+        return to_ordinal(self.reminder_date)
+
+    def needs_reminder(self, today: Optional[int] = None) -> bool:
         """
         Проверяет, нужно ли показать напоминание для задачи.
         
@@ -102,32 +115,53 @@ class Task:
         - Установлена дата напоминания
         - Дата напоминания наступила или прошла
         - Напоминание еще не было отправлено
-        
+
+        Args:
+            today: Номер текущего дня (today_ordinal()); при проверке многих
+                задач вычисляется один раз на проход
+
         Returns:
             True если нужно показать напоминание, иначе False
         """
-        if self.status == Status.COMPLETED or not self.reminder_date:
+        if self.status == Status.COMPLETED or self.reminder_sent:
             return False
+        reminder = self.reminder_ordinal
+        if reminder is None:
+            return False
+        return reminder <= (today_ordinal() if today is None else today)
 
-        reminder_dt = datetime.strptime(self.reminder_date, '%d.%m.%Y')
-        now = datetime.now()
-        return reminder_dt <= now and not self.reminder_sent
-
-    def is_overdue(self) -> bool:
+    def is_overdue(self, today: Optional[int] = None) -> bool:
         """
         Проверяет, просрочена ли задача.
         
         Задача считается просроченной если:
         - Статус не "Выполнена"
-        - Срок выполнения (due_date) меньше текущей даты
-        
+        - Срок выполнения (due_date) наступил или прошел
+
+        Даты сравниваются как целые номера дней.
+
+        Args:
+            today: Номер текущего дня (today_ordinal()); None - по системным часам
+
         Returns:
             True если задача просрочена, иначе False
         """
         if self.status == Status.COMPLETED:
             return False
-        due_date = datetime.strptime(self.due_date, '%d.%m.%Y')
-        return due_date < datetime.now()
+        due = self.due_ordinal
+        return due is not None and due <= (today_ordinal() if today is None else today)
+
+    def days_overdue(self, today: Optional[int] = None) -> int:
+        """
+        Возвращает количество дней, прошедших после срока (0, если срок не прошел).
+
+        Args:
+            today: Номер текущего дня (today_ordinal()); None - по системным часам
+        """
+        due = self.due_ordinal
+        if due is None:
+            return 0
+        return max(0, (today_ordinal() if today is None else today) - due)
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Task':
@@ -152,5 +186,6 @@ class Task:
             due_date=data['due_date'],
             completed_date=data.get('completed_date'),
             reminder_date=data.get('reminder_date'),
-            reminder_sent=data.get('reminder_sent', False)
+            reminder_sent=data.get('reminder_sent', False),
+            version=data.get('version', 0)
         )
\ No newline at end of file
@@ -0,0 +1,273 @@
+"""
+Модуль описания запросов к списку задач.
+
+Содержит класс TaskQuery, который описывает фильтры и сортировку
+списка задач и компилирует их в параметризованный SQL. Фильтрация и
+сортировка выполняются в SQLite с использованием индексов, а не
+в Python над полным списком задач.
+"""
+
+import base64
+import binascii
+import json
+import re
+from collections import namedtuple
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple, Union
+from core.dates import to_storage_date
+from core.models import Priority, Status
+
+# Ранг приоритета для сортировки: высокий -> средний -> низкий
+PRIORITY_RANK_SQL = (f"CASE priority WHEN '{Priority.HIGH.value}' THEN 0 "
+                     f"WHEN '{Priority.MEDIUM.value}' THEN 1 ELSE 2 END")
+
+# Варианты сортировки: ключ -> (SQL-выражение, по убыванию).
+# Ключи совпадают с параметром by в TaskService.sort_tasks.
+# При равенстве ключа задачи упорядочиваются по id.
+ORDERINGS = {
+    'id': ('id', False),
+    'due_date': ('due_date', False),
+    'due_date_desc': ('due_date', True),
+    'priority': (PRIORITY_RANK_SQL, False),
+    'created_date': ('created_date', True),
+}
+
+TaskPage = namedtuple('TaskPage', ['tasks', 'next_key'])
+TaskPage.__doc__ = """
+Страница списка задач.
+
+Атрибуты:
+    tasks: Задачи страницы
+    next_key: Курсор для запроса следующей страницы (None - страница последняя)
+"""
+
+
+SearchHit = namedtuple('SearchHit', ['id', 'title', 'snippet', 'rank'])
+SearchHit.__doc__ = """
+Результат полнотекстового поиска.
+
+Атрибуты:
+    id: Идентификатор задачи
+    title: Название с выделенными совпадениями
+    snippet: Фрагмент описания вокруг совпадений
+    rank: Оценка bm25 (чем меньше, тем релевантнее)
+"""
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def fts_match_expression(text: str) -> Optional[str]:
+    """
+    Преобразует пользовательский запрос в выражение MATCH для FTS5.
+
+    Каждое слово ищется как префикс ("отч" найдет "отчет"), все слова
+    должны встретиться в задаче. Слова берутся в кавычки, поэтому
+    операторы FTS5 (AND, NEAR, *) во вводе пользователя не действуют.
+
+    Args:
+        text: Строка поиска
+
+    Returns:
+        Выражение MATCH или None, если в строке нет ни одного слова
+    """
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def encode_cursor(order_by: str, sort_value: Any, task_id: int) -> str:
+    """
+    Кодирует позицию в списке в непрозрачный курсор.
+
+    Курсор содержит ключ сортировки, значение сортируемого выражения
+    и id последней задачи страницы.
+
+    Args:
+        order_by: Ключ сортировки из ORDERINGS
+        sort_value: Значение сортируемого выражения последней задачи
+        task_id: ID последней задачи
+
+    Returns:
+        Строка курсора, безопасная для URL
+    """
+    payload = json.dumps([order_by, sort_value, task_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token: str, order_by: str) -> Tuple[Any, int]:
+    """
+    Декодирует курсор, полученный от encode_cursor.
+
+    Args:
+        token: Строка курсора
+        order_by: Ожидаемый ключ сортировки
+
+    Returns:
+        Кортеж (значение сортируемого выражения, id задачи)
+
+    Raises:
+        ValueError: Если курсор поврежден или выдан для другой сортировки
+    """
+    try:
+        cursor_order, sort_value, task_id = json.loads(
+            base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise ValueError("Некорректный курсор страницы")
+    if cursor_order != order_by or not isinstance(task_id, int):
+        raise ValueError("Курсор выдан для другой сортировки")
+    return sort_value, task_id
+
+
+def _as_tuple(value) -> tuple:
+    """Приводит одиночное значение или коллекцию значений к кортежу."""
+    if value is None:
+        return ()
+    if isinstance(value, (Status, Priority)):
+        return (value,)
+    return tuple(value)
+
+
+@dataclass(frozen=True)
+class TaskQuery:
+    """
+    Описание фильтров и сортировки списка задач.
+
+    Объект неизменяемый и хешируемый, поэтому может служить ключом кэша.
+
+    Атрибуты:
+        status: Статус или кортеж допустимых статусов (None - любые)
+        priority: Приоритет или кортеж допустимых приоритетов (None - любые)
+        due_from: Нижняя граница срока включительно (ДД.ММ.ГГГГ)
+        due_to: Верхняя граница срока включительно (ДД.ММ.ГГГГ)
+        overdue_only: Только просроченные задачи
+        order_by: Ключ сортировки из ORDERINGS (None - по id, для
+            просроченных - по сроку)
+        ids: Кортеж допустимых ID задач (None - любые, пустой - ни одной)
+        text: Слова, которые должны встретиться в названии или описании
+    """
+    status: Union[Status, Tuple[Status, ...], None] = None
+    priority: Union[Priority, Tuple[Priority, ...], None] = None
+    due_from: Optional[str] = None
+    due_to: Optional[str] = None
+    overdue_only: bool = False
+    order_by: Optional[str] = None
+    ids: Optional[Tuple[int, ...]] = None
+    text: Optional[str] = None
+
+    def __post_init__(self):
+        # Коллекции приводим к кортежам, чтобы объект оставался хешируемым
+        for name in ('status', 'priority', 'ids'):
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, (Status, Priority, tuple)):
+                object.__setattr__(self, name, tuple(value))
+        if self.order_by is not None and self.order_by not in ORDERINGS:
+            raise ValueError(f"Неизвестная сортировка: {self.order_by}")
+
+    def where_clause(self, today: str, full_text: bool = True) -> Tuple[str, List]:
+        """
+        Компилирует фильтры в условие WHERE.
+
+        Условие просрочки содержит статус литералом, чтобы планировщик
+        SQLite мог использовать частичный индекс idx_tasks_open_due.
+
+        Args:
+            today: Текущая дата в формате ГГГГ-ММ-ДД
+            full_text: Искать text через индекс FTS5 (False - через LIKE,
+                если SQLite собран без FTS5)
+
+        Returns:
+            Кортеж (условие без слова WHERE или пустая строка, параметры)
+        """
+        conditions = []
+        params = []
+
+        statuses = _as_tuple(self.status)
+        if statuses:
+            conditions.append(f"status IN ({', '.join('?' * len(statuses))})")
+            params.extend(status.value for status in statuses)
+
+        priorities = _as_tuple(self.priority)
+        if priorities:
+            conditions.append(f"priority IN ({', '.join('?' * len(priorities))})")
+            params.extend(priority.value for priority in priorities)
+
+        if self.due_from:
+            conditions.append("due_date >= ?")
+            params.append(to_storage_date(self.due_from))
+
+        if self.due_to:
+            conditions.append("due_date <= ?")
+            params.append(to_storage_date(self.due_to))
+
+        if self.overdue_only:
+            conditions.append(f"status <> '{Status.COMPLETED.value}' AND due_date <= ?")
+            params.append(today)
+
+        if self.ids is not None:
+            conditions.append(f"id IN ({', '.join('?' * len(self.ids))})" if self.ids else "0")
+            params.extend(self.ids)
+
+        match = fts_match_expression(self.text) if self.text else None
+        if match and full_text:
+            conditions.append("id IN (SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH ?)")
+            params.append(match)
+        elif match:
+            for word in _WORD_RE.findall(self.text):
+                conditions.append("(title LIKE ? OR description LIKE ?)")
+                params.extend([f'%{word}%'] * 2)
+
+        return " AND ".join(conditions), params
+
+    @property
+    def ordering(self) -> str:
+        """
+        Действующий ключ сортировки из ORDERINGS.
+
+        Просроченные задачи по умолчанию упорядочиваются по сроку: так
+        строки читаются прямо из частичного индекса idx_tasks_open_due,
+        а не полным просмотром таблицы с сортировкой по id.
+        """
+        if self.order_by is not None:
+            return self.order_by
+        return 'due_date' if self.overdue_only else 'id'
+
+    def order_clause(self) -> str:
+        """
+        Возвращает выражение ORDER BY (без самих слов ORDER BY).
+
+        Returns:
+            Строка сортировки с id в качестве последнего ключа
+        """
+        expression, descending = ORDERINGS[self.ordering]
+        if expression == 'id':
+            return 'id ASC'
+        return f"{expression} {'DESC' if descending else 'ASC'}, id ASC"
+
+    def sort_expression(self) -> str:
+        """Возвращает SQL-выражение основного ключа сортировки."""
+        return ORDERINGS[self.ordering][0]
+
+    def keyset_clause(self, sort_value: Any, task_id: int) -> Tuple[str, List]:
+        """
+        Возвращает условие "после позиции" для постраничного чтения (keyset).
+
+        Условие сравнивает пару (ключ сортировки, id) с последней задачей
+        предыдущей страницы, поэтому SQLite переходит к нужной позиции
+        по индексу, а не пропускает строки, как при OFFSET.
+
+        Args:
+            sort_value: Значение ключа сортировки последней задачи
+            task_id: ID последней задачи
+
+        Returns:
+            Кортеж (условие, параметры)
+        """
+        expression, descending = ORDERINGS[self.ordering]
+        if expression == 'id':
+            return "id > ?", [task_id]
+        # Нестрогая граница по ключу задает диапазон поиска по индексу,
+        # вторая часть отсекает уже прочитанные задачи с тем же ключом
+        bound, strict = ('<=', '<') if descending else ('>=', '>')
+        return (f"{expression} {bound} ? AND ({expression} {strict} ? OR id > ?)",
+                [sort_value, sort_value, task_id])
@@ -0,0 +1,203 @@
+"""
+Выполнение работы с БД вне потока интерфейса.
+
+BackgroundWorker запускает функции в пуле потоков, а результаты
+складывает в очередь, которую поток Tk опрашивает через after(). Все
+обработчики результатов и события шины с queued=True вызываются в
+потоке интерфейса, поэтому могут обновлять виджеты.
+"""
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from core.events import EventBus
+
+logger = logging.getLogger(__name__)
+
+# Период опроса очереди, пока есть незавершенные задания (~60 кадров в секунду)
+POLL_MS = 16
+
+# Период опроса без заданий: доставка событий из фоновых потоков
+IDLE_POLL_MS = 200
+
+
+@dataclass
+class _Call:
+    """Заявка на выполнение функции в пуле"""
+    fn: Callable[..., Any]
+    args: Tuple[Any, ...]
+    on_done: Optional[Callable[[Any], None]]
+    on_error: Optional[Callable[[Exception], None]]
+    key: Optional[str] = None
+    cancelled: bool = field(default=False)
+
+
+class BackgroundWorker:
+    """
+    Пул фоновых потоков с доставкой результатов в поток Tk.
+
+    Заявки с одинаковым ключом сливаются: пока выполняется заявка с
+    ключом, новая ждет её окончания, а каждая следующая заменяет
+    ожидающую. Результат заявки, которую заменили или отменили, не
+    доставляется. Так серия быстрых нажатий на фильтры дает одну
+    загрузку с последними параметрами.
+
+    Таймер - объект с методами after(ms, callback) и after_cancel(id),
+    например окно Tk.
+    """
+
+    def __init__(self, timer: Any, events: Optional[EventBus] = None, max_workers: int = 2):
+        """
+        Args:
+            timer: Таймер потока интерфейса
+            events: Шина событий, очередь которой доставляется при опросе
+            max_workers: Количество потоков пула
+        """
+        self.timer = timer
+        self.events = events
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='tasktracker-worker')
+        self._results: 'queue.Queue[Tuple[_Call, Any, Optional[Exception]]]' = queue.Queue()
+        self._running: Dict[str, _Call] = {}
+        self._waiting: Dict[str, _Call] = {}
+        self._in_flight = 0
+        # Незапущенные и выполняющиеся задания пула (для отмены при остановке)
+        self._futures: Set[Future] = set()
+        self._job = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[..., Any], *args: Any,
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               key: Optional[str] = None) -> None:
+        """
+        Ставит функцию в очередь пула.
+
+        Args:
+            fn: Функция, выполняемая в фоновом потоке
+            *args: Её аргументы
+            on_done: Обработчик результата (в потоке интерфейса)
+            on_error: Обработчик исключения (в потоке интерфейса)
+            key: Ключ слияния заявок (например, "refresh")
+        """
+        call = _Call(fn, args, on_done, on_error, key)
+        if key is not None:
+            running = self._running.get(key)
+            if running is not None:
+                # Выполняющийся запрос устарел: его результат будет отброшен
+                running.cancelled = True
+                self._waiting[key] = call
+                self._poll_soon()
+                return
+            self._running[key] = call
+        self._start(call)
+
+    def cancel(self, key: str) -> None:
+        """Отменяет заявки с ключом: ожидающая не запустится, результат выполняющейся не доставится"""
+        self._waiting.pop(key, None)
+        running = self._running.get(key)
+        if running is not None:
+            running.cancelled = True
+
+    def busy(self, key: Optional[str] = None) -> bool:
+        """Есть ли незавершенные заявки (с ключом или любые)"""
+        if key is None:
+            return self._in_flight > 0 or bool(self._waiting)
+        return key in self._running or key in self._waiting
+
+    def start(self) -> None:
+        """Запускает опрос очереди (доставку событий из фоновых потоков)"""
+        self._poll_soon()
+
+    def shutdown(self) -> None:
+        """Останавливает опрос и пул, ожидающие заявки отменяются"""
+        if self._job is not None:
+            self.timer.after_cancel(self._job)
+            self._job = None
+        self._waiting.clear()
+        # cancel_futures у Executor.shutdown есть только с Python 3.9
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def poll(self) -> int:
+        """
+        Доставляет готовые результаты и события в текущем (интерфейсном) потоке.
+
+        Returns:
+            Количество доставленных результатов
+        """
+        self._job = None
+        delivered = 0
+        while True:
+            try:
+                call, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                self._finish(call, result, error)
+            except Exception as e:
+                # Ошибка обработчика не должна останавливать опрос
+                logger.error(f"Ошибка обработки результата фоновой операции: {e}")
+            delivered += 1
+
+        if self.events is not None:
+            self.events.dispatch_queued()
+        self._arm()
+        return delivered
+
+    def _start(self, call: _Call) -> None:
+        with self._lock:
+            self._in_flight += 1
+            future = self._executor.submit(self._run, call)
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+        self._poll_soon()
+
+    def _forget(self, future: Future) -> None:
+        with self._lock:
+            self._futures.discard(future)
+
+    def _run(self, call: _Call) -> None:
+        # Выполняется в потоке пула: результат только кладется в очередь
+        try:
+            result, error = call.fn(*call.args), None
+        except Exception as e:
+            result, error = None, e
+        self._results.put((call, result, error))
+
+    def _finish(self, call: _Call, result: Any, error: Optional[Exception]) -> None:
+        with self._lock:
+            self._in_flight -= 1
+        if call.key is not None and self._running.get(call.key) is call:
+            del self._running[call.key]
+            waiting = self._waiting.pop(call.key, None)
+            if waiting is not None:
+                self._running[call.key] = waiting
+                self._start(waiting)
+
+        if call.cancelled:
+            return
+        if error is not None:
+            if call.on_error:
+                call.on_error(error)
+            else:
+                logger.error(f"Ошибка фоновой операции: {error}")
+        elif call.on_done:
+            call.on_done(result)
+
+    def _poll_soon(self) -> None:
+        if self._job is not None:
+            self.timer.after_cancel(self._job)
+        self._job = self.timer.after(POLL_MS, self.poll)
+
+    def _arm(self) -> None:
+        if self._job is not None:
+            return
+        self._job = self.timer.after(POLL_MS if self.busy() else IDLE_POLL_MS, self.poll)
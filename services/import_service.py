@@ -0,0 +1,204 @@
+import gzip
+import io
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Callable, List, Optional, TextIO, Tuple
+from core.importer import ImportFormatError, detect_import_format, iter_records
+from core.models import Task, Status, Priority
+from services.task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+# Размер пакета: каждый пакет записывается одной транзакцией
+IMPORT_BATCH_SIZE = 5000
+
+# Сколько отклоненных строк хранится в отчете (счетчик ведется по всем)
+MAX_REPORTED_ERRORS = 1000
+
+# Ограничения длины полей совпадают с CHECK в таблице tasks
+MAX_TITLE_LENGTH = 500
+MAX_DESCRIPTION_LENGTH = 2000
+
+# Приоритеты, которые допускает схема БД
+IMPORT_PRIORITIES = (Priority.LOW, Priority.MEDIUM, Priority.HIGH)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass
+class ImportReport:
+    """Результат импорта: число записанных и отклоненных задач с номерами строк"""
+    imported: int = 0
+    rejected: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    def reject(self, line: int, message: str) -> None:
+        """Учитывает отклоненную запись"""
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+class ImportService:
+    def __init__(self, task_service: TaskService, batch_size: int = IMPORT_BATCH_SIZE):
+        self.task_service = task_service
+        self.batch_size = batch_size
+
+    def import_file(self, path: str, fmt: str = None,
+                    progress: Optional[ProgressCallback] = None) -> ImportReport:
+        """
+        Импортирует задачи из файла JSON, NDJSON или CSV (возможно, сжатого gzip).
+
+        Формат определяется по расширению, если не задан явно. Прогресс
+        сообщается в байтах исходного файла: progress(прочитано, размер).
+        """
+        detected, compress = detect_import_format(path)
+        fmt = fmt or detected
+        total = os.path.getsize(path)
+
+        with open(path, 'rb') as raw:
+            stream: BinaryIO = gzip.GzipFile(fileobj=raw, mode='rb') if compress else raw
+            # utf-8-sig пропускает BOM, который добавляют табличные редакторы в CSV
+            text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+            try:
+                on_batch = (lambda: progress(raw.tell(), total)) if progress else None
+                return self.import_stream(text, fmt, on_batch)
+            finally:
+                text.detach()
+
+    def import_stream(self, fp: TextIO, fmt: str,
+                      on_batch: Optional[Callable[[], None]] = None) -> ImportReport:
+        """Импортирует задачи из текстового потока пакетами по batch_size"""
+        report = ImportReport()
+        batch: List[Tuple[int, Task]] = []
+
+        try:
+            for line, record in iter_records(fp, fmt):
+                try:
+                    batch.append((line, self.parse_record(record)))
+                except ValueError as e:
+                    report.reject(line, str(e))
+                    continue
+
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, report)
+                    batch = []
+                    if on_batch:
+                        on_batch()
+        except ImportFormatError as e:
+            # Дальше файл разобрать нельзя; уже прочитанные задачи сохраняются
+            report.reject(e.line, str(e))
+        except (UnicodeDecodeError, OSError) as e:
+            report.reject(0, f"Ошибка чтения файла: {e}")
+
+        self._flush(batch, report)
+        if on_batch:
+            on_batch()
+        return report
+
+    def _flush(self, batch: List[Tuple[int, Task]], report: ImportReport) -> None:
+        """Записывает пакет одной транзакцией"""
+        if not batch:
+            return
+        try:
+            self.task_service.create_tasks(task for _, task in batch)
+            report.imported += len(batch)
+            return
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Пакет импорта отклонен БД, запись по одной задаче: {e}")
+
+        # Транзакция пакета откатилась целиком: находим виноватые строки
+        for line, task in batch:
+            try:
+                self.task_service.create_tasks([task])
+                report.imported += 1
+            except (sqlite3.Error, ValueError) as e:
+                report.reject(line, str(e))
+
+    def parse_record(self, record) -> Task:
+        """
+        Преобразует запись файла в Task и проверяет её по правилам TaskService.
+
+        Идентификатор из файла не используется: БД выдает новые ID, поэтому
+        импорт не конфликтует с уже существующими задачами.
+        """
+        if not isinstance(record, dict):
+            raise ValueError("Запись задачи должна быть объектом")
+        if '__error__' in record:
+            raise ValueError(record['__error__'])
+
+        title = record.get('title')
+        if not isinstance(title, str):
+            raise ValueError("Название задачи не может быть пустым")
+        description = record.get('description') or ''
+        if not isinstance(description, str):
+            raise ValueError("Описание задачи должно быть строкой")
+        if len(title.strip()) > MAX_TITLE_LENGTH:
+            raise ValueError(f"Название длиннее {MAX_TITLE_LENGTH} символов")
+        if len(description) > MAX_DESCRIPTION_LENGTH:
+            raise ValueError(f"Описание длиннее {MAX_DESCRIPTION_LENGTH} символов")
+
+        priority = _parse_enum(Priority, record.get('priority', Priority.MEDIUM.value), "приоритет")
+        if priority not in IMPORT_PRIORITIES:
+            raise ValueError(f"Недопустимый приоритет: {priority.value}")
+        status = _parse_enum(Status, record.get('status', Status.PLANNED.value), "статус")
+
+        task = Task(
+            id=0,
+            title=title,
+            description=description,
+            priority=priority,
+            status=status,
+            created_date=record.get('created_date') or datetime.now().strftime('%d.%m.%Y'),
+            due_date=record.get('due_date'),
+            completed_date=record.get('completed_date') or None,
+            reminder_date=record.get('reminder_date') or None,
+            reminder_sent=_parse_bool(record.get('reminder_sent', False))
+        )
+
+        # Те же правила, что при создании задачи через TaskService
+        self.task_service.validate_task(task)
+        for name in ('created_date', 'completed_date', 'reminder_date'):
+            _validate_optional_date(getattr(task, name), name)
+        return task
+
+
+def _parse_enum(enum_cls, value, name: str):
+    try:
+        return enum_cls(value)
+    except ValueError:
+        raise ValueError(f"Неизвестный {name}: {value}")
+
+
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return value != 0
+    if isinstance(value, str) and value.strip().lower() in ('', '0', 'false', 'нет'):
+        return False
+    if isinstance(value, str) and value.strip().lower() in ('1', 'true', 'да'):
+        return True
+    raise ValueError(f"Некорректное значение reminder_sent: {value}")
+
+
+def _validate_optional_date(value, name: str) -> None:
+    if value is None:
+        return
+    try:
+        datetime.strptime(value, '%d.%m.%Y')
+    except (TypeError, ValueError):
+        raise ValueError(f"Неверный формат даты {name}. Используйте ДД.ММ.ГГГГ")
+
+
+def format_report(report: ImportReport, limit: int = 20) -> str:
+    """Текст отчета об импорте для диалогов и командной строки"""
+    lines = [f"Импортировано задач: {report.imported}", f"Отклонено записей: {report.rejected}"]
+    for line, message in report.errors[:limit]:
+        lines.append(f"  строка {line}: {message}")
+    if report.rejected > limit:
+        lines.append(f"  ... и еще {report.rejected - limit}")
+    return "\n".join(lines)
@@ -0,0 +1,315 @@
+"""
+Фоновые задания с прогрессом и отменой.
+
+JobRunner выполняет долгие операции (экспорт, импорт, массовое
+выполнение задач) вне потока интерфейса. Задания, ограниченные
+вводом-выводом и работающие с TaskService этого процесса, выполняются в
+пуле потоков; задания, нагружающие процессор, - в пуле процессов, чтобы
+не отнимать GIL у интерфейса.
+
+Функция задания принимает первым аргументом JobContext и периодически
+вызывает context.report(сделано, всего): так сообщается прогресс и
+проверяется отмена (отмененное задание прерывается исключением
+JobCancelled в точке report()).
+"""
+
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Задание прервано по запросу отмены"""
+
+
+class JobState(Enum):
+    PENDING = "В очереди"
+    RUNNING = "Выполняется"
+    DONE = "Завершено"
+    FAILED = "Ошибка"
+    CANCELLED = "Отменено"
+
+
+FINISHED_STATES = (JobState.DONE, JobState.FAILED, JobState.CANCELLED)
+
+
+@dataclass
+class Job:
+    """
+    Фоновое задание.
+
+    Атрибуты:
+        id: Номер задания
+        title: Название для панели заданий
+        cpu_bound: Выполняется в пуле процессов
+        state: Состояние задания
+        done: Сколько сделано (в единицах задания)
+        total: Сколько всего (0 - неизвестно)
+        result: Результат функции задания
+        error: Исключение, если задание завершилось ошибкой
+    """
+    id: int
+    title: str
+    cpu_bound: bool = False
+    state: JobState = JobState.PENDING
+    done: int = 0
+    total: int = 0
+    result: Any = None
+    error: Optional[BaseException] = None
+    on_done: Optional[Callable[['Job'], None]] = field(default=None, repr=False)
+    _cancel: Any = field(default=None, repr=False)
+    _future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def fraction(self) -> float:
+        """Доля выполнения от 0 до 1"""
+        if self.state == JobState.DONE:
+            return 1.0
+        return min(1.0, self.done / self.total) if self.total else 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def cancel(self) -> None:
+        """Запрашивает отмену: задание в очереди не запустится, выполняемое прервется в report()"""
+        if self.finished:
+            return
+        self._cancel.set()
+        if self._future is not None:
+            self._future.cancel()
+
+
+class JobContext:
+    """
+    Связь функции задания с JobRunner.
+
+    Для заданий в потоках прогресс записывается прямо в Job, для
+    заданий в процессах - передается через очередь менеджера.
+    """
+
+    def __init__(self, job_id: int, cancel_event: Any, progress_queue: Any = None,
+                 job: Optional[Job] = None):
+        self.job_id = job_id
+        self._cancel = cancel_event
+        self._queue = progress_queue
+        self._job = job
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def report(self, done: int, total: int = 0) -> None:
+        """
+        Сообщает прогресс и проверяет отмену.
+
+        Raises:
+            JobCancelled: Если запрошена отмена задания
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+        if self._job is not None:
+            self._job.done, self._job.total = done, total
+        else:
+            self._queue.put((self.job_id, done, total))
+
+
+def _run_in_process(fn: Callable[..., Any], context: JobContext, args: tuple) -> Any:
+    # Выполняется в дочернем процессе: сначала сообщаем о запуске
+    context.report(0)
+    return fn(context, *args)
+
+
+class JobRunner:
+    """
+    Исполнитель фоновых заданий.
+
+    Состояние и прогресс заданий можно читать из любого потока.
+    Обработчики on_done вызываются из poll() в потоке, который его
+    вызывает (в GUI - периодически через after()).
+    """
+
+    def __init__(self, max_threads: int = 2, max_processes: int = 1):
+        self.max_processes = max_processes
+        self._threads = ThreadPoolExecutor(max_workers=max_threads,
+                                           thread_name_prefix='tasktracker-job')
+        # Пул процессов и менеджер очереди прогресса создаются при первом задании
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self._jobs: Dict[int, Job] = {}
+        self._finished: 'queue.Queue[Job]' = queue.Queue()
+        self._ids = count(1)
+        # Задания, о завершении которых poll() еще не сообщил
+        self._undelivered = 0
+        self._lock = threading.Lock()
+
+    def submit(self, title: str, fn: Callable[..., Any], *args: Any, cpu_bound: bool = False,
+               on_done: Optional[Callable[[Job], None]] = None) -> Job:
+        """
+        Ставит задание в очередь.
+
+        Args:
+            title: Название задания
+            fn: Функция fn(context, *args); для cpu_bound - функция уровня
+                модуля, а аргументы должны сериализоваться pickle
+            *args: Аргументы функции
+            cpu_bound: Выполнять в пуле процессов
+            on_done: Обработчик завершения (вызывается из poll())
+
+        Returns:
+            Созданное задание
+        """
+        job = Job(next(self._ids), title, cpu_bound, on_done=on_done)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._undelivered += 1
+
+        if cpu_bound:
+            self._ensure_processes()
+            job._cancel = self._manager.Event()
+            context = JobContext(job.id, job._cancel, self._progress)
+            job._future = self._processes.submit(_run_in_process, fn, context, args)
+        else:
+            job._cancel = threading.Event()
+            context = JobContext(job.id, job._cancel, job=job)
+            job._future = self._threads.submit(self._run_in_thread, job, fn, context, args)
+        job._future.add_done_callback(lambda future: self._complete(job, future))
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Запрашивает отмену задания; False - задания нет или оно уже завершено"""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return False
+        job.cancel()
+        return True
+
+    def jobs(self) -> List[Job]:
+        """Все задания в порядке создания"""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def active(self) -> List[Job]:
+        """Незавершенные задания"""
+        return [job for job in self.jobs() if not job.finished]
+
+    def busy(self) -> bool:
+        """Есть задания, завершение которых еще не доставлено через poll()"""
+        return self._undelivered > 0
+
+    def clear_finished(self) -> None:
+        """Убирает завершенные задания из списка"""
+        with self._lock:
+            self._jobs = {job_id: job for job_id, job in self._jobs.items() if not job.finished}
+
+    def poll(self) -> List[Job]:
+        """
+        Принимает прогресс заданий в процессах и вызывает обработчики завершения.
+
+        Returns:
+            Задания, завершившиеся с прошлого вызова
+        """
+        if self._progress is not None:
+            while True:
+                try:
+                    job_id, done, total = self._progress.get_nowait()
+                except (queue.Empty, OSError, EOFError):
+                    break
+                job = self._jobs.get(job_id)
+                if job is not None and not job.finished:
+                    job.state = JobState.RUNNING
+                    job.done, job.total = done, total
+
+        finished = []
+        while True:
+            try:
+                job = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            finished.append(job)
+            with self._lock:
+                self._undelivered -= 1
+            if job.on_done:
+                try:
+                    job.on_done(job)
+                except Exception as e:
+                    logger.error(f"Ошибка обработчика задания '{job.title}': {e}")
+        return finished
+
+    def shutdown(self, cancel: bool = True) -> None:
+        """Останавливает пулы; при cancel=True активные задания отменяются"""
+        if cancel:
+            # Отмена задания отменяет и его future, если оно еще в очереди
+            # (cancel_futures у Executor.shutdown появился только в Python 3.9)
+            for job in self.active():
+                job.cancel()
+        self._threads.shutdown(wait=False)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False)
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+            self._progress = None
+
+    def _ensure_processes(self) -> None:
+        if self._processes is not None:
+            return
+        # spawn: дочерний процесс не наследует потоки Tk и открытые подключения к БД
+        mp_context = multiprocessing.get_context('spawn')
+        self._manager = mp_context.Manager()
+        self._progress = self._manager.Queue()
+        self._processes = ProcessPoolExecutor(max_workers=self.max_processes, mp_context=mp_context)
+
+    @staticmethod
+    def _run_in_thread(job: Job, fn: Callable[..., Any], context: JobContext, args: tuple) -> Any:
+        job.state = JobState.RUNNING
+        context.report(0)
+        return fn(context, *args)
+
+    def _complete(self, job: Job, future: Future) -> None:
+        # Вызывается в потоке пула (или в потоке отмены) - только меняем состояние
+        if future.cancelled():
+            job.state = JobState.CANCELLED
+        else:
+            error = future.exception()
+            if error is None:
+                job.result = future.result()
+                job.state = JobState.DONE
+            elif isinstance(error, JobCancelled):
+                job.state = JobState.CANCELLED
+            else:
+                job.error = error
+                job.state = JobState.FAILED
+                logger.warning(f"Задание '{job.title}' завершилось ошибкой: {error}")
+        self._finished.put(job)
+
+
+def export_job(context: JobContext, db_path: str, path: str, fmt: Optional[str] = None) -> int:
+    """
+    Задание экспорта для пула процессов.
+
+    Процесс открывает собственное подключение к БД, поэтому сериализация
+    задач не конкурирует с интерфейсом за GIL.
+    """
+    from core.database import Database
+    with Database(db_path) as db:
+        return db.export_to_file(path, fmt=fmt, progress=context.report)
+
+
+def import_job(context: JobContext, import_service: Any, path: str, fmt: Optional[str] = None) -> Any:
+    """Задание импорта (в пуле потоков: задачи пишутся через TaskService процесса)"""
+    return import_service.import_file(path, fmt=fmt, progress=context.report)
+
+
+def complete_tasks_job(context: JobContext, task_service: Any, task_ids: List[int]) -> int:
+    """Задание массового выполнения задач; отмена откатывает всю транзакцию"""
+    return task_service.complete_tasks(task_ids, progress=context.report)
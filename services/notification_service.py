@@ -1,27 +1,23 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
-from datetime import datetime, timedelta
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from core.dates import Clock, to_ordinal, today_ordinal
 from core.models import Task, Status
 from services.task_service import TaskService
 
 
 class NotificationService:
-    def __init__(self, task_service: TaskService):
+    def __init__(self, task_service: TaskService, clock: Clock = date.today):
         self.task_service = task_service
+        # Текущая дата берется один раз на проверку всех задач
+        self.clock = clock
         self.notification_window = None
         self.last_check = None
 
     def check_overdue_tasks(self) -> List[Task]:
-        """Проверяет просроченные задачи"""
-        all_tasks = self.task_service.get_all_tasks()
-        overdue_tasks = []
-        
-        for task in all_tasks:
-            if task.status != Status.COMPLETED and task.is_overdue():
-                overdue_tasks.append(task)
-        
-        return overdue_tasks
+        """Проверяет просроченные задачи (одним запросом по индексу, с датой часов clock)"""
+        return self.task_service.get_overdue(self.clock())
 
     def show_overdue_notification(self, overdue_tasks: List[Task]):
         """Показывает уведомление о просроченных задачах"""
@@ -69,11 +65,13 @@ class NotificationService:
         tree.column("DaysOverdue", width=100)
 
         # Добавляем задачи в список
+        today = today_ordinal(self.clock)
         for task in overdue_tasks:
-            days_overdue = self._calculate_days_overdue(task.due_date)
+            days_overdue = self._calculate_days_overdue(task.due_date, today)
             priority_color = self._get_priority_color(task.priority.value)
             
-            item = tree.insert("", tk.END, values=(
+            # ID задачи - идентификатор строки: по нему находятся выбранные задачи
+            item = tree.insert("", tk.END, iid=str(task.id), values=(
                 task.title,
                 task.priority.value,
                 task.due_date,
@@ -105,15 +103,14 @@ class NotificationService:
         # Центрируем окно
         self._center_window(self.notification_window)
 
-    def _calculate_days_overdue(self, due_date: str) -> int:
-        """Вычисляет количество дней просрочки"""
-        try:
-            due_dt = datetime.strptime(due_date, '%d.%m.%Y')
-            today = datetime.now().date()
-            overdue_days = (today - due_dt.date()).days
-            return max(0, overdue_days)
-        except ValueError:
+    def _calculate_days_overdue(self, due_date: str, today: Optional[int] = None) -> int:
+        """Вычисляет количество дней просрочки (today - номер текущего дня)"""
+        due = to_ordinal(due_date)
+        if due is None:
             return 0
+        if today is None:
+            today = today_ordinal(self.clock)
+        return max(0, today - due)
 
     def _get_priority_color(self, priority: str) -> str:
         """Возвращает цвет для приоритета"""
@@ -125,22 +122,23 @@ class NotificationService:
         return colors.get(priority, "black")
 
     def _mark_selected_completed(self, tree):
-        """Отмечает выбранную задачу как выполненную"""
+        """Отмечает выбранные задачи как выполненные"""
         selected = tree.selection()
         if not selected:
             messagebox.showwarning("Внимание", "Выберите задачу для отметки как выполненной")
             return
 
+        if len(selected) > 1:
+            # Несколько задач выполняются одной транзакцией
+            task_ids = [int(item) for item in selected]
+            completed = self.task_service.complete_tasks(task_ids)
+            messagebox.showinfo("Успех", f"Отмечено как выполненные: {completed}")
+            self._refresh_notification_list(tree)
+            return
+
         item = selected[0]
         task_title = tree.item(item)['values'][0]
-        
-        # Находим задачу
-        tasks = self.task_service.get_all_tasks()
-        task_to_complete = None
-        for task in tasks:
-            if task.title == task_title:
-                task_to_complete = task
-                break
+        task_to_complete = self.task_service.get_task(int(item))
 
         if task_to_complete:
             success = self.task_service.complete_task(task_to_complete.id)
@@ -160,14 +158,7 @@ class NotificationService:
 
         item = selected[0]
         task_title = tree.item(item)['values'][0]
-        
-        # Находим задачу
-        tasks = self.task_service.get_all_tasks()
-        task_to_extend = None
-        for task in tasks:
-            if task.title == task_title:
-                task_to_extend = task
-                break
+        task_to_extend = self.task_service.get_task(int(item))
 
         if not task_to_extend:
             messagebox.showerror("Ошибка", "Задача не найдена")
@@ -216,9 +207,10 @@ class NotificationService:
         
         # Загружаем обновленные просроченные задачи
         overdue_tasks = self.check_overdue_tasks()
+        today = today_ordinal(self.clock)
         for task in overdue_tasks:
-            days_overdue = self._calculate_days_overdue(task.due_date)
-            tree.insert("", tk.END, values=(
+            days_overdue = self._calculate_days_overdue(task.due_date, today)
+            tree.insert("", tk.END, iid=str(task.id), values=(
                 task.title,
                 task.priority.value,
                 task.due_date,
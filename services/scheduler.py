@@ -0,0 +1,168 @@
+import heapq
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, List, Optional, Tuple
+from core.dates import to_storage_date
+from core.events import BulkChanged, TaskCreated, TaskUpdated
+from core.models import Task, Status
+from services.task_service import TaskService
+
+logger = logging.getLogger(__name__)
+
+# Самое долгое ожидание между пробуждениями. Пробуждение без наступившей
+# даты не обращается к БД, а только страхует от перевода часов и сна системы.
+MAX_SLEEP_MS = 6 * 3600 * 1000
+
+# Запас после полуночи, чтобы дата гарантированно сменилась
+MIDNIGHT_MARGIN_MS = 1000
+
+
+class DeadlineScheduler:
+    """
+    Планировщик напоминаний и наступления сроков вместо ежечасного опроса.
+
+    Хранит min-кучу будущих дат (сроки невыполненных задач и даты
+    неотправленных напоминаний) и спит до полуночи ближайшей из них.
+    Когда дата наступает, вызывается on_due - обработчик отправляет
+    напоминания и показывает просроченные задачи. Созданные и измененные
+    задачи планировщик узнает из событий TaskService и сам перепланирует
+    ожидание.
+
+    Таймер - объект с методами after(ms, callback) и after_cancel(id),
+    например окно Tk. Если задачи меняются и в фоновых потоках, события
+    нужно получать с queued=True и доставлять в потоке таймера через
+    EventBus.dispatch_queued().
+
+    С worker (BackgroundWorker) даты перечитываются в фоновом потоке, а
+    куча заменяется и таймер перезапускается, когда результат доставлен
+    в поток таймера.
+    """
+
+    def __init__(self, task_service: TaskService, timer: Any, on_due: Callable[[], None],
+                 now: Callable[[], datetime] = datetime.now, queued: bool = False,
+                 worker: Any = None):
+        self.task_service = task_service
+        self.timer = timer
+        self.on_due = on_due
+        self.now = now
+        self.worker = worker
+        self._heap: List[Tuple[str, int]] = []
+        # Даты, добавленные событиями, пока перечитывание из БД не доставлено
+        self._added: Optional[List[Tuple[str, int]]] = None
+        self._job = None
+        # Запланирована немедленная проверка - перепланирование её не отменяет
+        self._forced = False
+        self._subscriptions = [
+            task_service.events.subscribe(TaskCreated, lambda event: self.reschedule(event.task), queued),
+            task_service.events.subscribe(TaskUpdated, lambda event: self.reschedule(event.task), queued),
+            task_service.events.subscribe(BulkChanged, self._on_bulk_changed, queued),
+        ]
+
+    def start(self) -> None:
+        """Выполняет первую проверку при запуске главного цикла и планирует следующие"""
+        self._fire_soon()
+
+    def stop(self) -> None:
+        self._cancel()
+        self._forced = False
+        self._heap = []
+        for unsubscribe in self._subscriptions:
+            unsubscribe()
+        self._subscriptions = []
+
+    def rebuild(self) -> None:
+        """Перечитывает будущие даты из БД (одним запросом по индексам)"""
+        if self.worker is None:
+            self._set_dates(self.task_service.get_upcoming_dates(self._today()))
+            return
+        if self._added is None:
+            self._added = []
+        self.worker.submit(self.task_service.get_upcoming_dates, self._today(),
+                           on_done=self._set_dates, on_error=self._on_rebuild_error,
+                           key="deadlines")
+
+    def reschedule(self, task: Task) -> None:
+        """Добавляет даты созданной или измененной задачи"""
+        if task.status == Status.COMPLETED:
+            return
+        today = self._today()
+        reminder = None
+        if task.reminder_date and not task.reminder_sent:
+            reminder = to_storage_date(task.reminder_date)
+            # Напоминание уже пора отправить - проверка запускается сразу
+            if reminder <= today:
+                self._fire_soon()
+                return
+
+        # Уже наступивший срок не ждем: пользователь как раз работает с задачей
+        dates = [day for day in (to_storage_date(task.due_date), reminder) if day and day > today]
+        if not dates:
+            return
+        earliest = self._heap[0][0] if self._heap else None
+        for day in dates:
+            heapq.heappush(self._heap, (day, task.id))
+            if self._added is not None:
+                # Запрос мог прочитать БД до этого изменения
+                self._added.append((day, task.id))
+        if earliest is None or min(dates) < earliest:
+            self._arm()
+
+    def next_date(self) -> Optional[str]:
+        """Ближайшая ожидаемая дата ГГГГ-ММ-ДД или None"""
+        return self._heap[0][0] if self._heap else None
+
+    def _on_bulk_changed(self, event: BulkChanged) -> None:
+        # Удаление только оставляет лишние даты в куче - это безвредно
+        if event.created or event.updated or event.full_reload:
+            self.rebuild()
+
+    def _set_dates(self, dates: List[Tuple[str, int]]) -> None:
+        self._heap = list(dates) + (self._added or [])
+        self._added = None
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def _on_rebuild_error(self, error: Exception) -> None:
+        # Ждем по прежней куче, чтобы не остаться без таймера
+        logger.error(f"Ошибка чтения дат планировщика: {error}")
+        self._added = None
+        self._arm()
+
+    def _today(self) -> str:
+        return self.now().date().isoformat()
+
+    def _fire_soon(self) -> None:
+        self._cancel()
+        self._forced = True
+        self._job = self.timer.after(0, lambda: self._fire(force=True))
+
+    def _fire(self, force: bool = False) -> None:
+        self._job = None
+        self._forced = False
+        today = self._today()
+        if not force and self._heap and self._heap[0][0] > today:
+            # Пробуждение раньше даты (ограничение MAX_SLEEP_MS) - просто ждем дальше
+            self._arm()
+            return
+
+        try:
+            self.on_due()
+        except Exception as e:
+            logger.error(f"Ошибка обработки наступивших сроков: {e}")
+        # Изменения, о которых не сообщили через reschedule, подхватываются здесь
+        self.rebuild()
+
+    def _arm(self) -> None:
+        if self._forced:
+            return
+        self._cancel()
+        if not self._heap:
+            return
+        due = datetime.combine(date.fromisoformat(self._heap[0][0]), time.min)
+        delay = (due - self.now()) // timedelta(milliseconds=1) + MIDNIGHT_MARGIN_MS
+        self._job = self.timer.after(max(0, min(delay, MAX_SLEEP_MS)), self._fire)
+
+    def _cancel(self) -> None:
+        if self._job is not None:
+            self.timer.after_cancel(self._job)
+            self._job = None
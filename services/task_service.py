@@ -1,15 +1,90 @@
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional
+import threading
+from contextlib import contextmanager
+from copy import copy
+from dataclasses import replace
+from itertools import islice
+from datetime import date, datetime, timedelta
+from typing import Callable, Iterable, Iterator, List, Optional
 from core.models import Task, Status, Priority
+from core.cache import TaskCache
 from core.database import Database
+from core.dates import to_ordinal, today_storage
+from core.events import BulkChanged, EventBus, TaskCreated, TaskDeleted, TaskEvent, TaskUpdated, changed_fields
+from core.filter_language import parse_filter
+from core.autocomplete import PrefixIndex
+from core.fuzzy import DEFAULT_THRESHOLD, TrigramIndex
+from core.query import SearchHit, TaskPage, TaskQuery, fts_match_expression
 
 logger = logging.getLogger(__name__)
 
+# Столбцы, которые показывают списки задач в интерфейсе
+LIST_COLUMNS = ("id", "title", "status", "priority", "due_date", "overdue")
+
+# Сколько лучших по релевантности задач возвращает поиск
+SEARCH_LIMIT = 100
+
+# Сколько задач показывает поиск по мере ввода
+TYPEAHEAD_LIMIT = 500
+
+
+def print_reminder(task: Task) -> None:
+    """Доставка напоминаний по умолчанию - вывод в консоль."""
+    print(f"НАПОМИНАНИЕ: '{task.title}' - срок: {task.due_date}")
+
 
 class TaskService:
-    def __init__(self, db: Database):
+    def __init__(self, db: Database, cache: TaskCache = None, events: EventBus = None):
         self.db = db
+        # Шина событий об изменениях задач для кэшей, планировщика и представлений
+        self.events = events if events is not None else EventBus()
+        # Глубина транзакции и отложенные до фиксации события (свои у каждого потока)
+        self._tx = threading.local()
+        # Кэш задач и результатов запросов; записи через сервис обновляют его сразу
+        self.cache = cache if cache is not None else TaskCache()
+        # Индекс триграмм для нечеткого поиска строится при первом запросе
+        self._fuzzy_index: Optional[TrigramIndex] = None
+        # Префиксный индекс слов названий для поиска по мере ввода
+        self._prefix_index: Optional[PrefixIndex] = None
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        # Изменения всех вызовов сервиса в блоке фиксируются один раз при выходе.
+        # Вложенные блоки - точки сохранения: ошибка откатывает только их.
+        # События публикуются после фиксации внешнего блока.
+        depth = getattr(self._tx, 'depth', 0)
+        if depth == 0:
+            self._tx.pending = []
+        mark = len(self._tx.pending)
+        self._tx.depth = depth + 1
+        if depth == 0:
+            self._tx.wrote = False
+        try:
+            with self.db.transaction():
+                yield
+            if depth == 0 and self._tx.wrote:
+                # Все записи блока зафиксированы одной транзакцией
+                self.cache.note_write(threading.get_ident())
+        except BaseException:
+            # Кэш и индексы уже получили откатываемые изменения - сбрасываем
+            self.cache.clear()
+            self._fuzzy_index = None
+            self._prefix_index = None
+            del self._tx.pending[mark:]
+            self._tx.pending.append(BulkChanged(full_reload=True))
+            raise
+        finally:
+            self._tx.depth = depth
+            if depth == 0:
+                pending, self._tx.pending = self._tx.pending, []
+                for event in pending:
+                    self.events.publish(event)
+
+    def _emit(self, event: TaskEvent) -> None:
+        if getattr(self._tx, 'depth', 0):
+            self._tx.pending.append(event)
+        else:
+            self.events.publish(event)
 
     def create_task(self, title: str, description: str, priority: Priority,
                     due_date: str, reminder_days: int = None) -> Optional[Task]:
@@ -17,10 +92,7 @@ class TaskService:
             raise ValueError("Название задачи не может быть пустым")
 
         # Проверяем дату
-        try:
-            datetime.strptime(due_date, '%d.%m.%Y')
-        except ValueError:
-            raise ValueError("Неверный формат даты. Используйте ДД.ММ.ГГГГ")
+        self._validate_due_date(due_date)
 
         # Рассчитываем дату напоминания если нужно
         reminder_date = None
@@ -41,84 +113,318 @@ class TaskService:
             reminder_sent=False
         )
 
-        task_id = self.db.create_task(task)
-        return self.db.get_task_by_id(task_id)
+        # ID выдает БД, остальные поля уже известны - повторно не читаем
+        task.id = self.db.create_task(task)
+        self._on_saved([task])
+        self._emit(TaskCreated(copy(task)))
+        return task
+
+    def create_tasks(self, tasks: Iterable[Task]) -> List[int]:
+        # Сначала проверяем все задачи, чтобы не записать пакет частично
+        tasks = list(tasks)
+        for task in tasks:
+            self.validate_task(task)
+            task.title = task.title.strip()
+
+        task_ids = self.db.create_tasks(tasks)
+        for task, task_id in zip(tasks, task_ids):
+            task.id = task_id
+        self._on_saved(tasks)
+        if task_ids:
+            self._emit(BulkChanged(created=tuple(task_ids)))
+        return task_ids
+
+    def update_tasks(self, tasks: Iterable[Task]) -> int:
+        tasks = list(tasks)
+        for task in tasks:
+            self.validate_task(task)
+        updated = self.db.update_tasks(tasks)
+        if updated == len(tasks):
+            self._on_saved(tasks)
+        else:
+            # Часть задач не найдена или запись не удалась - состояние неизвестно
+            self._invalidate(task.id for task in tasks)
+        if updated:
+            self._emit(BulkChanged(updated=tuple(task.id for task in tasks)))
+        return updated
+
+    def delete_tasks(self, task_ids: Iterable[int]) -> int:
+        task_ids = list(task_ids)
+        deleted = self.db.delete_tasks(task_ids)
+        if deleted:
+            self._on_deleted(task_ids)
+            self._emit(BulkChanged(deleted=tuple(task_ids)))
+        return deleted
+
+    def validate_task(self, task: Task) -> None:
+        if not task.title.strip():
+            raise ValueError("Название задачи не может быть пустым")
+        self._validate_due_date(task.due_date)
 
-    def process_reminders(self) -> int:
-        reminders = self.get_reminders()
-        sent_count = 0
+    def _validate_due_date(self, due_date: str) -> None:
+        try:
+            datetime.strptime(due_date, '%d.%m.%Y')
+        except (TypeError, ValueError):
+            raise ValueError("Неверный формат даты. Используйте ДД.ММ.ГГГГ")
 
-        for task in reminders:
-            print(f"НАПОМИНАНИЕ: '{task.title}' - срок: {task.due_date}")
-            if self.mark_reminder_sent(task.id):
-                sent_count += 1
+    def process_reminders(self, deliver: Callable[[Task], None] = None) -> int:
+        # Напоминания выбираются запросом по индексу и отмечаются одним UPDATE
+        # в той же транзакции. Отмечаются только доставленные: при ошибке
+        # доставки напоминание останется и будет отправлено при следующем проходе.
+        deliver = deliver or print_reminder
+        with self.transaction():
+            delivered = []
+            for task in self.db.get_due_reminders():
+                try:
+                    deliver(task)
+                except Exception as e:
+                    logger.warning(f"Не удалось доставить напоминание по задаче {task.id}: {e}")
+                    continue
+                delivered.append(task.id)
+
+            sent_count = self.db.mark_reminders_sent(delivered)
+            if sent_count:
+                self._invalidate(delivered)
+                self._emit(BulkChanged(updated=tuple(delivered)))
 
         return sent_count
     def get_all_tasks(self) -> List[Task]:
-        return self.db.get_all_tasks()
+        return self._cached_tasks(("all",), self.db.get_all_tasks)
+
+    def query_tasks(self, status: Status = None, priority: Priority = None,
+                    due_from: str = None, due_to: str = None, overdue_only: bool = False,
+                    order_by: str = None, limit: int = None) -> List[Task]:
+        # Фильтрация и сортировка выполняются в SQLite по индексам
+        query = TaskQuery(status=status, priority=priority, due_from=due_from, due_to=due_to,
+                          overdue_only=overdue_only, order_by=order_by)
+        return self._cached_tasks(("tasks", query, limit), lambda: self.db.query_tasks(query, limit))
+
+    def list_rows(self, status: Status = None, priority: Priority = None,
+                  order_by: str = None, columns=LIST_COLUMNS, ids: Iterable[int] = None,
+                  filter_text: str = None) -> List[tuple]:
+        # Легкие строки для списков: без описания и без создания объектов Task.
+        # Полная задача загружается через get_task при открытии диалога.
+        query = self._build_query(status, priority, order_by, ids, filter_text)
+        columns = tuple(columns)
+        # Строки проекции неизменяемы, поэтому отдаются без копирования
+        return list(self._cached_query(("rows", columns, query),
+                                       lambda: self.db.select_task_rows(columns, query)))
+
+    def find_tasks(self, filter_text: str, limit: int = None) -> List[Task]:
+        # Строка фильтра разбирается один раз (кэш) и выполняется одним запросом
+        query = parse_filter(filter_text)
+        return self._cached_tasks(("tasks", query, limit), lambda: self.db.query_tasks(query, limit))
+
+    def _build_query(self, status, priority, order_by, ids, filter_text) -> TaskQuery:
+        # Условия из строки фильтра важнее кнопок: кнопки заполняют только пропущенные
+        query = parse_filter(filter_text) if filter_text else TaskQuery()
+        return replace(query,
+                       status=query.status or status,
+                       priority=query.priority or priority,
+                       order_by=query.order_by or order_by,
+                       ids=ids if ids is not None else query.ids)
+
+    def get_tasks_page(self, order_by: str = "id", after_key: str = None, limit: int = 50,
+                       status: Status = None, priority: Priority = None) -> TaskPage:
+        # Курсор next_key передается обратно для получения следующей страницы
+        query = TaskQuery(status=status, priority=priority)
+        return self.db.get_tasks_page(order_by, after_key, limit, query)
 
     def get_task(self, task_id: int) -> Optional[Task]:
-        return self.db.get_task_by_id(task_id)
+        # Повторное чтение задачи - поиск в словаре без обращения к SQLite
+        self._check_external_writes()
+        task = self.cache.get(task_id)
+        if task is None:
+            task = self.db.get_task_by_id(task_id)
+            if task is not None:
+                self.cache.put(task)
+        return task
 
     def update_task(self, task: Task) -> bool:
         if not task.title.strip():
             raise ValueError("Название задачи не может быть пустым")
-        return self.db.update_task(task)
+        # Прежнее состояние берется только из кэша, без чтения из БД
+        old = self.cache.get(task.id)
+        success = self.db.update_task(task)
+        if success:
+            self._on_saved([task])
+            self._emit(TaskUpdated(copy(task), changed_fields(old, task) if old else None))
+        else:
+            self._invalidate([task.id])
+        return success
 
     def delete_task(self, task_id: int) -> bool:
-        return self.db.delete_task(task_id)
+        success = self.db.delete_task(task_id)
+        if success:
+            self._on_deleted([task_id])
+            self._emit(TaskDeleted(task_id))
+        return success
 
     def complete_task(self, task_id: int) -> bool:
-        task = self.get_task(task_id)
-        if not task:
-            return False
-
-        task.status = Status.COMPLETED
-        task.completed_date = datetime.now().strftime('%d.%m.%Y')
-        return self.update_task(task)
+        return self.change_status(task_id, Status.COMPLETED)
+
+    def complete_tasks(self, task_ids: Iterable[int],
+                       progress: Callable[[int, int], None] = None) -> int:
+        # Несколько задач за одно действие пользователя - одна фиксация.
+        # Исключение из progress (например, отмена задания) откатывает все изменения.
+        task_ids = list(task_ids)
+        completed = 0
+        with self.transaction():
+            for done, task_id in enumerate(task_ids, 1):
+                completed += self.complete_task(task_id)
+                if progress:
+                    progress(done, len(task_ids))
+        return completed
 
     def change_status(self, task_id: int, status: Status) -> bool:
+        # Один условный UPDATE вместо чтения задачи и перезаписи всей строки.
+        # Дата выполнения ставится при выполнении и сбрасывается при других статусах.
+        old = self.cache.get(task_id)
+        task = self.db.set_status(task_id, status, datetime.now().strftime('%d.%m.%Y'))
+        if task is not None:
+            self._on_transition(old, task)
+            return True
+        # Строка не изменена: задачи нет, статус уже такой или ошибка записи
         task = self.get_task(task_id)
-        if not task:
-            return False
-
-        task.status = status
-
-        # Если задача выполнена - ставим дату выполнения
-        if status == Status.COMPLETED and not task.completed_date:
-            task.completed_date = datetime.now().strftime('%d.%m.%Y')
-        elif status != Status.COMPLETED:
-            task.completed_date = None
-
-        return self.update_task(task)
+        return task is not None and task.status == status
 
     def get_reminders(self) -> List[Task]:
-        tasks = self.get_all_tasks()
-        return [task for task in tasks if task.needs_reminder()]
+        return self.db.get_due_reminders()
+
+    def get_upcoming_dates(self, after: str = None) -> List[tuple]:
+        # Будущие сроки и даты напоминаний открытых задач - для планировщика
+        return self.db.get_upcoming_dates(after)
 
     def mark_reminder_sent(self, task_id: int) -> bool:
+        old = self.cache.get(task_id)
+        task = self.db.set_reminder_sent(task_id)
+        if task is not None:
+            self._on_transition(old, task)
+            return True
         task = self.get_task(task_id)
-        if not task:
-            return False
-
-        task.reminder_sent = True
-        return self.update_task(task)
+        return task is not None and task.reminder_sent
 
-    def search(self, query: str) -> List[Task]:
+    def search(self, query: str, limit: Optional[int] = SEARCH_LIMIT) -> List[Task]:
         if not query.strip():
             return self.get_all_tasks()
 
+        # Лучшие limit задач по релевантности через индекс FTS5
+        match = fts_match_expression(query)
+        if match and self.db.has_search_index:
+            return self.db.search_tasks(match, limit)
+
         query = query.lower().strip()
-        tasks = self.get_all_tasks()
 
-        return [
-            task for task in tasks
+        # Без индекса задачи читаются потоком, в памяти остаются только совпадения
+        matches = (
+            task for task in self.db.iter_tasks()
             if query in task.title.lower() or query in task.description.lower()
-        ]
+        )
+        return list(islice(matches, limit))
+
+    def search_snippets(self, query: str, limit: int = 20) -> List[SearchHit]:
+        match = fts_match_expression(query)
+        if not match or not self.db.has_search_index:
+            return []
+        return self.db.search_snippets(match, limit)
+
+    def fuzzy_search(self, query: str, limit: int = 20,
+                     threshold: float = DEFAULT_THRESHOLD) -> List[Task]:
+        # Поиск с опечатками по названию: кандидаты берутся из индекса триграмм,
+        # точное сходство считается только для короткого списка
+        hits = self._get_fuzzy_index().search(query, limit, threshold)
+        return self.db.get_tasks_by_ids([task_id for task_id, _ in hits])
+
+    def typeahead(self, text: str, limit: int = TYPEAHEAD_LIMIT) -> List[int]:
+        # ID задач, в названии которых есть слова с каждым из введенных префиксов
+        return self._get_prefix_index().search(text, limit)
+
+    def complete_word(self, prefix: str, limit: int = 10) -> List[str]:
+        return self._get_prefix_index().complete(prefix, limit)
+
+    def build_prefix_index(self) -> None:
+        # Вызывается при запуске GUI, чтобы первое нажатие клавиши не ждало построения
+        self._prefix_index = PrefixIndex(self._load_titles())
+
+    def _get_prefix_index(self) -> PrefixIndex:
+        if self._prefix_index is None:
+            self.build_prefix_index()
+        return self._prefix_index
+
+    def _get_fuzzy_index(self) -> TrigramIndex:
+        if self._fuzzy_index is None:
+            self._fuzzy_index = TrigramIndex(self._load_titles())
+        return self._fuzzy_index
+
+    def _load_titles(self) -> List[tuple]:
+        return [(row.id, row.title) for row in self.db.select_task_rows(("id", "title"))]
+
+    def _on_saved(self, tasks: List[Task]) -> None:
+        # Запись через сервис: обновляем кэш и индексы поиска, результаты запросов сбрасываем
+        self._note_write()
+        self.cache.invalidate_queries()
+        for task in tasks:
+            self.cache.put(task)
+        # Пока индекс не построен, обновлять нечего: он прочитает актуальные названия
+        for index in (self._fuzzy_index, self._prefix_index):
+            if index is not None:
+                for task in tasks:
+                    index.add(task.id, task.title)
+
+    def _on_transition(self, old: Optional[Task], task: Task) -> None:
+        self._on_saved([task])
+        self._emit(TaskUpdated(copy(task), changed_fields(old, task) if old else None))
+
+    def _invalidate(self, task_ids: Iterable[int]) -> None:
+        # Задачи изменены без известного нового состояния - перечитаем при обращении
+        self._note_write()
+        self.cache.invalidate_queries()
+        for task_id in task_ids:
+            self.cache.discard(task_id)
+
+    def _on_deleted(self, task_ids: Iterable[int]) -> None:
+        task_ids = list(task_ids)
+        self._invalidate(task_ids)
+        for index in (self._fuzzy_index, self._prefix_index):
+            if index is not None:
+                for task_id in task_ids:
+                    index.remove(task_id)
+
+    def _note_write(self) -> None:
+        # Внутри transaction() запись учитывается один раз при фиксации внешнего блока
+        if getattr(self._tx, 'depth', 0):
+            self._tx.wrote = True
+        else:
+            self.cache.note_write(threading.get_ident())
+
+    def _check_external_writes(self) -> None:
+        # PRAGMA data_version меняется только при записи другим подключением
+        if self.cache.check_version(threading.get_ident(), self.db.data_version()):
+            logger.info("БД изменена другим подключением, кэш и индексы поиска сброшены")
+            self._fuzzy_index = None
+            self._prefix_index = None
+            self._emit(BulkChanged(full_reload=True))
+
+    def _cached_query(self, key, load) -> tuple:
+        self._check_external_writes()
+        # Признак просрочки зависит от текущей даты, поэтому она входит в ключ
+        key = (key, today_storage())
+        result = self.cache.get_query(key)
+        if result is None:
+            generation = self.cache.generation
+            result = self.cache.put_query(key, load(), generation)
+        return result
+
+    def _cached_tasks(self, key, load) -> List[Task]:
+        # Задачи отдаются копиями, чтобы изменения вызывающего не попали в кэш
+        return [copy(task) for task in self._cached_query(key, load)]
 
-    def get_overdue(self) -> List[Task]:
-        tasks = self.get_all_tasks()
-        return [task for task in tasks if task.is_overdue()]
+    def get_overdue(self, today: Optional[date] = None) -> List[Task]:
+        # Просроченные выбираются по частичному индексу, а не из полного списка задач
+        query = TaskQuery(overdue_only=True)
+        day = (today or date.today()).isoformat()
+        return self._cached_tasks(("tasks", query, None, day),
+                                  lambda: self.db.query_tasks(query, today=day))
 
     def filter_tasks(self, tasks: List[Task], status: Status = None, priority: Priority = None) -> List[Task]:
         result = tasks
@@ -135,14 +441,15 @@ class TaskService:
         if not tasks:
             return tasks
 
+        # Ключи - номера дней: каждая различная дата разбирается один раз
         if by == "due_date":
-            return sorted(tasks, key=lambda x: datetime.strptime(x.due_date, '%d.%m.%Y'))
+            return sorted(tasks, key=lambda x: x.due_ordinal or 0)
         elif by == "due_date_desc":
-            return sorted(tasks, key=lambda x: datetime.strptime(x.due_date, '%d.%m.%Y'), reverse=True)
+            return sorted(tasks, key=lambda x: x.due_ordinal or 0, reverse=True)
         elif by == "priority":
             priority_order = {Priority.HIGH: 0, Priority.MEDIUM: 1, Priority.LOW: 2}
             return sorted(tasks, key=lambda x: priority_order[x.priority])
         elif by == "created_date":
-            return sorted(tasks, key=lambda x: datetime.strptime(x.created_date, '%d.%m.%Y'), reverse=True)
+            return sorted(tasks, key=lambda x: to_ordinal(x.created_date) or 0, reverse=True)
         else:  # created_date по умолчанию
-            return sorted(tasks, key=lambda x: datetime.strptime(x.created_date, '%d.%m.%Y'), reverse=True)
\ No newline at end of file
+            return sorted(tasks, key=lambda x: to_ordinal(x.created_date) or 0, reverse=True)
\ No newline at end of file
@@ -0,0 +1,53 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.autocomplete import PrefixIndex, title_words
+
+
+class TestPrefixIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = PrefixIndex([
+            (1, "Отчёт за март"),
+            (2, "Отчет за апрель"),
+            (3, "Отправить письмо"),
+            (4, "Купить молоко"),
+        ])
+
+    def test_title_words_normalized(self):
+        self.assertEqual(title_words("Отчёт, ЗА март!"), {"отчет", "за", "март"})
+
+    def test_search_by_prefixes(self):
+        self.assertEqual(self.index.search("от"), [1, 2, 3])
+        self.assertEqual(self.index.search("ОТЧ мар"), [1])
+        self.assertEqual(self.index.search("мар отч"), [1])
+        self.assertEqual(self.index.search("отч молоко"), [])
+        self.assertEqual(self.index.search("   "), [])
+
+    def test_search_limit(self):
+        self.assertEqual(len(self.index.search("от", limit=2)), 2)
+
+    def test_complete_words(self):
+        self.assertEqual(self.index.complete("от"), ["отправить", "отчет"])
+        self.assertEqual(self.index.complete("от", limit=1), ["отправить"])
+        self.assertEqual(self.index.complete("я"), [])
+
+    def test_incremental_updates(self):
+        self.index.add(4, "Купить хлеб")
+        self.assertEqual(self.index.search("мол"), [])
+        self.assertEqual(self.index.complete("мол"), [])
+        self.assertEqual(self.index.search("хле"), [4])
+
+        self.index.add(5, "Отчет за май")
+        self.assertEqual(self.index.search("отчет ма"), [1, 5])
+
+        self.index.remove(3)
+        self.assertEqual(self.index.complete("отп"), [])
+        self.assertEqual(len(self.index), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.events import EventBus, TaskDeleted
+from services.background import IDLE_POLL_MS, POLL_MS, BackgroundWorker
+
+
+class FakeTimer:
+    """Таймер с интерфейсом Tk after/after_cancel, запускаемый вручную"""
+
+    def __init__(self):
+        self.jobs = {}
+        self._next_id = 0
+
+    def after(self, ms, callback):
+        self._next_id += 1
+        self.jobs[self._next_id] = (ms, callback)
+        return self._next_id
+
+    def after_cancel(self, job_id):
+        self.jobs.pop(job_id, None)
+
+    def run(self):
+        jobs, self.jobs = self.jobs, {}
+        for _, callback in jobs.values():
+            callback()
+
+
+class TestBackgroundWorker(unittest.TestCase):
+
+    def setUp(self):
+        self.timer = FakeTimer()
+        self.events = EventBus()
+        self.worker = BackgroundWorker(self.timer, self.events)
+
+    def tearDown(self):
+        self.worker.shutdown()
+
+    def wait_idle(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.worker.busy():
+            self.assertLess(time.monotonic(), deadline, "фоновые операции не завершились")
+            time.sleep(0.005)
+            self.timer.run()
+
+    def test_result_delivered_in_polling_thread(self):
+        results = []
+        self.worker.submit(lambda: threading.get_ident(),
+                           on_done=lambda worker_thread: results.append((worker_thread, threading.get_ident())))
+        self.assertEqual(results, [])
+        self.wait_idle()
+
+        (worker_thread, callback_thread), = results
+        self.assertNotEqual(worker_thread, callback_thread)
+        self.assertEqual(callback_thread, threading.get_ident())
+
+    def test_burst_with_same_key_coalesces(self):
+        release = threading.Event()
+        calls = []
+        shown = []
+
+        def load(value):
+            calls.append(value)
+            release.wait(5)
+            return value
+
+        for value in range(5):
+            self.worker.submit(load, value, on_done=shown.append, key="refresh")
+        self.assertTrue(self.worker.busy("refresh"))
+        release.set()
+        self.wait_idle()
+
+        # Первая загрузка уже шла, остальные слились в одну с последними параметрами
+        self.assertEqual(calls, [0, 4])
+        self.assertEqual(shown, [4])
+        self.assertFalse(self.worker.busy("refresh"))
+
+    def test_cancel_drops_result(self):
+        release = threading.Event()
+        shown = []
+        self.worker.submit(release.wait, 5, on_done=shown.append, key="refresh")
+        self.worker.cancel("refresh")
+        release.set()
+        self.wait_idle()
+        self.assertEqual(shown, [])
+
+    def test_error_goes_to_handler(self):
+        errors = []
+
+        def fail():
+            raise ValueError("ошибка")
+
+        self.worker.submit(fail, on_error=errors.append)
+        self.wait_idle()
+        self.assertIsInstance(errors[0], ValueError)
+
+    def test_shutdown_cancels_pending_calls(self):
+        release = threading.Event()
+        worker = BackgroundWorker(self.timer, max_workers=1)
+        calls = []
+        worker.submit(release.wait, 5)
+        worker.submit(calls.append, 1)
+        worker.shutdown()
+        release.set()
+        worker._executor.shutdown(wait=True)
+        self.assertEqual(calls, [])
+
+    def test_poll_dispatches_queued_events(self):
+        received = []
+        self.events.subscribe(TaskDeleted, received.append, queued=True)
+        thread = threading.Thread(target=self.events.publish, args=(TaskDeleted(1),))
+        thread.start()
+        thread.join()
+
+        self.worker.start()
+        self.timer.run()
+        self.assertEqual(received, [TaskDeleted(1)])
+        # Без заданий опрос продолжается реже
+        (delay, _), = self.timer.jobs.values()
+        self.assertEqual(delay, IDLE_POLL_MS)
+        self.assertGreater(IDLE_POLL_MS, POLL_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
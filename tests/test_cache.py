@@ -0,0 +1,95 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.cache import TaskCache
+from core.models import Task, Status, Priority
+
+
+def make_task(task_id: int, title: str = "Задача") -> Task:
+    return Task(id=task_id, title=title, description="", priority=Priority.LOW,
+                status=Status.PLANNED, created_date="01.01.2025", due_date="31.12.2025")
+
+
+class TestTaskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = TaskCache(max_tasks=2, max_queries=2)
+
+    def test_get_returns_copies(self):
+        self.cache.put(make_task(1))
+        task = self.cache.get(1)
+        task.title = "Изменено"
+        self.assertEqual(self.cache.get(1).title, "Задача")
+        self.assertIsNone(self.cache.get(2))
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+
+    def test_lru_eviction(self):
+        self.cache.put(make_task(1))
+        self.cache.put(make_task(2))
+        self.cache.get(1)
+        self.cache.put(make_task(3))
+        self.assertIsNone(self.cache.get(2))
+        self.assertIsNotNone(self.cache.get(1))
+
+        for key in ("a", "b", "c"):
+            self.cache.put_query(key, [], self.cache.generation)
+        self.assertIsNone(self.cache.get_query("a"))
+        self.assertEqual(self.cache.get_query("c"), ())
+
+    def test_stale_query_result_is_not_stored(self):
+        generation = self.cache.generation
+        self.cache.invalidate_queries()
+        self.assertEqual(self.cache.put_query("all", [make_task(1)], generation)[0].id, 1)
+        self.assertIsNone(self.cache.get_query("all"))
+
+    def test_check_version_clears_on_change(self):
+        self.assertFalse(self.cache.check_version(1, 5))
+        self.cache.put(make_task(1))
+        self.assertFalse(self.cache.check_version(1, 5))
+        self.assertIsNotNone(self.cache.get(1))
+        self.assertTrue(self.cache.check_version(1, 6))
+        self.assertIsNone(self.cache.get(1))
+
+    def test_check_version_ignores_own_process_writes(self):
+        self.cache.check_version(1, 5)
+        self.cache.put(make_task(1))
+        # Версию изменила запись другого потока этого процесса
+        self.cache.note_write(2)
+        self.assertFalse(self.cache.check_version(1, 6))
+        self.assertIsNotNone(self.cache.get(1))
+        # Собственная запись потока не меняет его data_version
+        self.cache.note_write(1)
+        self.assertTrue(self.cache.check_version(1, 7))
+
+    def test_external_write_alongside_local_write_is_detected(self):
+        self.cache.check_version(1, 5)
+        self.cache.put(make_task(1))
+        self.cache.note_write(2)
+        # Две прибавки при одной ожидаемой: вторую сделало другое подключение
+        self.assertTrue(self.cache.check_version(1, 7))
+        self.assertIsNone(self.cache.get(1))
+
+    def test_first_check_of_thread_keeps_cache(self):
+        self.cache.check_version(1, 5)
+        self.cache.put(make_task(1))
+        generation = self.cache.generation
+        self.assertFalse(self.cache.check_version(2, 40))
+        self.assertIsNotNone(self.cache.get(1))
+        self.assertEqual(self.cache.generation, generation)
+
+    def test_query_cache_limited_by_rows(self):
+        cache = TaskCache(max_query_rows=3)
+        cache.put_query("big", [make_task(i) for i in range(4)], cache.generation)
+        self.assertIsNone(cache.get_query("big"))
+
+        cache.put_query("a", [make_task(1), make_task(2)], cache.generation)
+        cache.put_query("b", [make_task(3)], cache.generation)
+        cache.put_query("c", [make_task(4)], cache.generation)
+        self.assertIsNone(cache.get_query("a"))
+        self.assertEqual(len(cache.get_query("b")) + len(cache.get_query("c")), 2)
+
+if __name__ == "__main__":
+    unittest.main()
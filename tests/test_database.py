@@ -0,0 +1,467 @@
+import unittest
+import os
+import sys
+import tempfile
+import gzip
+import json
+import sqlite3
+import threading
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.database import DUE_REMINDERS_SQL, Database
+from core.migrations import LATEST_VERSION, get_schema_version
+from core.models import Task, Status, Priority
+from core.query import TaskQuery, fts_match_expression
+
+
+class TestDatabase(unittest.TestCase):
+
+    def setUp(self):
+        # Создаем временную базу данных для каждого теста
+        self.temp_db = tempfile.mktemp(suffix='.db')
+        self.db = Database(self.temp_db)
+
+    def tearDown(self):
+        # Удаляем временную базу данных
+        self.db.close()
+        try:
+            if hasattr(self, 'temp_db') and os.path.exists(self.temp_db):
+                os.unlink(self.temp_db)
+        except:
+            pass
+
+    def _make_task(self, title="Задача", due_date="31.12.2025",
+                   priority=Priority.MEDIUM, status=Status.PLANNED):
+        return Task(
+            id=0,
+            title=title,
+            description="Описание",
+            priority=priority,
+            status=status,
+            created_date="01.01.2025",
+            due_date=due_date
+        )
+
+    def test_connection_reused_within_thread(self):
+        first = self.db._connections.connection()
+        self.db.create_task(self._make_task())
+        self.db.get_all_tasks()
+        self.assertIs(self.db._connections.connection(), first)
+
+    def test_connection_per_thread(self):
+        main_conn = self.db._connections.connection()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.db._connections.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], main_conn)
+
+    def test_wal_journal_mode(self):
+        mode = self.db._connections.connection().execute('PRAGMA journal_mode').fetchone()[0]
+        self.assertEqual(mode, 'wal')
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.db._connections.transaction() as conn:
+                conn.execute(
+                    "INSERT INTO tasks (title, description, priority, status, created_date, due_date) "
+                    "VALUES ('Откат', '', 'низкий', 'Запланирована', '2025-01-01', '2025-12-31')")
+                raise RuntimeError("ошибка")
+        self.assertEqual(len(self.db.get_all_tasks()), 0)
+
+    def test_transaction_commits_once_with_savepoints(self):
+        with self.db.transaction():
+            first = self.db.create_task(self._make_task("Первая"))
+            with self.assertRaises(RuntimeError):
+                with self.db.transaction():
+                    self.db.create_task(self._make_task("Откатится"))
+                    raise RuntimeError("ошибка")
+            self.db.set_status(first, Status.COMPLETED, "10.01.2025")
+            # Другое подключение не видит незафиксированных изменений
+            with Database(self.temp_db) as other:
+                self.assertEqual(other.get_all_tasks(), [])
+
+        tasks = self.db.get_all_tasks()
+        self.assertEqual([(t.title, t.status) for t in tasks], [("Первая", Status.COMPLETED)])
+
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.delete_task(first)
+                raise RuntimeError("ошибка")
+        self.assertIsNotNone(self.db.get_task_by_id(first))
+
+    def test_close_and_reopen(self):
+        task_id = self.db.create_task(self._make_task("Сохраненная"))
+        self.db.close()
+        # После close() подключение открывается заново при обращении
+        self.assertEqual(self.db.get_task_by_id(task_id).title, "Сохраненная")
+
+    def test_context_manager_closes_connections(self):
+        with Database(self.temp_db) as db:
+            db.create_task(self._make_task())
+            self.assertTrue(db._connections._connections)
+        self.assertFalse(db._connections._connections)
+
+    def test_schema_version_is_latest(self):
+        conn = self.db._connections.connection()
+        self.assertEqual(get_schema_version(conn), LATEST_VERSION)
+
+    def test_status_query_uses_index(self):
+        conn = self.db._connections.connection()
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE status = ?",
+                            (Status.PLANNED.value,)).fetchall()
+        self.assertIn("USING", " ".join(row[-1] for row in plan))
+
+    def test_upgrade_unversioned_database_in_place(self):
+        # БД старого формата: только таблица tasks, без schema_version
+        old_db = tempfile.mktemp(suffix='.db')
+        conn = sqlite3.connect(old_db)
+        conn.execute('''
+            CREATE TABLE tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL CHECK(length(title) <= 500),
+                description TEXT CHECK(description IS NULL OR length(description) <= 2000),
+                priority TEXT NOT NULL CHECK(priority IN ('низкий', 'средний', 'высокий')),
+                status TEXT NOT NULL CHECK(status IN ('Запланирована', 'В работе', 'Выполнена')),
+                created_date TEXT NOT NULL,
+                due_date TEXT NOT NULL,
+                completed_date TEXT,
+                reminder_date TEXT,
+                reminder_sent BOOLEAN DEFAULT 0,
+                CHECK (due_date IS NULL OR due_date GLOB '[0-9][0-9].[0-9][0-9].[0-9][0-9][0-9][0-9]')
+            )
+        ''')
+        conn.execute("INSERT INTO tasks (title, description, priority, status, created_date, due_date) "
+                     "VALUES ('Старая задача', '', 'высокий', 'В работе', '01.02.2024', '15.03.2024')")
+        conn.commit()
+        conn.close()
+
+        try:
+            with Database(old_db) as db:
+                tasks = db.get_all_tasks()
+                self.assertEqual(len(tasks), 1)
+                self.assertEqual(tasks[0].title, "Старая задача")
+                self.assertEqual(tasks[0].due_date, "15.03.2024")
+
+                raw = db._connections.connection().execute(
+                    "SELECT created_date, due_date FROM tasks").fetchone()
+                self.assertEqual(raw, ("2024-02-01", "2024-03-15"))
+
+                indexes = {row[0] for row in db._connections.connection().execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tasks'")}
+                self.assertIn('idx_tasks_open_due', indexes)
+                self.assertIn('idx_tasks_reminder_pending', indexes)
+                self.assertEqual(get_schema_version(db._connections.connection()), LATEST_VERSION)
+
+                # Индекс FTS5 заполнен по уже существующим задачам
+                self.assertEqual([t.title for t in db.search_tasks(fts_match_expression("старая"))],
+                                 ["Старая задача"])
+
+            # Повторное открытие не применяет миграции заново
+            with Database(old_db) as db:
+                self.assertEqual(len(db.get_all_tasks()), 1)
+        finally:
+            os.unlink(old_db)
+
+    def test_dates_stored_sortable(self):
+        self.db.create_task(self._make_task("Поздняя", "05.01.2026"))
+        self.db.create_task(self._make_task("Ранняя", "20.12.2025"))
+
+        conn = self.db._connections.connection()
+        rows = conn.execute("SELECT title, due_date FROM tasks ORDER BY due_date").fetchall()
+        self.assertEqual(rows, [("Ранняя", "2025-12-20"), ("Поздняя", "2026-01-05")])
+
+        # В модели дата остается в формате ДД.ММ.ГГГГ
+        self.assertEqual(self.db.get_all_tasks()[0].due_date, "05.01.2026")
+
+    def test_invalid_due_date_rejected(self):
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.create_task(self._make_task(due_date="2025/12/31"))
+
+    def test_date_migration_keeps_autoincrement_counter(self):
+        old_db = tempfile.mktemp(suffix='.db')
+        conn = sqlite3.connect(old_db)
+        conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, "
+                     "description TEXT, priority TEXT NOT NULL, status TEXT NOT NULL, "
+                     "created_date TEXT NOT NULL, due_date TEXT NOT NULL, completed_date TEXT, "
+                     "reminder_date TEXT, reminder_sent BOOLEAN DEFAULT 0)")
+        for title in ("Первая", "Вторая"):
+            conn.execute("INSERT INTO tasks (title, description, priority, status, created_date, due_date) "
+                         "VALUES (?, '', 'низкий', 'Запланирована', '01.01.2025', '31.12.2025')", (title,))
+        conn.execute("DELETE FROM tasks WHERE title = 'Вторая'")
+        conn.commit()
+        conn.close()
+
+        try:
+            with Database(old_db) as db:
+                new_id = db.create_task(self._make_task("Новая"))
+                self.assertEqual(new_id, 3)
+        finally:
+            os.unlink(old_db)
+
+    def test_query_tasks_filters_in_sql(self):
+        self.db.create_tasks([
+            self._make_task("Высокая в работе", priority=Priority.HIGH, status=Status.IN_PROGRESS),
+            self._make_task("Высокая план", priority=Priority.HIGH),
+            self._make_task("Низкая в работе", priority=Priority.LOW, status=Status.IN_PROGRESS),
+        ])
+
+        tasks = self.db.query_tasks(TaskQuery(status=Status.IN_PROGRESS, priority=Priority.HIGH))
+        self.assertEqual([task.title for task in tasks], ["Высокая в работе"])
+
+        tasks = self.db.query_tasks(TaskQuery(priority=[Priority.HIGH, Priority.LOW]))
+        self.assertEqual(len(tasks), 3)
+
+    def test_query_tasks_due_range_and_order(self):
+        self.db.create_tasks([
+            self._make_task("Март", "15.03.2026"),
+            self._make_task("Январь", "10.01.2026"),
+            self._make_task("Декабрь", "01.12.2025"),
+        ])
+
+        tasks = self.db.query_tasks(TaskQuery(due_from="01.01.2026", order_by="due_date"))
+        self.assertEqual([task.title for task in tasks], ["Январь", "Март"])
+
+        tasks = self.db.query_tasks(TaskQuery(order_by="due_date_desc"), limit=1)
+        self.assertEqual([task.title for task in tasks], ["Март"])
+
+    def test_query_tasks_overdue_only(self):
+        self.db.create_tasks([
+            self._make_task("Просроченная", "01.01.2020"),
+            self._make_task("Выполненная", "01.01.2020", status=Status.COMPLETED),
+            self._make_task("Будущая", "01.01.2099"),
+        ])
+
+        tasks = self.db.query_tasks(TaskQuery(overdue_only=True))
+        self.assertEqual([task.title for task in tasks], ["Просроченная"])
+
+    def test_query_tasks_uses_indexes(self):
+        conn = self.db._connections.connection()
+        query = TaskQuery(status=Status.IN_PROGRESS, priority=Priority.HIGH)
+        where, params = query.where_clause("2025-01-01")
+        plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE {where}", params).fetchall()
+        self.assertIn("idx_tasks_status_priority", " ".join(row[-1] for row in plan))
+
+        where, params = TaskQuery(overdue_only=True).where_clause("2025-01-01")
+        plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM tasks WHERE {where}", params).fetchall()
+        self.assertIn("idx_tasks_open_due", " ".join(row[-1] for row in plan))
+
+    def test_overdue_query_reads_partial_index(self):
+        # Полный запрос с сортировкой по умолчанию не должен просматривать таблицу
+        conn = self.db._connections.connection()
+        sql, params = self.db._select_sql(TaskQuery(overdue_only=True))
+        plan = " ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        self.assertIn("idx_tasks_open_due", plan)
+        self.assertNotIn("SCAN tasks", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_unknown_order_rejected(self):
+        with self.assertRaises(ValueError):
+            TaskQuery(order_by="title")
+
+    def test_get_tasks_page_walks_all_orderings(self):
+        self.db.create_tasks([
+            self._make_task(f"Задача {i}", f"{i % 7 + 1:02d}.0{i % 3 + 1}.2026",
+                            priority=[Priority.LOW, Priority.MEDIUM, Priority.HIGH][i % 3])
+            for i in range(23)
+        ])
+
+        for order_by in ("id", "due_date", "due_date_desc", "priority", "created_date"):
+            expected = [task.id for task in self.db.query_tasks(TaskQuery(order_by=order_by))]
+            seen = []
+            after_key = None
+            while True:
+                page = self.db.get_tasks_page(order_by, after_key, limit=5)
+                seen.extend(task.id for task in page.tasks)
+                if page.next_key is None:
+                    break
+                after_key = page.next_key
+            self.assertEqual(seen, expected, order_by)
+
+    def test_get_tasks_page_with_filter(self):
+        self.db.create_tasks([self._make_task(f"Высокая {i}", priority=Priority.HIGH) for i in range(3)])
+        self.db.create_task(self._make_task("Низкая", priority=Priority.LOW))
+
+        page = self.db.get_tasks_page("id", limit=2, query=TaskQuery(priority=Priority.HIGH))
+        self.assertEqual(len(page.tasks), 2)
+        page = self.db.get_tasks_page("id", page.next_key, limit=2, query=TaskQuery(priority=Priority.HIGH))
+        self.assertEqual([task.title for task in page.tasks], ["Высокая 2"])
+        self.assertIsNone(page.next_key)
+
+    def test_get_tasks_page_rejects_foreign_cursor(self):
+        self.db.create_tasks([self._make_task() for _ in range(3)])
+        page = self.db.get_tasks_page("due_date", limit=1)
+
+        with self.assertRaises(ValueError):
+            self.db.get_tasks_page("priority", page.next_key, limit=1)
+        with self.assertRaises(ValueError):
+            self.db.get_tasks_page("id", "не-курсор", limit=1)
+
+    def test_iter_tasks_streams_in_batches(self):
+        self.db.create_tasks([self._make_task(f"Задача {i}") for i in range(7)])
+
+        titles = [task.title for task in self.db.iter_tasks(batch_size=3)]
+        self.assertEqual(titles, [f"Задача {i}" for i in range(7)])
+
+        tasks = list(self.db.iter_tasks(TaskQuery(order_by="created_date"), batch_size=2))
+        self.assertEqual(len(tasks), 7)
+
+    def test_iter_tasks_closes_read_transaction(self):
+        self.db.create_tasks([self._make_task() for _ in range(5)])
+        conn = self.db._connections.connection()
+
+        tasks = self.db.iter_tasks(batch_size=2)
+        next(tasks)
+        self.assertTrue(conn.in_transaction)
+        tasks.close()
+        self.assertFalse(conn.in_transaction)
+
+        # После досрочного закрытия записи фиксируются как обычно
+        self.db.create_task(self._make_task("После итерации"))
+        self.assertFalse(conn.in_transaction)
+
+    def test_select_task_rows_projection(self):
+        self.db.create_task(self._make_task("Просроченная", "01.01.2020", priority=Priority.HIGH))
+        self.db.create_task(self._make_task("Будущая", "01.01.2099"))
+
+        rows = self.db.select_task_rows(("id", "title", "priority", "due_date", "overdue"),
+                                        TaskQuery(order_by="due_date"))
+
+        self.assertEqual(rows[0].title, "Просроченная")
+        self.assertEqual(rows[0].priority, Priority.HIGH)
+        self.assertEqual(rows[0].due_date, "01.01.2020")
+        self.assertTrue(rows[0].overdue)
+        self.assertFalse(rows[1].overdue)
+        self.assertFalse(hasattr(rows[0], "description"))
+        with self.assertRaises(AttributeError):
+            rows[0].title = "Изменено"
+
+    def test_update_task_checks_version(self):
+        task_id = self.db.create_task(self._make_task())
+        first = self.db.get_task_by_id(task_id)
+        second = self.db.get_task_by_id(task_id)
+
+        first.title = "Первое изменение"
+        self.assertTrue(self.db.update_task(first))
+        self.assertEqual(first.version, 1)
+
+        # Вторая копия прочитана до изменения - запись не затирает его
+        second.title = "Второе изменение"
+        self.assertFalse(self.db.update_task(second))
+        self.assertEqual(self.db.get_task_by_id(task_id).title, "Первое изменение")
+
+    def test_set_status_single_update(self):
+        task_id = self.db.create_task(self._make_task())
+        for returning in (True, False):
+            with self.subTest(returning=returning), \
+                    patch('core.database.HAS_RETURNING', returning):
+                task = self.db.set_status(task_id, Status.COMPLETED, "10.01.2025")
+                self.assertEqual((task.status, task.completed_date), (Status.COMPLETED, "10.01.2025"))
+                # Повторный переход ничего не меняет
+                self.assertIsNone(self.db.set_status(task_id, Status.COMPLETED, "11.01.2025"))
+
+                task = self.db.set_status(task_id, Status.IN_PROGRESS)
+                self.assertEqual((task.status, task.completed_date), (Status.IN_PROGRESS, None))
+        self.assertIsNone(self.db.set_status(99999, Status.COMPLETED, "10.01.2025"))
+
+    def test_set_status_expected_version(self):
+        task_id = self.db.create_task(self._make_task())
+        self.assertIsNone(self.db.set_status(task_id, Status.IN_PROGRESS, expected_version=5))
+        task = self.db.set_status(task_id, Status.IN_PROGRESS, expected_version=0)
+        self.assertEqual(task.version, 1)
+
+    def test_set_reminder_sent(self):
+        task_id = self.db.create_task(self._make_task())
+        self.assertTrue(self.db.set_reminder_sent(task_id).reminder_sent)
+        self.assertIsNone(self.db.set_reminder_sent(task_id))
+
+    def test_due_reminders_use_partial_index(self):
+        due = self._make_task("Пора напомнить")
+        due.reminder_date = "01.01.2020"
+        later = self._make_task("Позже")
+        later.reminder_date = "01.01.2099"
+        done = self._make_task("Выполнена", status=Status.COMPLETED)
+        done.reminder_date = "01.01.2020"
+        ids = self.db.create_tasks([due, later, done])
+
+        self.assertEqual([t.id for t in self.db.get_due_reminders()], [ids[0]])
+        conn = self.db._connections.connection()
+        plan = conn.execute("EXPLAIN QUERY PLAN " + DUE_REMINDERS_SQL, ("2025-01-01",)).fetchall()
+        self.assertIn("idx_tasks_reminder_pending", " ".join(row[-1] for row in plan))
+
+        self.assertEqual(self.db.mark_reminders_sent(ids + [99999]), 3)
+        self.assertEqual(self.db.mark_reminders_sent(ids), 0)
+        self.assertEqual(self.db.get_due_reminders(), [])
+
+
+        with self.assertRaises(ValueError):
+            self.db.select_task_rows(("id", "title; DROP TABLE tasks",))
+
+    def test_search_index_follows_writes(self):
+        self.assertTrue(self.db.has_search_index)
+        task_id = self.db.create_task(self._make_task("Подготовить отчет"))
+        self.db.create_tasks([self._make_task("Позвонить клиенту")])
+        match = fts_match_expression("ОТЧЕТ")
+        self.assertEqual([t.id for t in self.db.search_tasks(match)], [task_id])
+
+        task = self.db.get_task_by_id(task_id)
+        task.title = "Подготовить презентацию"
+        self.db.update_task(task)
+        self.assertEqual(self.db.search_tasks(match), [])
+        self.assertEqual(len(self.db.search_tasks(fts_match_expression("презент"))), 1)
+
+        self.db.delete_task(task_id)
+        self.assertEqual(self.db.search_tasks(fts_match_expression("презент")), [])
+
+    def test_search_ranks_title_matches_first(self):
+        in_description = self._make_task("Звонок")
+        in_description.description = "обсудить бюджет проекта"
+        self.db.create_tasks([in_description, self._make_task("Бюджет на квартал")])
+
+        results = self.db.search_tasks(fts_match_expression("бюдж"), limit=10)
+
+        self.assertEqual([t.title for t in results], ["Бюджет на квартал", "Звонок"])
+        self.assertEqual(len(self.db.search_tasks(fts_match_expression("бюдж"), limit=1)), 1)
+        self.assertEqual(self.db.search_tasks(fts_match_expression("бюджет звонок")), [results[1]])
+
+    def test_search_snippets_highlight_matches(self):
+        task = self._make_task("Отчет за март")
+        task.description = "Собрать данные и отправить отчет руководителю"
+        self.db.create_tasks([task])
+
+        hits = self.db.search_snippets(fts_match_expression("отчет"))
+
+        self.assertEqual(len(hits), 1)
+        self.assertEqual(hits[0].title, "[Отчет] за март")
+        self.assertIn("[отчет]", hits[0].snippet)
+
+    def test_export_to_json_format_unchanged(self):
+        self.assertEqual(self.db.export_to_json(), json.dumps({"tasks": []}, ensure_ascii=False, indent=2))
+
+        self.db.create_tasks([self._make_task(f"Задача «{i}»") for i in range(3)])
+        expected = json.dumps({"tasks": [task.to_dict() for task in self.db.get_all_tasks()]},
+                              ensure_ascii=False, indent=2)
+        self.assertEqual(self.db.export_to_json(), expected)
+
+    def test_export_to_file_ndjson_gzip_with_progress(self):
+        self.db.create_tasks([self._make_task(f"Задача {i}") for i in range(4)])
+        path = tempfile.mktemp(suffix='.ndjson.gz')
+        calls = []
+
+        try:
+            count = self.db.export_to_file(path, progress=lambda done, total: calls.append((done, total)))
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                lines = [json.loads(line) for line in f]
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+
+        self.assertEqual(count, 4)
+        self.assertEqual([item["title"] for item in lines], [f"Задача {i}" for i in range(4)])
+        self.assertEqual(calls[-1], (4, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.events import BulkChanged, EventBus, TaskCreated, TaskDeleted, TaskEvent, changed_fields
+from core.models import Task, Status, Priority
+
+
+def make_task(task_id: int = 1, title: str = "Задача") -> Task:
+    return Task(id=task_id, title=title, description="", priority=Priority.LOW,
+                status=Status.PLANNED, created_date="01.01.2025", due_date="31.12.2025")
+
+
+class TestEventBus(unittest.TestCase):
+
+    def setUp(self):
+        self.bus = EventBus()
+        self.received = []
+
+    def test_sync_subscribers_by_type(self):
+        self.bus.subscribe(TaskDeleted, self.received.append)
+        self.bus.subscribe(TaskEvent, lambda event: self.received.append(("все", event)))
+        self.bus.publish(TaskDeleted(1))
+        self.bus.publish(BulkChanged(created=(2, 3)))
+        self.assertEqual(self.received, [TaskDeleted(1), ("все", TaskDeleted(1)),
+                                         ("все", BulkChanged(created=(2, 3)))])
+
+    def test_queued_subscribers_wait_for_dispatch(self):
+        self.bus.subscribe(TaskCreated, self.received.append, queued=True)
+        event = TaskCreated(make_task())
+        self.bus.publish(event)
+        self.assertEqual(self.received, [])
+        self.assertEqual(self.bus.dispatch_queued(), 1)
+        self.assertEqual(self.received, [event])
+
+    def test_unsubscribe_and_failing_handler(self):
+        def fail(event):
+            raise RuntimeError("ошибка")
+
+        self.bus.subscribe(TaskDeleted, fail)
+        unsubscribe = self.bus.subscribe(TaskDeleted, self.received.append)
+        self.bus.publish(TaskDeleted(1))
+        unsubscribe()
+        self.bus.publish(TaskDeleted(2))
+        self.assertEqual(self.received, [TaskDeleted(1)])
+
+    def test_changed_fields(self):
+        old, new = make_task(), make_task(title="Другое")
+        new.status = Status.COMPLETED
+        self.assertEqual(changed_fields(old, new), {"title", "status"})
+
+
+if __name__ == "__main__":
+    unittest.main()
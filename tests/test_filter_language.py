@@ -0,0 +1,83 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.database import Database
+from core.filter_language import FilterSyntaxError, parse_filter
+from core.models import Priority, Status
+from core.query import TaskQuery
+from services.task_service import TaskService
+
+
+class TestFilterLanguage(unittest.TestCase):
+
+    def test_parse_full_example(self):
+        query = parse_filter('status:"В работе" priority:высокий due<01.12.2025 overdue text:отчёт')
+        self.assertEqual(query, TaskQuery(status=(Status.IN_PROGRESS,), priority=(Priority.HIGH,),
+                                          due_to="30.11.2025", overdue_only=True, text="отчёт"))
+
+    def test_parse_lists_ranges_and_sort(self):
+        query = parse_filter('статус:запланирована,"в работе" due>=01.11.2025 due<=30.11.2025 '
+                             'due>05.11.2025 sort:-due отчет март')
+        self.assertEqual(query.status, (Status.PLANNED, Status.IN_PROGRESS))
+        self.assertEqual((query.due_from, query.due_to), ("06.11.2025", "30.11.2025"))
+        self.assertEqual(query.order_by, "due_date_desc")
+        self.assertEqual(query.text, "отчет март")
+
+    def test_parse_is_cached_by_normalized_text(self):
+        self.assertIs(parse_filter("Priority:Высокий   overdue"), parse_filter(" priority:высокий overdue"))
+        self.assertEqual(parse_filter(""), TaskQuery())
+
+    def test_syntax_errors(self):
+        for text in ('status:"В работе', 'color:red', 'priority:срочный', 'due<2025-12-01',
+                     'status<выполнена', 'sort:title', 'status:'):
+            with self.subTest(text=text):
+                with self.assertRaises(FilterSyntaxError):
+                    parse_filter(text)
+
+
+class TestFilterQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_db = tempfile.mktemp(suffix='.db')
+        self.db = Database(self.temp_db)
+        self.task_service = TaskService(self.db)
+
+        self.report = self.task_service.create_task("Отчёт за ноябрь", "", Priority.HIGH, "01.01.2020")
+        self.task_service.change_status(self.report.id, Status.IN_PROGRESS)
+        self.call = self.task_service.create_task("Звонок", "обсудить отчёт", Priority.LOW, "01.01.2020")
+        self.later = self.task_service.create_task("Отчёт за год", "", Priority.HIGH, "31.12.2099")
+
+    def tearDown(self):
+        self.db.close()
+        if os.path.exists(self.temp_db):
+            os.unlink(self.temp_db)
+
+    def test_find_tasks_compound_filter(self):
+        tasks = self.task_service.find_tasks('status:"В работе" priority:высокий due<01.12.2025 '
+                                             'overdue text:отчёт')
+        self.assertEqual([t.id for t in tasks], [self.report.id])
+
+        tasks = self.task_service.find_tasks('отчёт sort:-due')
+        self.assertEqual([t.id for t in tasks], [self.later.id, self.report.id, self.call.id])
+
+    def test_text_filter_without_search_index(self):
+        self.db.has_search_index = False
+        # Без FTS5 слова ищутся через LIKE (регистр кириллицы не приводится)
+        tasks = self.task_service.find_tasks('обсудить')
+        self.assertEqual([t.id for t in tasks], [self.call.id])
+
+    def test_list_rows_combines_filter_with_buttons(self):
+        rows = self.task_service.list_rows(priority=Priority.HIGH, filter_text="отчёт sort:-due")
+        self.assertEqual([row.id for row in rows], [self.later.id, self.report.id])
+
+        # Приоритет из строки фильтра важнее кнопки
+        rows = self.task_service.list_rows(priority=Priority.HIGH, filter_text="priority:низкий")
+        self.assertEqual([row.id for row in rows], [self.call.id])
+
+
+if __name__ == "__main__":
+    unittest.main()
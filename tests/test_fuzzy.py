@@ -0,0 +1,76 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.fuzzy import TrigramIndex, trigrams
+
+
+class TestTrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex([
+            (1, "Подготовить отчёт по проекту"),
+            (2, "Позвонить клиенту"),
+            (3, "Отчет"),
+            (4, "Купить молоко"),
+        ])
+
+    def test_trigrams_fold_case_and_yo(self):
+        self.assertEqual(trigrams("ОТЧЁТ"), trigrams("отчет"))
+        self.assertIn("  о", trigrams("отчет"))
+        self.assertEqual(trigrams("!!!"), frozenset())
+
+    def test_search_tolerates_typos(self):
+        self.assertEqual([task_id for task_id, _ in self.index.search("отчот")], [3, 1])
+        self.assertEqual([task_id for task_id, _ in self.index.search("пазвонить")], [2])
+        self.assertEqual(self.index.search("ракета"), [])
+
+    def test_exact_words_score_one(self):
+        task_id, score = self.index.search("клиенту")[0]
+        self.assertEqual((task_id, score), (2, 1.0))
+
+    def test_limit_and_threshold(self):
+        self.assertEqual(len(self.index.search("отчет", limit=1)), 1)
+        self.assertEqual(self.index.search("отчот", threshold=0.9), [])
+
+    def test_incremental_updates(self):
+        self.index.add(2, "Позвонить поставщику")
+        self.assertEqual(self.index.search("клиенту"), [])
+        self.assertEqual(self.index.search("поставщику")[0][0], 2)
+
+        self.index.remove(3)
+        self.assertEqual([task_id for task_id, _ in self.index.search("отчет")], [1])
+        self.assertEqual(len(self.index), 3)
+
+    def test_compaction_keeps_results(self):
+        for i in range(20):
+            self.index.add(100 + i, f"Купить молоко {i}")
+            self.index.remove(100 + i)
+        self.index.add(4, "Купить хлеб")
+        self.assertEqual(self.index.search("молоко"), [])
+        self.assertEqual(self.index.search("хлеб")[0][0], 4)
+        self.assertLessEqual(self.index._stale * 2, self.index._size)
+
+    def test_rename_back_and_forth_keeps_single_postings(self):
+        # Заполнение, чтобы переименования не вызывали уплотнение
+        for i in range(100):
+            self.index.add(1000 + i, f"Позвонить поставщику номер {i}")
+        original = trigrams("Купить молоко")
+        for _ in range(5):
+            self.index.add(4, "Оплатить счет")
+            self.index.add(4, "Купить молоко")
+        self.index.remove(4)
+        self.index.add(4, "Купить молоко")
+
+        for gram in original:
+            self.assertEqual(list(self.index._postings[gram]).count(4), 1, gram)
+        self.assertEqual(self.index._postings.get("  с"), None)
+        # Переименованная задача не вытесняет более похожие названия
+        self.index.add(5, "Купить молоко и хлеб")
+        self.assertEqual([task_id for task_id, _ in self.index.search("купить молоко")], [4, 5])
+
+
+if __name__ == "__main__":
+    unittest.main()
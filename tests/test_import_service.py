@@ -0,0 +1,116 @@
+import gzip
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Добавляем корневую директорию в путь Python
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core import importer
+from core.database import Database
+from core.importer import iter_records
+from core.models import Priority, Status
+from services.import_service import ImportService
+from services.task_service import TaskService
+
+
+class TestImportService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(os.path.join(self.temp_dir.name, 'tasks.db'))
+        self.task_service = TaskService(self.db)
+        self.import_service = ImportService(self.task_service, batch_size=2)
+
+    def tearDown(self):
+        self.db.close()
+        self.temp_dir.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_round_trip_of_exported_json(self):
+        self.task_service.create_task("Первая", "описание", Priority.HIGH, "01.12.2025")
+        task = self.task_service.create_task("Вторая", "", Priority.LOW, "02.12.2025", reminder_days=1)
+        self.task_service.complete_task(task.id)
+        path = self._path('tasks.json')
+        self.db.export_to_file(path)
+
+        progress = []
+        report = self.import_service.import_file(path, progress=lambda d, t: progress.append((d, t)))
+
+        self.assertEqual((report.imported, report.rejected), (2, 0))
+        tasks = self.task_service.query_tasks(order_by='id')
+        self.assertEqual(len(tasks), 4)
+        imported = tasks[3]
+        self.assertEqual(imported.id, 4)
+        self.assertEqual(imported.status, Status.COMPLETED)
+        self.assertEqual(imported.reminder_date, "01.12.2025")
+        self.assertEqual(progress[-1], (os.path.getsize(path), os.path.getsize(path)))
+
+    def test_json_is_parsed_across_chunk_boundaries(self):
+        records = [{"title": f"Задача {i}", "due_date": "01.12.2025"} for i in range(50)]
+        text = json.dumps({"version": 1, "tasks": records}, ensure_ascii=False, indent=2)
+
+        original = importer.CHUNK_SIZE
+        importer.CHUNK_SIZE = 7
+        try:
+            parsed = list(iter_records(io.StringIO(text), 'json'))
+        finally:
+            importer.CHUNK_SIZE = original
+
+        self.assertEqual([record for _, record in parsed], records)
+        # Каждая задача при indent=2 начинается через 4 строки после предыдущей
+        self.assertEqual([line for line, _ in parsed[:3]], [4, 8, 12])
+
+    def test_ndjson_rejects_rows_with_line_numbers(self):
+        path = self._path('tasks.ndjson.gz')
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            f.write('{"title": "Хорошая", "due_date": "01.12.2025"}\n')
+            f.write('\n')
+            f.write('{"title": "", "due_date": "01.12.2025"}\n')
+            f.write('{"title": "Плохая дата", "due_date": "2025-12-01"}\n')
+            f.write('{"title": "Обрыв"\n')
+            f.write('{"title": "Отменена", "due_date": "01.12.2025", "priority": "отменено"}\n')
+            f.write('{"title": "Вторая", "due_date": "02.12.2025", "status": "В работе"}\n')
+
+        report = self.import_service.import_file(path)
+
+        self.assertEqual((report.imported, report.rejected), (2, 4))
+        self.assertEqual([line for line, _ in report.errors], [3, 4, 5, 6])
+        self.assertIn("ДД.ММ.ГГГГ", report.errors[1][1])
+        self.assertEqual([t.title for t in self.task_service.get_all_tasks()], ["Хорошая", "Вторая"])
+
+    def test_csv_import(self):
+        path = self._path('tasks.csv')
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            f.write('title,description,priority,status,due_date,reminder_sent\n')
+            f.write('Отчет,"многострочное\nописание",высокий,,01.12.2025,false\n')
+            f.write('Без срока,,низкий,,,\n')
+            f.write('Звонок,,,В работе,03.12.2025,1\n')
+
+        report = self.import_service.import_file(path)
+
+        self.assertEqual(report.imported, 2)
+        self.assertEqual(report.errors, [(4, "Неверный формат даты. Используйте ДД.ММ.ГГГГ")])
+        first, second = self.task_service.get_all_tasks()
+        self.assertEqual(first.description, "многострочное\nописание")
+        self.assertEqual(first.priority, Priority.HIGH)
+        self.assertEqual(second.priority, Priority.MEDIUM)
+        self.assertTrue(second.reminder_sent)
+
+    def test_broken_json_keeps_parsed_tasks(self):
+        text = '{"tasks": [\n{"title": "A", "due_date": "01.12.2025"},\n{"title": "B", "due_date": "02.12.2025"}\n{"title": "C"}]}'
+
+        report = self.import_service.import_stream(io.StringIO(text), 'json')
+
+        self.assertEqual(report.imported, 2)
+        self.assertEqual(report.rejected, 1)
+        self.assertEqual(report.errors[0][0], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.database import Database
+from core.models import Priority
+from services.jobs import JobCancelled, JobContext, JobRunner, JobState, export_job
+from services.task_service import TaskService
+
+
+def count_to(context, total, gate=None):
+    for done in range(1, total + 1):
+        if gate is not None:
+            gate.wait(5)
+        context.report(done, total)
+    return total
+
+
+class TestJobRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.runner = JobRunner(max_threads=1)
+        self.finished = []
+
+    def tearDown(self):
+        self.runner.shutdown()
+
+    def wait(self, job, timeout=30):
+        deadline = time.monotonic() + timeout
+        while job not in self.finished:
+            self.assertLess(time.monotonic(), deadline, "задание не завершилось")
+            self.finished += self.runner.poll()
+            time.sleep(0.01)
+        return job
+
+    def test_thread_job_reports_progress_and_result(self):
+        done = []
+        job = self.runner.submit("Счет", count_to, 5, on_done=done.append)
+        self.wait(job)
+
+        self.assertEqual(job.state, JobState.DONE)
+        self.assertEqual(job.result, 5)
+        self.assertEqual((job.done, job.total), (5, 5))
+        self.assertEqual(job.fraction, 1.0)
+        self.assertEqual(done, [job])
+        self.assertFalse(self.runner.busy())
+
+    def test_cancel_running_job(self):
+        gate = threading.Event()
+        job = self.runner.submit("Долгое", count_to, 1000, gate)
+        # Второе задание ждет в очереди единственного потока
+        queued = self.runner.submit("В очереди", count_to, 1)
+        self.assertTrue(self.runner.cancel(queued.id))
+        job.cancel()
+        gate.set()
+        self.wait(job)
+        self.wait(queued)
+
+        self.assertEqual(job.state, JobState.CANCELLED)
+        self.assertLess(job.done, 1000)
+        self.assertEqual(queued.state, JobState.CANCELLED)
+        self.assertFalse(self.runner.cancel(job.id))
+
+    def test_shutdown_cancels_jobs(self):
+        gate = threading.Event()
+        running = self.runner.submit("Долгое", count_to, 1000, gate)
+        queued = self.runner.submit("В очереди", count_to, 1)
+        self.runner.shutdown()
+        gate.set()
+        self.wait(running)
+        self.wait(queued)
+
+        self.assertEqual(running.state, JobState.CANCELLED)
+        self.assertEqual(queued.state, JobState.CANCELLED)
+
+    def test_failed_job_keeps_error(self):
+        def fail(context):
+            raise ValueError("ошибка")
+
+        job = self.wait(self.runner.submit("Ошибка", fail))
+        self.assertEqual(job.state, JobState.FAILED)
+        self.assertIsInstance(job.error, ValueError)
+
+    def test_clear_finished(self):
+        gate = threading.Event()
+        running = self.runner.submit("Идет", count_to, 1, gate)
+        finished = self.runner.submit("Готово", count_to, 1)
+        finished.cancel()
+        self.wait(finished)
+        self.runner.clear_finished()
+        self.assertEqual(self.runner.jobs(), [running])
+        gate.set()
+        self.wait(running)
+
+    def test_export_in_process_pool(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir, ignore_errors=True)
+        db_path = os.path.join(temp_dir, 'tasks.db')
+        out_path = os.path.join(temp_dir, 'tasks.json')
+        with Database(db_path) as db:
+            service = TaskService(db)
+            for i in range(3):
+                service.create_task(f"Задача {i}", "", Priority.LOW, "31.12.2030")
+
+        job = self.wait(self.runner.submit("Экспорт", export_job, db_path, out_path, cpu_bound=True))
+
+        self.assertEqual(job.state, JobState.DONE, job.error)
+        self.assertEqual(job.result, 3)
+        with open(out_path, encoding='utf-8') as fp:
+            self.assertEqual(len(json.load(fp)["tasks"]), 3)
+
+    def test_report_raises_after_cancel(self):
+        event = threading.Event()
+        context = JobContext(1, event)
+        event.set()
+        with self.assertRaises(JobCancelled):
+            context.report(1, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
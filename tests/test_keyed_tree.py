@@ -0,0 +1,133 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.keyed_tree import KeyedTreeview, diff_rows, stable_keys
+
+
+class FakeTree:
+    """Treeview в памяти: хранит порядок элементов и считает вызовы Tk"""
+
+    def __init__(self):
+        self.order = []
+        self.items = {}
+        self.calls = []
+        self.idle = []
+
+    def after_idle(self, callback):
+        self.idle.append(callback)
+        return len(self.idle)
+
+    def after_cancel(self, job_id):
+        self.idle[job_id - 1] = None
+
+    def run_idle(self):
+        jobs, self.idle = self.idle, []
+        for callback in jobs:
+            if callback:
+                callback()
+
+    def insert(self, parent, index, iid, values, tags):
+        self.calls.append(('insert', iid))
+        self.order.insert(index, iid)
+        self.items[iid] = (values, tags)
+
+    def move(self, iid, parent, index):
+        self.calls.append(('move', iid))
+        self.order.insert(index, iid)
+
+    def detach(self, *iids):
+        self.calls.append(('detach',) + iids)
+        for iid in iids:
+            self.order.remove(iid)
+
+    def delete(self, *iids):
+        self.calls.append(('delete',) + iids)
+        for iid in iids:
+            self.order.remove(iid)
+            del self.items[iid]
+
+    def item(self, iid, values, tags):
+        self.calls.append(('item', iid))
+        self.items[iid] = (values, tags)
+
+
+def make_rows(ids, status='Запланирована'):
+    return [(str(i), (i, f'Задача {i}', status), ()) for i in ids]
+
+
+class TestKeyedTree(unittest.TestCase):
+
+    def setUp(self):
+        self.tree = FakeTree()
+        self.model = KeyedTreeview(self.tree)
+
+    def show(self, rows):
+        self.model.set_rows(rows)
+        self.tree.run_idle()
+        self.tree.calls.clear()
+
+    def test_stable_keys_is_longest_increasing_run(self):
+        positions = [('a', 0), ('c', 2), ('b', 1), ('d', 3)]
+        stable = stable_keys(positions)
+        self.assertEqual(len(stable), 3)
+        self.assertTrue({'a', 'd'} <= stable)
+        self.assertEqual(stable_keys([]), set())
+
+    def test_diff_of_identical_rows_is_empty(self):
+        rows = make_rows(range(10))
+        diff = diff_rows([r[0] for r in rows], {r[0]: r for r in rows}, rows)
+        self.assertEqual(len(diff), 0)
+
+    def test_single_change_touches_one_row(self):
+        rows = make_rows(range(50000))
+        self.show(rows)
+
+        changed = list(rows)
+        changed[123] = ('123', (123, 'Задача 123', 'Выполнена'), ('completed',))
+        self.model.set_rows(changed)
+        self.tree.run_idle()
+
+        self.assertEqual(self.tree.calls, [('item', '123')])
+        self.assertEqual(self.tree.items['123'][1], ('completed',))
+
+    def test_moved_row_is_moved_not_reinserted(self):
+        self.show(make_rows(range(6)))
+        self.model.set_rows(make_rows([0, 1, 5, 2, 3, 4]))
+        self.tree.run_idle()
+
+        self.assertEqual(self.tree.calls, [('detach', '5'), ('move', '5')])
+        self.assertEqual(self.tree.order, ['0', '1', '5', '2', '3', '4'])
+
+    def test_random_updates_match_new_order(self):
+        rng = random.Random(7)
+        ids = list(range(200))
+        self.show(make_rows(ids))
+        for _ in range(20):
+            ids = [i for i in ids if rng.random() > 0.1] + [rng.randrange(200, 400) for _ in range(10)]
+            ids = list(dict.fromkeys(ids))
+            head = ids[:30]
+            rng.shuffle(head)
+            ids[:30] = head
+            ids[5:25] = reversed(ids[5:25])
+            rows = make_rows(ids, status=rng.choice(['Запланирована', 'В работе']))
+            self.show(rows)
+            self.assertEqual(self.tree.order, [r[0] for r in rows])
+            self.assertEqual({iid: v for iid, v in self.tree.items.items()},
+                             {r[0]: (r[1], r[2]) for r in rows})
+
+    def test_updates_coalesce_per_idle_cycle(self):
+        self.model.set_rows(make_rows(range(3)))
+        self.model.set_rows(make_rows(range(2)))
+        self.assertEqual(self.tree.order, [])
+        self.tree.run_idle()
+
+        self.assertEqual(self.tree.order, ['0', '1'])
+        self.assertEqual([c[0] for c in self.tree.calls], ['insert', 'insert'])
+
+
+if __name__ == '__main__':
+    unittest.main()
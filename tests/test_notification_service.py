@@ -10,7 +10,7 @@ from core.database import Database
 from services.task_service import TaskService
 from services.notification_service import NotificationService
 from core.models import Task, Status, Priority
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 
 class TestNotificationService(unittest.TestCase):
@@ -24,6 +24,7 @@ class TestNotificationService(unittest.TestCase):
 
     def tearDown(self):
         # Удаляем временную базу данных
+        self.db.close()
         try:
             if hasattr(self, 'temp_db') and os.path.exists(self.temp_db):
                 os.unlink(self.temp_db)
@@ -51,6 +52,18 @@ class TestNotificationService(unittest.TestCase):
         self.assertEqual(overdue_tasks[0].title, "Просроченная задача")
         self.assertTrue(overdue_tasks[0].is_overdue())
 
+    def test_clock_is_injectable(self):
+        self.task_service.create_task("Задача", "Описание", Priority.HIGH, "10.05.2030")
+        service = NotificationService(self.task_service, clock=lambda: date(2030, 5, 13))
+
+        overdue_tasks = service.check_overdue_tasks()
+        self.assertEqual([task.title for task in overdue_tasks], ["Задача"])
+        self.assertEqual(service._calculate_days_overdue("10.05.2030"), 3)
+        self.assertEqual(service._calculate_days_overdue("неверно"), 0)
+
+        service.clock = lambda: date(2030, 5, 9)
+        self.assertEqual(service.check_overdue_tasks(), [])
+
     def test_check_overdue_tasks_without_overdue_tasks(self):
         #Тест проверки просроченных задач при их отсутствии
         # Создаем только задачи с будущими датами
@@ -84,6 +97,24 @@ class TestNotificationService(unittest.TestCase):
 
     
 
+    @patch('services.notification_service.messagebox.showinfo')
+    def test_mark_selected_completed_uses_row_ids(self, mock_showinfo):
+        # Задачи с одинаковым названием различаются по ID строки
+        first = self.task_service.create_task("Отчет", "", Priority.HIGH, "01.01.2020")
+        second = self.task_service.create_task("Отчет", "", Priority.HIGH, "02.01.2020")
+        third = self.task_service.create_task("Звонок", "", Priority.LOW, "03.01.2020")
+
+        tree = Mock()
+        tree.selection.return_value = (str(first.id), str(third.id))
+        tree.get_children.return_value = ()
+        with patch.object(self.task_service, 'get_all_tasks') as get_all_tasks:
+            self.notification_service._mark_selected_completed(tree)
+            get_all_tasks.assert_not_called()
+
+        self.assertEqual(self.task_service.get_task(first.id).status, Status.COMPLETED)
+        self.assertEqual(self.task_service.get_task(second.id).status, Status.PLANNED)
+        self.assertEqual(self.task_service.get_task(third.id).status, Status.COMPLETED)
+
     @patch('services.notification_service.messagebox.showinfo')
     def test_show_periodic_notifications_no_reminders(self, mock_showinfo):
         #Тест периодических уведомлений без напоминаний
@@ -139,21 +170,25 @@ class TestNotificationService(unittest.TestCase):
         
         overdue_tasks = [high_priority_task, medium_priority_task]
         
-        with patch.object(self.notification_service.task_service, 'get_all_tasks', return_value=overdue_tasks):
+        with patch.object(self.notification_service.task_service, 'get_overdue', return_value=overdue_tasks):
             self.notification_service.check_overdue_tasks()
             # Дополнительные проверки могут быть добавлены здесь
 
     def test_notification_service_with_mock_tasks(self):
         #Тест сервиса уведомлений с mock-задачами
+        # Просроченные выбираются запросом к БД, полный список задач не загружается
         mock_tasks = [
             Mock(is_overdue=Mock(return_value=True), title="Просроченная 1"),
-            Mock(is_overdue=Mock(return_value=False), title="Активная"),
             Mock(is_overdue=Mock(return_value=True), title="Просроченная 2")
         ]
-        
-        with patch.object(self.task_service, 'get_all_tasks', return_value=mock_tasks):
+        self.notification_service.clock = lambda: date(2030, 5, 13)
+
+        with patch.object(self.task_service, 'get_overdue', return_value=mock_tasks) as get_overdue, \
+                patch.object(self.task_service, 'get_all_tasks') as get_all_tasks:
             overdue_tasks = self.notification_service.check_overdue_tasks()
-            
+
+            get_overdue.assert_called_once_with(date(2030, 5, 13))
+            get_all_tasks.assert_not_called()
             self.assertEqual(len(overdue_tasks), 2)
             self.assertEqual(overdue_tasks[0].title, "Просроченная 1")
             self.assertEqual(overdue_tasks[1].title, "Просроченная 2")
@@ -0,0 +1,156 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from core.database import Database
+from core.models import Priority
+from services.scheduler import MAX_SLEEP_MS, MIDNIGHT_MARGIN_MS, DeadlineScheduler
+from services.task_service import TaskService
+
+
+class FakeTimer:
+    """Таймер с интерфейсом Tk after/after_cancel, который запускается вручную"""
+
+    def __init__(self):
+        self.jobs = {}
+        self._next_id = 0
+
+    def after(self, ms, callback):
+        self._next_id += 1
+        self.jobs[self._next_id] = (ms, callback)
+        return self._next_id
+
+    def after_cancel(self, job_id):
+        del self.jobs[job_id]
+
+    def delay(self):
+        (ms, _), = self.jobs.values()
+        return ms
+
+    def run(self):
+        (job_id, (_, callback)), = self.jobs.items()
+        del self.jobs[job_id]
+        callback()
+
+
+class FakeWorker:
+    """BackgroundWorker, который выполняет заявку сразу, а результат доставляет по команде"""
+
+    def __init__(self):
+        self.results = []
+
+    def submit(self, fn, *args, on_done=None, on_error=None, key=None):
+        self.results.append((fn(*args), on_done))
+
+    def run(self):
+        results, self.results = self.results, []
+        for result, on_done in results:
+            on_done(result)
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_db = tempfile.mktemp(suffix='.db')
+        self.db = Database(self.temp_db)
+        self.task_service = TaskService(self.db)
+        self.timer = FakeTimer()
+        self.clock = datetime(2030, 5, 10, 23, 0)
+        self.fired = 0
+        self.scheduler = DeadlineScheduler(self.task_service, self.timer, self._on_due,
+                                           now=lambda: self.clock)
+
+    def tearDown(self):
+        self.db.close()
+        try:
+            os.unlink(self.temp_db)
+        except OSError:
+            pass
+
+    def _on_due(self):
+        self.fired += 1
+
+    def test_sleeps_until_midnight_of_earliest_date(self):
+        self.task_service.create_task("Позже", "", Priority.LOW, "20.05.2030")
+        self.task_service.create_task("Завтра", "", Priority.LOW, "11.05.2030")
+        self.scheduler.start()
+        self.timer.run()
+        self.assertEqual(self.fired, 1)
+        self.assertEqual(self.scheduler.next_date(), "2030-05-11")
+        self.assertEqual(self.timer.delay(), 3600 * 1000 + MIDNIGHT_MARGIN_MS)
+
+        # Смена даты - срабатывание и переход к следующей дате
+        self.clock = datetime(2030, 5, 11, 0, 0, 1)
+        self.timer.run()
+        self.assertEqual(self.fired, 2)
+        self.assertEqual(self.scheduler.next_date(), "2030-05-20")
+        self.assertEqual(self.timer.delay(), MAX_SLEEP_MS)
+
+    def test_early_wakeup_does_not_fire(self):
+        self.task_service.create_task("Позже", "", Priority.LOW, "20.05.2030")
+        self.scheduler.rebuild()
+        self.timer.run()
+        self.assertEqual(self.fired, 0)
+        self.assertEqual(len(self.timer.jobs), 1)
+
+    def test_reschedule_rearms_for_earlier_date(self):
+        self.task_service.create_task("Позже", "", Priority.LOW, "20.05.2030")
+        self.scheduler.rebuild()
+        # Планировщик узнает о новой задаче из события TaskCreated
+        self.task_service.create_task("Напоминание", "", Priority.LOW, "13.05.2030", reminder_days=2)
+        self.assertEqual(self.scheduler.next_date(), "2030-05-11")
+        self.assertEqual(self.timer.delay(), 3600 * 1000 + MIDNIGHT_MARGIN_MS)
+
+        # Уже наступивший срок не ждем, а пора отправить напоминание - проверка сразу
+        self.task_service.create_task("Просрочена", "", Priority.LOW, "01.05.2030")
+        self.assertEqual(self.timer.delay(), 3600 * 1000 + MIDNIGHT_MARGIN_MS)
+        self.task_service.create_task("Напомнить сегодня", "", Priority.LOW, "12.05.2030",
+                                      reminder_days=2)
+        self.assertEqual(self.timer.delay(), 0)
+
+    def test_queued_events_applied_on_dispatch(self):
+        self.scheduler.stop()
+        scheduler = DeadlineScheduler(self.task_service, self.timer, self._on_due,
+                                      now=lambda: self.clock, queued=True)
+        self.task_service.create_task("Завтра", "", Priority.LOW, "11.05.2030")
+        self.assertIsNone(scheduler.next_date())
+
+        self.task_service.events.dispatch_queued()
+        self.assertEqual(scheduler.next_date(), "2030-05-11")
+
+    def test_rebuild_reads_dates_in_worker(self):
+        self.scheduler.stop()
+        self.task_service.create_task("Позже", "", Priority.LOW, "20.05.2030")
+        worker = FakeWorker()
+        scheduler = DeadlineScheduler(self.task_service, self.timer, self._on_due,
+                                      now=lambda: self.clock, worker=worker)
+        scheduler.rebuild()
+        self.assertIsNone(scheduler.next_date())
+        self.assertEqual(self.timer.jobs, {})
+
+        # Задача создана, пока чтение дат еще не доставлено
+        self.task_service.create_task("Завтра", "", Priority.LOW, "11.05.2030")
+        worker.run()
+        self.assertEqual(scheduler.next_date(), "2030-05-11")
+        self.assertEqual(self.timer.delay(), 3600 * 1000 + MIDNIGHT_MARGIN_MS)
+
+        # После срабатывания даты тоже перечитываются в фоне
+        self.clock = datetime(2030, 5, 11, 0, 0, 1)
+        self.timer.run()
+        self.assertEqual(self.fired, 1)
+        self.assertEqual(self.timer.jobs, {})
+        worker.run()
+        self.assertEqual(scheduler.next_date(), "2030-05-20")
+
+    def test_no_dates_no_timer(self):
+        self.scheduler.rebuild()
+        self.assertEqual(self.timer.jobs, {})
+        self.assertIsNone(self.scheduler.next_date())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import os
 import sys
 import tempfile
+import threading
 from tkinter import ttk, messagebox
 from unittest.mock import Mock, patch
 
@@ -9,10 +10,14 @@ from unittest.mock import Mock, patch
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from core.models import Task, Status, Priority
+from core.cache import TaskCache
 from core.database import Database
+from core.events import BulkChanged, TaskCreated, TaskDeleted, TaskEvent, TaskUpdated
+from services.jobs import JobCancelled
 from services.task_service import TaskService
 from services.notification_service import NotificationService
-from datetime import datetime
+from datetime import date, datetime
+from core.dates import to_ordinal
 
 
 class TestTaskService(unittest.TestCase):
@@ -25,6 +30,7 @@ class TestTaskService(unittest.TestCase):
     
     def tearDown(self):
         # Удаляем временную базу данных
+        self.db.close()
         try:
             if hasattr(self, 'temp_db') and os.path.exists(self.temp_db):
                 os.unlink(self.temp_db)
@@ -80,6 +86,26 @@ class TestTaskService(unittest.TestCase):
         self.assertEqual(updated_task.status, Status.COMPLETED)
         self.assertIsNotNone(updated_task.completed_date)
 
+    def test_change_status_keeps_completed_date(self):
+        task = self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025")
+        self.assertTrue(self.task_service.complete_task(task.id))
+        completed_date = self.task_service.get_task(task.id).completed_date
+
+        # Повторное выполнение успешно и не меняет дату выполнения
+        self.assertTrue(self.task_service.complete_task(task.id))
+        self.assertEqual(self.task_service.get_task(task.id).completed_date, completed_date)
+
+        self.assertTrue(self.task_service.change_status(task.id, Status.IN_PROGRESS))
+        self.assertIsNone(self.task_service.get_task(task.id).completed_date)
+
+    def test_mark_reminder_sent(self):
+        task = self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025",
+                                             reminder_days=1)
+        self.assertTrue(self.task_service.mark_reminder_sent(task.id))
+        self.assertTrue(self.task_service.get_task(task.id).reminder_sent)
+        self.assertTrue(self.task_service.mark_reminder_sent(task.id))
+        self.assertFalse(self.task_service.mark_reminder_sent(99999))
+
     def test_delete_task(self):
         task = self.task_service.create_task(
             title="Задача для удаления",
@@ -242,6 +268,25 @@ class TestTaskService(unittest.TestCase):
         
         self.assertFalse(future_task.is_overdue())
 
+    def test_date_checks_use_given_today(self):
+        task = Task(1, "Задача", "", Priority.LOW, Status.PLANNED, "01.05.2030", "10.05.2030",
+                    reminder_date="08.05.2030")
+        today = to_ordinal("09.05.2030")
+
+        self.assertEqual(task.due_ordinal, date(2030, 5, 10).toordinal())
+        self.assertFalse(task.is_overdue(today))
+        self.assertTrue(task.is_overdue(today + 1))
+        self.assertEqual(task.days_overdue(today), 0)
+        self.assertEqual(task.days_overdue(today + 3), 2)
+        self.assertTrue(task.needs_reminder(today))
+        self.assertFalse(task.needs_reminder(today - 2))
+        task.reminder_sent = True
+        self.assertFalse(task.needs_reminder(today))
+
+        # Новое значение срока разбирается заново
+        task.due_date = "20.05.2030"
+        self.assertFalse(task.is_overdue(today + 1))
+        self.assertIsNone(to_ordinal("31.02.2030"))
 
     def test_sort_tasks_by_due_date(self):
         task_late = self.task_service.create_task("Поздняя", "Описание", Priority.MEDIUM, "31.12.2025")
@@ -281,6 +326,19 @@ class TestTaskService(unittest.TestCase):
         self.assertEqual(sorted_tasks[0].title, "Задача 2")  # Ранняя дата
         self.assertEqual(sorted_tasks[1].title, "Задача 1")  # Поздняя дата
 
+    def test_query_tasks_matches_filter_and_sort(self):
+        self.task_service.create_task("Задача 1", "Описание", Priority.HIGH, "31.12.2025")
+        self.task_service.create_task("Задача 2", "Описание", Priority.HIGH, "01.01.2025")
+        self.task_service.create_task("Задача 3", "Описание", Priority.MEDIUM, "31.12.2025")
+        self.task_service.create_task("Задача 4", "Описание", Priority.HIGH, "31.12.2025")
+
+        all_tasks = self.task_service.get_all_tasks()
+        for order_by in ("due_date", "due_date_desc", "priority", "created_date"):
+            expected = self.task_service.sort_tasks(
+                self.task_service.filter_tasks(all_tasks, priority=Priority.HIGH), order_by)
+            queried = self.task_service.query_tasks(priority=Priority.HIGH, order_by=order_by)
+            self.assertEqual([task.id for task in queried], [task.id for task in expected])
+
     def test_get_all_tasks_empty(self):
         tasks = self.task_service.get_all_tasks()
         
@@ -307,17 +365,242 @@ class TestTaskService(unittest.TestCase):
 
     def test_check_overdue_tasks_with_mock(self):
         mock_tasks = [
-            Mock(is_overdue=Mock(return_value=True), title="Просроченная"),
-            Mock(is_overdue=Mock(return_value=False), title="Активная")
+            Mock(is_overdue=Mock(return_value=True), title="Просроченная")
         ]
         
-        with patch.object(self.task_service, 'get_all_tasks', return_value=mock_tasks):
+        with patch.object(self.task_service, 'get_overdue', return_value=mock_tasks):
             notification_service = NotificationService(self.task_service)
             overdue_tasks = notification_service.check_overdue_tasks()
             
             self.assertEqual(len(overdue_tasks), 1)
             self.assertEqual(overdue_tasks[0].title, "Просроченная")
 
+    def test_create_tasks_bulk(self):
+        tasks = [
+            Task(id=0, title=f"Пакетная {i}", description="", priority=Priority.LOW,
+                 status=Status.PLANNED, created_date="01.01.2025", due_date="31.12.2025")
+            for i in range(5)
+        ]
+
+        task_ids = self.task_service.create_tasks(tasks)
+
+        self.assertEqual(len(task_ids), 5)
+        self.assertEqual([task.id for task in tasks], task_ids)
+        for task_id, task in zip(task_ids, tasks):
+            self.assertEqual(self.task_service.get_task(task_id).title, task.title)
+
+    def test_create_tasks_validates_whole_batch(self):
+        tasks = [
+            Task(id=0, title="Корректная", description="", priority=Priority.LOW,
+                 status=Status.PLANNED, created_date="01.01.2025", due_date="31.12.2025"),
+            Task(id=0, title="Некорректная", description="", priority=Priority.LOW,
+                 status=Status.PLANNED, created_date="01.01.2025", due_date="2025-12-31")
+        ]
+
+        with self.assertRaises(ValueError):
+            self.task_service.create_tasks(tasks)
+        self.assertEqual(len(self.task_service.get_all_tasks()), 0)
+
+    def test_update_and_delete_tasks_bulk(self):
+        task1 = self.task_service.create_task("Задача 1", "Описание", Priority.LOW, "31.12.2025")
+        task2 = self.task_service.create_task("Задача 2", "Описание", Priority.LOW, "31.12.2025")
+
+        task1.priority = Priority.HIGH
+        task2.priority = Priority.HIGH
+        self.assertEqual(self.task_service.update_tasks([task1, task2]), 2)
+        self.assertEqual(self.task_service.get_task(task2.id).priority, Priority.HIGH)
+
+        self.assertEqual(self.task_service.delete_tasks([task1.id, task2.id, 99999]), 2)
+        self.assertEqual(len(self.task_service.get_all_tasks()), 0)
+
+    def test_fuzzy_search_follows_changes(self):
+        task = self.task_service.create_task("Подготовить отчет", "", Priority.LOW, "31.12.2025")
+        self.assertEqual([t.id for t in self.task_service.fuzzy_search("отчот")], [task.id])
+
+        # Индекс уже построен и обновляется при изменениях через сервис
+        other = self.task_service.create_task("Позвонить клиенту", "", Priority.LOW, "31.12.2025")
+        self.assertEqual([t.id for t in self.task_service.fuzzy_search("клеинту")], [other.id])
+
+        task.title = "Купить молоко"
+        self.task_service.update_task(task)
+        self.assertEqual(self.task_service.fuzzy_search("отчот"), [])
+
+        self.task_service.delete_task(other.id)
+        self.assertEqual(self.task_service.fuzzy_search("клиенту"), [])
+
+    def test_typeahead_follows_changes(self):
+        self.task_service.build_prefix_index()
+        march = self.task_service.create_task("Отчет за март", "", Priority.HIGH, "31.12.2025")
+        other = self.task_service.create_task("Отчет за май", "", Priority.LOW, "31.12.2025")
+        self.assertEqual(self.task_service.typeahead("отч ма"), [march.id, other.id])
+
+        # Результаты поиска комбинируются с фильтрами и сортировкой списка
+        rows = self.task_service.list_rows(priority=Priority.LOW, ids=self.task_service.typeahead("отч"))
+        self.assertEqual([row.id for row in rows], [other.id])
+        self.assertEqual(self.task_service.list_rows(ids=[]), [])
+
+        other.title = "Купить хлеб"
+        self.task_service.update_task(other)
+        self.assertEqual(self.task_service.typeahead("отч"), [march.id])
+        self.task_service.delete_task(march.id)
+        self.assertEqual(self.task_service.complete_word("от"), [])
+
+    def test_cache_serves_repeated_reads(self):
+        task = self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025")
+        self.task_service.get_task(task.id)
+        self.task_service.get_all_tasks()
+
+        with patch.object(self.db, 'get_all_tasks') as get_all, \
+                patch.object(self.db, 'get_task_by_id') as get_by_id:
+            self.assertEqual(self.task_service.get_task(task.id).title, "Задача")
+            self.assertEqual(len(self.task_service.get_all_tasks()), 1)
+            get_all.assert_not_called()
+            get_by_id.assert_not_called()
+
+        # Изменение полученной копии не попадает в кэш до сохранения
+        self.task_service.get_task(task.id).title = "Изменено"
+        self.assertEqual(self.task_service.get_task(task.id).title, "Задача")
+
+    def test_large_results_are_not_cached(self):
+        service = TaskService(self.db, TaskCache(max_query_rows=2))
+        for i in range(3):
+            service.create_task(f"Задача {i}", "", Priority.LOW, "31.12.2025")
+        service.get_all_tasks()
+
+        with patch.object(self.db, 'get_all_tasks', return_value=[]) as get_all:
+            service.get_all_tasks()
+            get_all.assert_called_once()
+
+    def test_first_read_in_new_thread_keeps_cache(self):
+        task = self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025")
+        self.task_service.get_all_tasks()
+        generation = self.task_service.cache.generation
+
+        reader = threading.Thread(target=self.task_service.get_all_tasks)
+        reader.start()
+        reader.join()
+
+        self.assertEqual(self.task_service.cache.generation, generation)
+        self.assertIsNotNone(self.task_service.cache.get(task.id))
+
+    def test_cache_detects_external_writes(self):
+        task = self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025")
+        self.assertEqual(self.task_service.get_task(task.id).status, Status.PLANNED)
+
+        other = Database(self.temp_db)
+        try:
+            other.update_task(Task(**{**vars(task), 'status': Status.COMPLETED}))
+        finally:
+            other.close()
+
+        self.assertEqual(self.task_service.get_task(task.id).status, Status.COMPLETED)
+        self.assertEqual(self.task_service.get_all_tasks()[0].status, Status.COMPLETED)
+
+    def test_writes_from_other_thread_are_not_external(self):
+        task = self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025")
+        self.task_service.build_prefix_index()
+        self.task_service.get_task(task.id)
+        events = []
+        self.task_service.events.subscribe(BulkChanged, events.append)
+
+        worker = threading.Thread(target=self.task_service.complete_task, args=(task.id,))
+        worker.start()
+        worker.join()
+
+        self.assertEqual(self.task_service.get_task(task.id).status, Status.COMPLETED)
+        self.assertIsNotNone(self.task_service._prefix_index)
+        self.assertFalse(any(event.full_reload for event in events))
+
+    def test_transaction_rollback_resets_cache(self):
+        task = self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025")
+        with self.assertRaises(RuntimeError):
+            with self.task_service.transaction():
+                self.task_service.complete_task(task.id)
+                self.assertEqual(self.task_service.get_task(task.id).status, Status.COMPLETED)
+                raise RuntimeError("ошибка")
+        self.assertEqual(self.task_service.get_task(task.id).status, Status.PLANNED)
+
+    def test_complete_tasks_cancel_rolls_back(self):
+        ids = self.task_service.create_tasks(
+            Task(0, f"Задача {i}", "", Priority.LOW, Status.PLANNED, "01.01.2025", "31.12.2025")
+            for i in range(3))
+        steps = []
+
+        def progress(done, total):
+            steps.append((done, total))
+            if done == 2:
+                raise JobCancelled()
+
+        with self.assertRaises(JobCancelled):
+            self.task_service.complete_tasks(ids, progress=progress)
+
+        self.assertEqual(steps, [(1, 3), (2, 3)])
+        self.assertTrue(all(self.task_service.get_task(task_id).status == Status.PLANNED
+                            for task_id in ids))
+
+    def test_complete_tasks_single_commit(self):
+        ids = self.task_service.create_tasks(
+            Task(0, f"Задача {i}", "", Priority.LOW, Status.PLANNED, "01.01.2025", "31.12.2025")
+            for i in range(3))
+        conn = self.db._connections.connection()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            self.assertEqual(self.task_service.complete_tasks(ids + [99999]), 3)
+        finally:
+            conn.set_trace_callback(None)
+        self.assertEqual(statements.count('COMMIT'), 1)
+        self.assertEqual(len(self.task_service.query_tasks(status=Status.COMPLETED)), 3)
+
+    def test_process_reminders_marks_delivered_batch(self):
+        ids = [self.task_service.create_task(f"Задача {i}", "", Priority.LOW, "01.01.2020",
+                                             reminder_days=1).id for i in range(3)]
+        failing = ids[1]
+
+        def deliver(task):
+            if task.id == failing:
+                raise OSError("нет связи")
+
+        self.assertEqual(self.task_service.process_reminders(deliver), 2)
+        # Недоставленное напоминание остается и отправляется при следующем проходе
+        self.assertEqual([t.id for t in self.task_service.get_reminders()], [failing])
+        self.assertFalse(self.task_service.get_task(failing).reminder_sent)
+        self.assertTrue(self.task_service.get_task(ids[0]).reminder_sent)
+        self.assertEqual(self.task_service.process_reminders(lambda task: None), 1)
+
+    def test_events_describe_changes(self):
+        events = []
+        self.task_service.events.subscribe(TaskEvent, events.append)
+
+        task = self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025")
+        self.task_service.get_task(task.id)
+        self.task_service.complete_task(task.id)
+        self.task_service.delete_task(task.id)
+        ids = self.task_service.create_tasks([Task(0, "Пакет", "", Priority.LOW, Status.PLANNED,
+                                                   "01.01.2025", "31.12.2025")])
+
+        self.assertIsInstance(events[0], TaskCreated)
+        self.assertIsInstance(events[1], TaskUpdated)
+        self.assertEqual(events[1].task.status, Status.COMPLETED)
+        self.assertEqual(events[1].changed, {"status", "completed_date", "version"})
+        self.assertEqual(events[2:], [TaskDeleted(task.id), BulkChanged(created=tuple(ids))])
+
+    def test_events_published_after_commit(self):
+        events = []
+        self.task_service.events.subscribe(TaskEvent, events.append)
+        with self.task_service.transaction():
+            self.task_service.create_task("Задача", "Описание", Priority.LOW, "31.12.2025")
+            self.assertEqual(events, [])
+        self.assertEqual(len(events), 1)
+
+        # При откате события блока отбрасываются, подписчики перечитывают данные
+        events.clear()
+        with self.assertRaises(RuntimeError):
+            with self.task_service.transaction():
+                self.task_service.create_task("Откат", "Описание", Priority.LOW, "31.12.2025")
+                raise RuntimeError("ошибка")
+        self.assertEqual(events, [BulkChanged(full_reload=True)])
+
     def test_process_reminders(self):
         reminders_count = self.task_service.process_reminders()
         